@@ -0,0 +1,113 @@
+# scripts/bench_lfa.py
+# Mide la ventana de pérdida ante la caída de un vecino, con y sin LFA precalculados.
+#
+# Uso: PYTHONPATH=src python scripts/bench_lfa.py [--side 30] [--pps 1000] [--runs 5]
+#
+# Arma una grilla side×side con pesos aleatorios, instala las filas en la LSDB de un nodo
+# y simula la caída de su primer salto más usado. Un generador de tráfico consulta la FIB
+# cada 1/pps s para todos los destinos afectados; se cuenta como pérdida cada consulta que
+# devuelve el vecino caído o ninguna ruta. El SPF completo corre en un hilo (SpfScheduler),
+# como con SPF_MODE=thread en el nodo.
+import argparse, asyncio, contextlib, io, random, time
+from collections import Counter
+
+from routerlab.algorithms.link_state import LinkState
+from routerlab.core.routing import SpfScheduler
+
+
+def grid_rows(side: int, seed: int):
+    rnd = random.Random(seed)
+    rows = {f"N{i}": {} for i in range(side * side)}
+    for r in range(side):
+        for c in range(side):
+            u = r * side + c
+            for v in ((u + 1) if c + 1 < side else None, (u + side) if r + 1 < side else None):
+                if v is None:
+                    continue
+                w = float(rnd.randint(1, 10))
+                rows[f"N{u}"][f"N{v}"] = w
+                rows[f"N{v}"][f"N{u}"] = w
+    return rows
+
+
+def build(me: str, rows, lfa: bool) -> LinkState:
+    ls = LinkState(lfa=lfa)
+    ls.on_init(me, dict(rows[me]))
+    for n, w in rows[me].items():
+        ls.mark_neighbor_active(n, w)
+    for origin, links in rows.items():
+        if origin != me:
+            ls.lsdb.install_row(origin, 1, links)
+    ls.recompute()
+    return ls
+
+
+async def one_run(rows, me: str, lfa: bool, pps: float):
+    ls = build(me, rows, lfa)
+    usage = Counter(nh for d, nh in ls.fib.table.items() if nh is not None and d != nh)
+    failed = usage.most_common(1)[0][0]
+    affected = [d for d, nh in ls.fib.table.items() if nh == failed and d != failed]
+
+    spf = SpfScheduler(ls, "thread")
+    ls.recompute_hook = spf.request
+    lost = sent = 0
+    t0 = time.perf_counter()
+    last_loss = t0
+
+    # Misma secuencia que RouterNode._expire_neighbor
+    if lfa:
+        ls.fail_over(failed)
+    ls.hold_down_link(failed, 60.0)
+    ls.purge_node_everywhere(failed)
+    spf.request()
+    t_fo = time.perf_counter()
+
+    while spf._inflight is not None and not spf._inflight.done():
+        for d in affected:
+            sent += 1
+            nh = ls.next_hop(d)
+            if nh is None or nh == failed:
+                lost += 1
+                last_loss = time.perf_counter()
+        await asyncio.sleep(1.0 / pps)
+    t_spf = time.perf_counter()
+    # Un último muestreo ya con el SPF instalado
+    for d in affected:
+        sent += 1
+        nh = ls.next_hop(d)
+        if nh is None or nh == failed:
+            lost += 1
+    spf.close()
+    return {
+        "affected": len(affected),
+        "window_ms": (last_loss - t0) * 1000 if lost else 0.0,
+        "failover_ms": (t_fo - t0) * 1000,
+        "spf_ms": (t_spf - t0) * 1000,
+        "lost": lost,
+        "sent": sent,
+    }
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Ventana de pérdida con/sin LFA")
+    ap.add_argument("--side", type=int, default=30)
+    ap.add_argument("--pps", type=float, default=1000.0)
+    ap.add_argument("--runs", type=int, default=5)
+    ap.add_argument("--seed", type=int, default=7)
+    args = ap.parse_args()
+
+    rows = grid_rows(args.side, args.seed)
+    me = f"N{(args.side // 2) * args.side + args.side // 2}"  # nodo central (4 vecinos)
+    print(f"grilla {args.side}x{args.side} ({len(rows)} nodos), origen={me}, pps={args.pps:g}")
+    for lfa in (False, True):
+        # Los diffs de rutas que imprime LinkState no interesan aquí
+        with contextlib.redirect_stdout(io.StringIO()):
+            res = [asyncio.run(one_run(rows, me, lfa, args.pps)) for _ in range(args.runs)]
+        avg = lambda k: sum(r[k] for r in res) / len(res)
+        print(f"  LFA={'on ' if lfa else 'off'} afectados={res[0]['affected']:4d} "
+              f"ventana={avg('window_ms'):8.2f} ms  spf={avg('spf_ms'):8.2f} ms  "
+              f"perdidos={avg('lost'):9.1f}/{avg('sent'):.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,66 @@
+# scripts/bench_multicast.py
+# Mide las operaciones Redis (PUBLISH/s) con y sin multicast a vecinos (REDIS_MULTICAST).
+#
+# Uso: PYTHONPATH=src python scripts/bench_multicast.py [--topo configs/topo-11.txt]
+#          [--names configs/names-redis-11.txt] [--proto lsr] [--secs 20]
+#
+# Levanta todos los nodos en un proceso (routerlab.launcher, conexión compartida) dos veces:
+# unicast (un PUBLISH por vecino) y multicast (un PUBLISH por mensaje a todos los vecinos).
+# Las ops se leen del propio servidor (INFO commandstats, cmdstat_publish) antes y después
+# de cada corrida, así que cuenta lo que Redis procesó de verdad; conviene un Redis sin
+# otro tráfico. También se suman los contadores de los drivers (publish_stats).
+import argparse, asyncio, contextlib, io, os
+
+from routerlab.launcher import build_nodes, run_nodes
+
+
+async def publish_calls(redis) -> int:
+    stats = await redis.info("commandstats")
+    return int(stats.get("cmdstat_publish", {}).get("calls", 0))
+
+
+async def measure(args, multicast: bool):
+    os.environ["REDIS_MULTICAST"] = "1" if multicast else "0"
+    nodes = build_nodes(args.proto, "redis", args.topo, args.names)
+    redis = nodes[0].transport._r
+    before = await publish_calls(redis)
+    task = asyncio.create_task(run_nodes(nodes))
+    await asyncio.sleep(args.secs)
+    task.cancel()
+    with contextlib.suppress(asyncio.CancelledError):
+        await task
+    after = await publish_calls(redis)
+    drivers = [n.transport.publish_stats() for n in nodes]
+    return {
+        "server_publish": after - before,
+        "saved": sum(d["saved"] for d in drivers),
+        "filtered": sum(d["filtered"] for d in drivers),
+        "routes": sum(len(n.alg.fib.table) for n in nodes if hasattr(n.alg, "fib")),
+    }
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--topo", default="configs/topo-11.txt")
+    ap.add_argument("--names", default="configs/names-redis-11.txt")
+    ap.add_argument("--proto", default="lsr", choices=["lsr", "dijkstra", "dvr", "flooding"])
+    ap.add_argument("--secs", type=float, default=20.0)
+    args = ap.parse_args()
+
+    results = {}
+    for multicast in (False, True):
+        with contextlib.redirect_stdout(io.StringIO()):
+            results[multicast] = asyncio.run(measure(args, multicast))
+
+    print(f"{'modo':<10} {'PUBLISH':>9} {'ops/s':>9} {'ahorrados':>10} {'filtrados':>10} {'rutas':>6}")
+    for multicast, r in results.items():
+        name = "multicast" if multicast else "unicast"
+        print(f"{name:<10} {r['server_publish']:>9} {r['server_publish'] / args.secs:>9.1f} "
+              f"{r['saved']:>10} {r['filtered']:>10} {r['routes']:>6}")
+    base = results[False]["server_publish"]
+    if base:
+        print(f"ahorro: {100 * (1 - results[True]['server_publish'] / base):.1f}% de PUBLISH")
+
+
+if __name__ == "__main__":
+    main()
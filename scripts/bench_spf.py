@@ -0,0 +1,76 @@
+# scripts/bench_spf.py
+# Compara los backends de dijkstra(): heap (heapq) vs Dial (buckets) con pesos enteros,
+# y el default "auto" (spf_backend) contra heap.
+#
+# Uso: PYTHONPATH=src python scripts/bench_spf.py [--side 100] [--nodes 10000] [--degree 4] [--wmax 10]
+#
+# Grafos: grilla side×side y grafo aleatorio (nodes, grado medio 'degree'), pesos enteros
+# uniformes en [1, wmax]. Se mide el mejor de --runs SPF desde el nodo 0 y se verifica que
+# los tres devuelvan exactamente las mismas distancias y predecesores.
+import argparse, random, time
+
+from routerlab.algorithms.dijkstra import Graph, dijkstra, spf_backend
+
+
+def grid(side: int, wmax: int, seed: int) -> Graph:
+    rnd = random.Random(seed)
+    g = Graph(undirected=True)
+    for r in range(side):
+        for c in range(side):
+            u = r * side + c
+            if c + 1 < side:
+                g.add_edge(f"N{u}", f"N{u + 1}", rnd.randint(1, wmax))
+            if r + 1 < side:
+                g.add_edge(f"N{u}", f"N{u + side}", rnd.randint(1, wmax))
+    return g
+
+
+def random_graph(n: int, degree: int, wmax: int, seed: int) -> Graph:
+    rnd = random.Random(seed)
+    g = Graph(undirected=True)
+    for i in range(1, n):
+        # árbol aleatorio para asegurar conectividad + aristas extra hasta el grado medio
+        g.add_edge(f"N{i}", f"N{rnd.randrange(i)}", rnd.randint(1, wmax))
+    for _ in range(n * degree // 2 - (n - 1)):
+        u, v = rnd.sample(range(n), 2)
+        g.add_edge(f"N{u}", f"N{v}", rnd.randint(1, wmax))
+    return g
+
+
+def best_of(runs: int, fn):
+    best, out = float("inf"), None
+    for _ in range(runs):
+        t0 = time.perf_counter()
+        out = fn()
+        best = min(best, time.perf_counter() - t0)
+    return best, out
+
+
+def main():
+    ap = argparse.ArgumentParser(description="SPF heap vs Dial")
+    ap.add_argument("--side", type=int, default=100)
+    ap.add_argument("--nodes", type=int, default=10000)
+    ap.add_argument("--degree", type=int, default=4)
+    ap.add_argument("--wmax", type=int, default=10)
+    ap.add_argument("--runs", type=int, default=3)
+    ap.add_argument("--seed", type=int, default=7)
+    args = ap.parse_args()
+
+    cases = [
+        (f"grilla {args.side}x{args.side}", grid(args.side, args.wmax, args.seed)),
+        (f"aleatorio n={args.nodes} grado={args.degree}",
+         random_graph(args.nodes, args.degree, args.wmax, args.seed)),
+    ]
+    for label, g in cases:
+        arcs = sum(len(v) for v in g.adj.values())
+        t_heap, heap = best_of(args.runs, lambda: dijkstra(g, "N0", backend="heap"))
+        t_dial, dial = best_of(args.runs, lambda: dijkstra(g, "N0", backend="dial"))
+        t_auto, auto = best_of(args.runs, lambda: dijkstra(g, "N0"))
+        same = "ok" if heap == dial == auto else "DIFIEREN"
+        print(f"{label:32s} arcos={arcs:7d} pesos=1..{args.wmax}  heap={t_heap * 1000:8.1f} ms  "
+              f"dial={t_dial * 1000:8.1f} ms  x{t_heap / t_dial:4.2f}  "
+              f"auto({spf_backend(g)[0]})={t_auto * 1000:8.1f} ms  x{t_heap / t_auto:4.2f}  resultado={same}")
+
+
+if __name__ == "__main__":
+    main()
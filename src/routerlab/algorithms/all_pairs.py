@@ -0,0 +1,124 @@
+# src/routerlab/algorithms/all_pairs.py
+# Precalcula las tablas de next-hop de TODOS los nodos de una topología (modo batch)
+#
+# Uso:
+#   PYTHONPATH=src python -m routerlab.algorithms.all_pairs configs/topo-11.txt -o nexthops.jsonl
+#   NEXTHOP_TABLE=nexthops.jsonl make run PROTO=dijkstra ...
+#
+# Formato (JSON por líneas, compacto):
+#   línea 1: {"type":"nexthops","version":2,"digest":...,"undirected":...,"nodes":[...],
+#             "offsets":[...]}
+#   línea i+2: fila del nodo nodes[i] -> [[next hop por destino], [costo por destino]]
+#              next hop = índice en 'nodes' (-1 = propio o inalcanzable), costo null = inf
+#   offsets[i]: byte donde empieza la fila de nodes[i], contado desde el fin del encabezado
+# Cada nodo lee el encabezado y hace seek() a su línea: no lee las filas ajenas.
+from __future__ import annotations
+import argparse, json, os, time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from routerlab.algorithms.dijkstra import INF, Arcs, graph_arcs, load_graph_from_topo, spf_routes
+from routerlab.core.topology import topology_digest
+
+FORMAT_VERSION = 2
+
+# Fila de un nodo: (dist, next_hop) con claves str
+Row = Tuple[Dict[str, float], Dict[str, Optional[str]]]
+
+def topo_digest(topo_path: str | Path) -> str:
+    """Huella de la topología (config canónica): una tabla vieja no se usa por error."""
+    return topology_digest(topo_path)
+
+# Los arcos se envían una sola vez a cada proceso (initializer), no en cada tarea
+_ARCS: Arcs = ()
+
+def _init_worker(arcs: Arcs) -> None:
+    global _ARCS
+    _ARCS = arcs
+
+def _row(source: str) -> Tuple[str, Dict[str, float], Dict[str, Optional[str]]]:
+    dist, _, nh, _ = spf_routes(_ARCS, source)
+    return source, dist, nh
+
+def all_pairs(arcs: Arcs, sources: Iterable[str], workers: Optional[int] = None) -> Dict[str, Row]:
+    """
+    Un SPF por origen. Con workers > 1 se reparten en un ProcessPoolExecutor
+    (por defecto os.cpu_count()); con workers=1 se calcula en el proceso actual.
+    """
+    sources = list(sources)
+    workers = workers or os.cpu_count() or 1
+    if workers <= 1 or len(sources) <= 1:
+        _init_worker(arcs)
+        rows = map(_row, sources)
+        return {s: (dist, nh) for s, dist, nh in rows}
+    chunk = max(1, len(sources) // (workers * 4))
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(arcs,)) as pool:
+        return {s: (dist, nh) for s, dist, nh in pool.map(_row, sources, chunksize=chunk)}
+
+def write_table(path: str | Path, rows: Dict[str, Row], digest: str, undirected: bool = True) -> None:
+    nodes: List[str] = sorted(set(rows) | {d for dist, _ in rows.values() for d in dist})
+    index = {n: i for i, n in enumerate(nodes)}
+    sep = (",", ":")
+    lines: List[bytes] = []
+    offsets: List[int] = []
+    pos = 0
+    for n in nodes:
+        dist, nh = rows.get(n, ({n: 0.0}, {n: None}))
+        hops = [index[nh[d]] if nh.get(d) is not None else -1 for d in nodes]
+        costs = [None if dist.get(d, INF) == INF else dist[d] for d in nodes]
+        line = (json.dumps([hops, costs], separators=sep) + "\n").encode("utf-8")
+        offsets.append(pos)
+        lines.append(line)
+        pos += len(line)
+    # Offsets relativos al fin del encabezado: no dependen de su propio largo
+    header = {"type": "nexthops", "version": FORMAT_VERSION, "digest": digest,
+              "undirected": undirected, "nodes": nodes, "offsets": offsets}
+    tmp = Path(f"{path}.tmp")
+    with open(tmp, "wb") as f:
+        f.write((json.dumps(header, separators=sep) + "\n").encode("utf-8"))
+        f.writelines(lines)
+    os.replace(tmp, path)
+
+def load_row(path: str | Path, me: str, digest: Optional[str] = None,
+             undirected: Optional[bool] = None) -> Optional[Row]:
+    """
+    Fila de 'me' (dist, next_hop). None si el archivo no corresponde a la topología
+    ('digest'), al modo de grafo ('undirected') o no incluye a 'me'.
+    """
+    with open(path, "rb") as f:
+        header = json.loads(f.readline())
+        if header.get("type") != "nexthops" or header.get("version") != FORMAT_VERSION:
+            return None
+        if digest is not None and header.get("digest") != digest:
+            return None
+        if undirected is not None and header.get("undirected") != undirected:
+            return None
+        nodes: List[str] = header["nodes"]
+        try:
+            pos = nodes.index(me)
+        except ValueError:
+            return None
+        f.seek(f.tell() + header["offsets"][pos])
+        hops, costs = json.loads(f.readline())
+    dist = {d: (INF if c is None else float(c)) for d, c in zip(nodes, costs)}
+    nh = {d: (None if h < 0 else nodes[h]) for d, h in zip(nodes, hops)}
+    return dist, nh
+
+def main() -> None:
+    ap = argparse.ArgumentParser(prog="routerlab.algorithms.all_pairs",
+                                 description="Precalcula las tablas de next-hop de todos los nodos")
+    ap.add_argument("topo", help="ruta a topo-*.txt")
+    ap.add_argument("-o", "--out", default="nexthops.jsonl", help="archivo de salida")
+    ap.add_argument("--workers", type=int, default=None, help="procesos (default: CPUs)")
+    ap.add_argument("--directed", action="store_true", help="no duplicar aristas (grafo dirigido)")
+    args = ap.parse_args()
+
+    t0 = time.perf_counter()
+    g = load_graph_from_topo(args.topo, undirected=not args.directed)
+    rows = all_pairs(graph_arcs(g), sorted(str(n) for n in g.nodes()), args.workers)
+    write_table(args.out, rows, topo_digest(args.topo), undirected=not args.directed)
+    print(f"{len(rows)} filas -> {args.out} ({(time.perf_counter() - t0) * 1000:.1f} ms)")
+
+if __name__ == "__main__":
+    main()
@@ -4,14 +4,19 @@
 #   1) clases y funciones de grafo
 #   2) dijkstra(), reconstrucción de rutas y next-hop
 #   3) clase Dijkstra con interfaz estilo RoutingAlgorithm (on_init/next_hop/etc.)
+#   4) modo perezoso: A* con cotas de landmarks (ALT) por destino, bajo demanda
 # - Carga la topología desde configs/topo-*.txt (JSON con {"type":"topo","config":{...}})
+#   o desde su versión compilada (routerlab.core.topology)
 # - Útil como módulo local (standalone) y como bloque dentro de LSR en el futuro.
 
 from __future__ import annotations
 from dataclasses import dataclass
-from typing import Dict, Hashable, Iterable, List, Tuple, Optional
+from typing import Callable, Dict, Hashable, Iterable, List, Set, Tuple, Optional
 from pathlib import Path
-import heapq, json
+import heapq
+
+from routerlab.core.tables import Fib
+from routerlab.core.topology import load_topology
 
 # -----------------------
 #   Tipos y estructura
@@ -19,6 +24,8 @@ import heapq, json
 
 Node = Hashable
 
+INF = float('inf')
+
 @dataclass(frozen=True)
 class Edge:
     u: Node
@@ -55,23 +62,76 @@ class Graph:
 #   Core de Dijkstra
 # -----------------------
 
-def dijkstra(graph: Graph, source: Node) -> Tuple[Dict[Node, float], Dict[Node, Optional[Node]]]:
+# Dial solo conviene con pesos enteros chicos: hay max_peso + 1 buckets y se recorre
+# cada distancia entera hasta la más lejana (con pesos grandes gana heapq).
+#   DIAL_MAX_WEIGHT: cota dura para backend="dial"
+#   "auto" elige Dial solo donde lo medido en scripts/bench_spf.py muestra ganancia:
+#   grafos de al menos DIAL_AUTO_MIN_ARCS arcos con pesos <= DIAL_AUTO_MAX_WEIGHT. En las
+#   topologías del laboratorio (decenas de arcos) heap es más rápido.
+DIAL_MAX_WEIGHT = 256
+DIAL_AUTO_MAX_WEIGHT = 16
+DIAL_AUTO_MIN_ARCS = 20000
+
+def spf_backend(graph: Graph, backend: str = "auto") -> Tuple[str, Optional[int]]:
+    """
+    Backend efectivo para 'graph': ("heap", None) o ("dial", peso máximo). El grafo se
+    recorre a lo sumo una vez para acotar los pesos.
+    """
+    if backend == "heap":
+        return "heap", None
+    if backend == "dial":
+        bound = int_weight_bound(graph)
+        if bound is None:
+            raise ValueError("Dial requiere pesos enteros no negativos")
+        return "dial", bound
+    if backend != "auto":
+        raise ValueError(f"backend de Dijkstra no soportado: {backend}")
+    if sum(len(nbrs) for nbrs in graph.adj.values()) < DIAL_AUTO_MIN_ARCS:
+        return "heap", None
+    bound = int_weight_bound(graph, DIAL_AUTO_MAX_WEIGHT)
+    return ("heap", None) if bound is None else ("dial", bound)
+
+def dijkstra(graph: Graph, source: Node,
+             backend: str = "auto") -> Tuple[Dict[Node, float], Dict[Node, Optional[Node]]]:
     """
     Ejecuta Dijkstra desde 'source'.
     Retorna:
       - dist: distancia mínima a cada nodo (inf si inalcanzable)
       - prev: predecesor inmediato en la ruta más corta (None si origen o inalcanzable)
+    backend: "heap" (heapq), "dial" (buckets, pesos enteros >= 0) o "auto" (ver
+    spf_backend: Dial solo en grafos grandes con pesos enteros chicos, si no heap).
+    Ambos dan el mismo resultado (mismo tie_break).
     """
+    backend, bound = spf_backend(graph, backend)
+    if backend == "dial":
+        return _dijkstra_dial(graph, source, bound)
+    return _dijkstra_heap(graph, source)
+
+def int_weight_bound(graph: Graph, limit: int = DIAL_MAX_WEIGHT) -> Optional[int]:
+    """Peso máximo si todos son enteros en [0, limit]; None si alguno no lo es."""
+    top = 0
+    for nbrs in graph.adj.values():
+        for _, w in nbrs:
+            if not (0 <= w <= limit) or w != int(w):
+                return None
+            if w > top:
+                top = int(w)
+    return top
+
+def _init_dist(graph: Graph, source: Node) -> Tuple[Dict[Node, float], Dict[Node, Optional[Node]]]:
     dist: Dict[Node, float] = {u: float('inf') for u in graph.nodes()}
     prev: Dict[Node, Optional[Node]] = {u: None for u in graph.nodes()}
 
     if source not in dist:
         # Si el origen no está en el grafo, lo añadimos sin vecinos
-        dist[source] = 0.0
         prev[source] = None
         graph.adj.setdefault(source, [])
 
     dist[source] = 0.0
+    return dist, prev
+
+def _dijkstra_heap(graph: Graph, source: Node) -> Tuple[Dict[Node, float], Dict[Node, Optional[Node]]]:
+    dist, prev = _init_dist(graph, source)
     pq: List[Tuple[float, Node]] = [(0.0, source)]
 
     while pq:
@@ -87,6 +147,106 @@ def dijkstra(graph: Graph, source: Node) -> Tuple[Dict[Node, float], Dict[Node,
 
     return dist, prev
 
+def _dijkstra_dial(graph: Graph, source: Node,
+                   max_weight: int) -> Tuple[Dict[Node, float], Dict[Node, Optional[Node]]]:
+    """
+    Dial: cola circular de max_weight + 1 buckets indexados por distancia entera.
+    Todo lo pendiente está en [d, d + max_weight], así que el bucket d % nb solo contiene
+    nodos a distancia d (o entradas viejas de nodos ya asentados, que se saltean).
+    Un empate solo cambia 'prev' (no hace falta re-encolar: la distancia no cambia).
+    """
+    dist, prev = _init_dist(graph, source)
+    nb = max_weight + 1
+    buckets: List[List[Node]] = [[] for _ in range(nb)]
+    buckets[0].append(source)
+    pending = 1
+    cur = 0
+
+    while pending:
+        bucket = buckets[cur % nb]
+        while not bucket:
+            cur += 1
+            bucket = buckets[cur % nb]
+        u = bucket.pop()
+        pending -= 1
+        if dist[u] != cur:
+            continue
+        for v, w in graph.neighbors(u):
+            alt = cur + w
+            dv = dist[v]
+            if alt < dv:
+                dist[v] = alt
+                prev[v] = u
+                buckets[int(alt) % nb].append(v)
+                pending += 1
+            elif alt == dv and tie_break(u, prev[v]):
+                prev[v] = u
+
+    return dist, prev
+
+def astar(graph: Graph, source: Node, target: Node,
+          h: Callable[[Node], float]) -> Tuple[Dict[Node, float], Dict[Node, Optional[Node]], int]:
+    """
+    Búsqueda dirigida source -> target: Dijkstra ordenado por g(v) + h(v).
+    'h' debe ser una cota inferior consistente de dist(v, target) (con h = 0 es un
+    Dijkstra que se detiene al asentar 'target'). Todo nodo asentado tiene su distancia
+    exacta en 'dist'. Retorna (dist, prev, cantidad de nodos asentados).
+    """
+    dist: Dict[Node, float] = {source: 0.0}
+    prev: Dict[Node, Optional[Node]] = {source: None}
+    done: Set[Node] = set()
+    pq: List[Tuple[float, float, Node]] = [(h(source), 0.0, source)]
+
+    while pq:
+        _, du, u = heapq.heappop(pq)
+        if u in done or du > dist[u]:
+            continue
+        done.add(u)
+        if u == target:
+            break
+        for v, w in graph.neighbors(u):
+            if v in done:
+                continue
+            alt = du + w
+            dv = dist.get(v, INF)
+            if alt < dv or (alt == dv and tie_break(u, prev.get(v))):
+                dist[v] = alt
+                prev[v] = u
+                heapq.heappush(pq, (alt + h(v), alt, v))
+
+    return {n: dist[n] for n in done}, prev, len(done)
+
+def reversed_graph(graph: Graph) -> Graph:
+    """Grafo con los arcos invertidos (distancias 'hacia' un nodo en grafos dirigidos)."""
+    if graph.undirected:
+        return graph
+    r = Graph(undirected=False)
+    for u, nbrs in graph.adj.items():
+        r.adj.setdefault(u, [])
+        for v, w in nbrs:
+            r.add_edge(v, u, w)
+    return r
+
+def select_landmarks(graph: Graph, source: Node, k: int) -> Dict[Node, Dict[Node, float]]:
+    """
+    Landmarks por 'farthest point': el primero es el nodo más lejano a 'source' y cada
+    siguiente el más lejano a los ya elegidos (buena cobertura de direcciones).
+    Retorna landmark -> distancias desde él (en orden de elección).
+    """
+    chosen: Dict[Node, Dict[Node, float]] = {}
+    if k <= 0:
+        return chosen
+    nearest = dijkstra(graph, source)[0]
+    for _ in range(k):
+        cand = [(d, str(n), n) for n, d in nearest.items() if 0 < d < INF and n not in chosen]
+        if not cand:
+            break
+        lm = max(cand)[2]
+        chosen[lm] = dijkstra(graph, lm)[0]
+        for n, d in chosen[lm].items():
+            nearest[n] = min(nearest.get(n, INF), d)
+    return chosen
+
 def tie_break(candidate_prev: Optional[Node], current_prev: Optional[Node]) -> bool:
     """
     Criterio simple de desempate (opcional): prefiere el predecesor lexicográficamente menor
@@ -151,6 +311,116 @@ def routing_from(graph: Graph, source: Node) -> Dict[str, Dict[Node, Optional[No
     next_hop = build_next_hops(prev, source)
     return {"dist": dist, "prev": prev, "next_hop": next_hop}
 
+# -----------------------
+#   SPF sobre snapshots inmutables
+# -----------------------
+
+# Snapshot inmutable del grafo: tupla de arcos dirigidos (u, v, w)
+Arcs = Tuple[Tuple[str, str, float], ...]
+# Primeros saltos de igual costo por destino (solo destinos con más de uno)
+Paths = Dict[str, Tuple[str, ...]]
+SpfResult = Tuple[Dict[str, float], Dict[str, Optional[str]], Dict[str, Optional[str]], Paths]
+
+def graph_arcs(graph: Graph) -> Arcs:
+    """Congela la lista de adyacencia de 'graph' en una tupla de arcos (picklable)."""
+    return tuple(
+        (str(u), str(v), float(w))
+        for u, nbrs in graph.adj.items()
+        for v, w in nbrs
+    )
+
+def ecmp_first_hops(arcs: Arcs, source: str, dist: Dict[str, float]) -> Paths:
+    """
+    Conjunto de primeros saltos de igual costo (ECMP) hacia cada destino.
+    Recorre los nodos por distancia creciente: v hereda los primeros saltos de todo u
+    con dist(u) + w(u, v) == dist(v) (si u es el origen, el primer salto es v mismo).
+    dijkstra() sigue eligiendo un único predecesor (tie_break); esto no lo altera.
+    Solo se devuelven destinos con más de un primer salto; se ordenan para ser estables.
+    """
+    into: Dict[str, List[Tuple[str, float]]] = {}
+    for u, v, w in arcs:
+        into.setdefault(v, []).append((u, w))
+    hops: Dict[str, Set[str]] = {source: set()}
+    for v in sorted((n for n, d in dist.items() if d != INF and n != source), key=dist.__getitem__):
+        acc: Set[str] = set()
+        for u, w in into.get(v, ()):
+            du = dist.get(u, INF)
+            if u not in hops or abs(du + w - dist[v]) > 1e-9:
+                continue
+            acc |= {v} if u == source else hops[u]
+        hops[v] = acc
+    return {d: tuple(sorted(h)) for d, h in hops.items() if len(h) > 1}
+
+def spf_routes(arcs: Arcs, source: str) -> SpfResult:
+    """
+    Corre Dijkstra sobre un snapshot de arcos y arma la tabla de next-hop.
+    Función pura de módulo: se puede ejecutar en un hilo o en otro proceso.
+    Retorna (dist, prev, next_hop, paths) con claves str; 'paths' trae los destinos
+    con varios primeros saltos de igual costo (el de next_hop es uno de ellos).
+    """
+    g = Graph(undirected=False)
+    for u, v, w in arcs:
+        g.add_edge(u, v, w)
+    dist, prev = dijkstra(g, source)
+    prev_s: Dict[str, Optional[str]] = {str(k): (None if v is None else str(v)) for k, v in prev.items()}
+    nh: Dict[str, Optional[str]] = {}
+    for dest in prev_s.keys():
+        if dest == source:
+            nh[dest] = None
+            continue
+        hop = _first_hop(prev_s, source, dest)
+        nh[dest] = hop if hop is None else str(hop)
+    dist_s = {str(k): d for k, d in dist.items()}
+    return dist_s, prev_s, nh, ecmp_first_hops(arcs, source, dist_s)
+
+# Respaldo por destino: (vecino alternativo, costo total por ese vecino)
+Backups = Dict[str, Tuple[str, float]]
+LfaResult = Tuple[Dict[str, float], Dict[str, Optional[str]], Dict[str, Optional[str]], Paths, Backups]
+
+def lfa_backups(arcs: Arcs, source: str, dist: Dict[str, float],
+                next_hop: Dict[str, Optional[str]]) -> Backups:
+    """
+    Loop-free alternates (RFC 5286) por destino.
+    Un vecino N (distinto del primario P) es LFA para D si
+        dist(N, D) < dist(N, S) + dist(S, D)
+    es decir, N no devuelve el tráfico a S. Entre los candidatos se prefieren los que
+    además protegen al nodo P (dist(N, D) < dist(N, P) + dist(P, D)) y luego el menor
+    costo c(S, N) + dist(N, D). Requiere un SPF desde cada vecino de 'source'.
+    """
+    g = Graph(undirected=False)
+    for u, v, w in arcs:
+        g.add_edge(u, v, w)
+    link_cost: Dict[str, float] = {}
+    for v, w in g.adj.get(source, []):
+        link_cost[v] = min(w, link_cost.get(v, INF))
+    from_nbr: Dict[str, Dict[str, float]] = {n: dijkstra(g, n)[0] for n in link_cost}
+
+    backups: Backups = {}
+    for dest, primary in next_hop.items():
+        if primary is None or dest == source:
+            continue
+        best: Optional[Tuple[bool, float, str]] = None
+        for n, c in link_cost.items():
+            if n == primary:
+                continue
+            dn = from_nbr[n]
+            d_nd = dn.get(dest, INF)
+            if not d_nd < dn.get(source, INF) + dist.get(dest, INF):
+                continue
+            dp = from_nbr.get(primary, {})
+            node_safe = dest == primary or d_nd < dn.get(primary, INF) + dp.get(dest, INF)
+            cand = (not node_safe, c + d_nd, n)
+            if best is None or cand < best:
+                best = cand
+        if best is not None:
+            backups[dest] = (best[2], best[1])
+    return backups
+
+def spf_routes_lfa(arcs: Arcs, source: str) -> LfaResult:
+    """spf_routes() + respaldos LFA por destino (también apto para un executor)."""
+    dist, prev, nh, paths = spf_routes(arcs, source)
+    return dist, prev, nh, paths, lfa_backups(arcs, source, dist, nh)
+
 # -----------------------
 #   Loader de topología
 # -----------------------
@@ -162,12 +432,10 @@ def load_graph_from_topo(path: str | Path, undirected: bool = True) -> Graph:
 
     También acepta pesos por arista usando dict:
     { "type":"topo", "config": { "A": {"B": 3, "C": 5}, "B": {"A": 3}, "C": {} } }
-    """
-    p = Path(path)
-    data = json.loads(p.read_text(encoding="utf-8"))
-    assert data.get("type") == "topo", "topo inválido: se espera {'type':'topo','config':{...}}"
 
-    cfg = data.get("config", {})
+    O un artefacto compilado con routerlab.core.topology (se detecta por los bytes mágicos).
+    """
+    cfg = load_topology(path)
     g = Graph(undirected=undirected)
 
     for u, neigh in cfg.items():
@@ -191,31 +459,89 @@ class Dijkstra:
       - on_init(me, neighbors): carga topo y calcula next_hop desde 'me'
       - next_hop(dest): devuelve el primer salto hacia 'dest'
       - on_hello/on_info/build_info: no-ops para Dijkstra local (sin intercambio de estado)
+
+    mode="lazy": no se corre el SPF completo. La primera consulta a un destino lanza un
+    A* y se memoriza la ruta y todos sus prefijos (subcaminos de un camino mínimo también
+    son mínimos). set_link() invalida solo los destinos afectados. Conviene cuando cada
+    nodo habla con pocos destinos de una topología grande.
+    landmarks=k > 0 agrega cotas ALT: cuestan k + 1 SPF completos la primera vez (más que
+    un SPF eager), así que solo rinden con muchas consultas sobre la misma topología. Se
+    calculan una vez por grafo; una baja de costo no las rehace sino que las afloja.
+
+    table_path: tabla precalculada por all_pairs (ver all_pairs.main). Si corresponde a
+    la topología, on_init() instala la fila de 'me' sin correr SPF (table_loaded=True).
     """
     name = "dijkstra"
 
-    def __init__(self, topo_path: Optional[str] = None, undirected: bool = True) -> None:
+    def __init__(self, topo_path: Optional[str] = None, undirected: bool = True,
+                 mode: str = "eager", landmarks: int = 0,
+                 table_path: Optional[str] = None, spf_cache=None) -> None:
+        if mode not in ("eager", "lazy"):
+            raise ValueError(f"modo Dijkstra no soportado: {mode}")
         self.me: str = ""
         self.neighbors: list[str] = []
         self._topo_path = topo_path
+        self._table_path = table_path
+        self.table_loaded = False
         self._undirected = undirected
-        self._graph: Graph = Graph(undirected=self._undirected)
+        self._graph_obj: Optional[Graph] = Graph(undirected=self._undirected)
         self._prev: Dict[str, Optional[str]] = {}
-        self._next: Dict[str, Optional[str]] = {}
+        self._dist: Dict[str, float] = {}
+        self.fib = Fib()
+        # Cache de resultados (routerlab.core.spf_cache.SpfCache); None = sin cache
+        self.spf_cache = spf_cache
+        self.mode = mode
+        self.lazy = mode == "lazy"
+        self._k = max(0, int(landmarks))
+        # Modo perezoso: destino -> (costo, ruta completa desde me); ruta vacía = inalcanzable
+        self._memo: Dict[str, Tuple[float, Tuple[str, ...]]] = {}
+        # Tablas ALT: (landmarks, dist desde cada L, dist hacia cada L); None = por calcular
+        self._lm: Optional[Tuple[List[str], Dict[str, Dict[str, float]], Dict[str, Dict[str, float]]]] = None
+        self._lm_graph: Optional[Graph] = None   # grafo sobre el que se calcularon
+        # Suma de las bajas de costo desde que se calcularon: ninguna distancia bajó más que
+        # eso, así que (cota - slack) sigue siendo admisible sin rehacer las tablas
+        self._lm_slack = 0.0
+        self.stats: Dict[str, int] = {"hits": 0, "misses": 0, "settled": 0, "invalidated": 0}
 
     # ---- Interfaz tipo RoutingAlgorithm ----
     def on_init(self, me: str, neighbors: list[str]) -> None:
         self.me = me
         self.neighbors = neighbors[:]
-        # Cargar grafo completo desde topología
-        if self._topo_path:
-            self._graph = load_graph_from_topo(self._topo_path, undirected=self._undirected)
-        else:
-            # Grafo mínimo con solo el nodo me (útil para pruebas)
-            self._graph = Graph(undirected=self._undirected)
-            self._graph.adj.setdefault(self.me, [])
+        # El grafo se carga al primer uso: con la fila precalculada no hace falta al iniciar
+        self._graph_obj = None
+        if not self.lazy and self._load_table():
+            return
         self.recompute()
 
+    @property
+    def _graph(self) -> Graph:
+        if self._graph_obj is None:
+            # Cargar grafo completo desde topología
+            if self._topo_path:
+                self._graph_obj = load_graph_from_topo(self._topo_path, undirected=self._undirected)
+            else:
+                # Grafo mínimo con solo el nodo me (útil para pruebas)
+                self._graph_obj = Graph(undirected=self._undirected)
+                self._graph_obj.adj.setdefault(self.me, [])
+        return self._graph_obj
+
+    def _load_table(self) -> bool:
+        """Instala la fila de 'me' desde la tabla precalculada (si es de esta topología)."""
+        if not (self._table_path and self._topo_path):
+            return False
+        from routerlab.algorithms.all_pairs import load_row, topo_digest
+        try:
+            row = load_row(self._table_path, self.me, topo_digest(self._topo_path), self._undirected)
+        except (OSError, ValueError, KeyError):
+            row = None
+        if row is None:
+            return False
+        dist, nh = row
+        # Sin 'prev': route() no reconstruye caminos de una fila cargada (solo next hop/costo)
+        self.install_routes(dist, {}, nh)
+        self.table_loaded = True
+        return True
+
     def on_hello(self, neighbor: str, metric: float = 1.0) -> None:
         # Dijkstra local no usa HELLO; ignorar
         return
@@ -225,22 +551,164 @@ class Dijkstra:
         return
 
     def recompute(self) -> None:
+        if self.lazy:
+            # Todo lo memorizado queda obsoleto; las rutas se recalculan al consultarlas
+            self.stats["invalidated"] += len(self._memo)
+            self._memo.clear()
+            if self._lm_graph is not self._graph_obj:
+                # Las tablas ALT dependen solo del grafo (set_link las mantiene al día)
+                self._lm = None
+            self._publish_memo()
+            return
         # Ejecuta dijkstra y construye tabla de next-hops
-        dist, prev = dijkstra(self._graph, self.me)
-        # Guardamos prev como strings (coherencia con el resto del framework)
-        self._prev = {str(k): (None if v is None else str(v)) for k, v in prev.items()}
-        next_hop: Dict[str, Optional[str]] = {}
-        for dest in self._prev.keys():
-            if dest == self.me:
-                next_hop[dest] = None
-                continue
-            hop = _first_hop(self._prev, self.me, dest)
-            next_hop[dest] = hop if hop is None else str(hop)
-        self._next = next_hop
+        arcs = self.spf_snapshot()
+        if self.spf_cache is not None:
+            self.install_routes(*self.spf_cache.compute(arcs, self.me, spf_routes))
+        else:
+            self.install_routes(*spf_routes(arcs, self.me))
 
-    def next_hop(self, dest: str) -> Optional[str]:
-        return self._next.get(dest)
+    def spf_snapshot(self) -> Arcs:
+        """Snapshot inmutable del grafo (tupla de arcos) para correr SPF fuera del event loop."""
+        return graph_arcs(self._graph)
+
+    def install_routes(self, dist: Dict[str, float], prev: Dict[str, Optional[str]],
+                       next_hop: Dict[str, Optional[str]], paths: Optional[Paths] = None) -> None:
+        # Guardamos prev como strings (coherencia con el resto del framework)
+        self._prev = prev
+        self._dist = dist
+        self.fib.publish(next_hop, dist, paths=paths)
+
+    def next_hop(self, dest: str, flow: Optional[int] = None) -> Optional[str]:
+        """Primer salto hacia 'dest'; con 'flow' (ver flow_hash) se reparte entre rutas ECMP."""
+        if self.lazy:
+            self._query(dest)
+        return self.fib.lookup(dest, flow)
+
+    def route(self, dest: str) -> List[str]:
+        """Ruta completa me -> dest (lista vacía si es inalcanzable)."""
+        if self.lazy:
+            return list(self._query(dest)[1])
+        return reconstruct_path(self._prev, self.me, dest)
+
+    def distance(self, dest: str) -> float:
+        """Costo mínimo me -> dest (inf si es inalcanzable)."""
+        if self.lazy:
+            return self._query(dest)[0]
+        return self._dist.get(dest, INF)
 
     def build_info(self) -> Dict[str, object]:
         # Dijkstra local no publica estado
-        return {}
\ No newline at end of file
+        return {}
+
+    # ---- Cambios de topología ----
+    def set_link(self, u: str, v: str, w: Optional[float]) -> None:
+        """
+        Cambia el costo del enlace u-v (w=None lo elimina; si no existía, lo agrega).
+        En modo perezoso se invalidan solo los destinos que pueden cambiar:
+          - sube/desaparece: los que tienen el enlace en su ruta (el resto sigue siendo óptimo)
+          - baja/aparece: los que podrían mejorar pasando por él según las cotas ALT
+            (dist(me, u) + w + dist(v, d) < costo actual). Una baja solo afloja las cotas
+            (slack); un enlace nuevo sí obliga a rehacer las tablas ALT.
+        """
+        old = self._weight(u, v)
+        self._set_arc(u, v, w)
+        if self._undirected:
+            self._set_arc(v, u, w)
+        if not self.lazy:
+            self.recompute()
+            return
+        if w == old:
+            return
+        if w is None or (old is not None and w > old):
+            stale = [d for d, (_, path) in self._memo.items() if self._uses(path, u, v)]
+        else:
+            ends = [(u, v), (v, u)] if self._undirected else [(u, v)]
+            stale = [
+                d for d, (cost, _) in self._memo.items()
+                if any(self._lower_bound(self.me, a) + float(w) + self._lower_bound(b, d) < cost - 1e-9
+                       for a, b in ends)
+            ]
+            if old is None:
+                self._lm = None   # enlace nuevo: ninguna cota acotada sigue valiendo
+            else:
+                self._lm_slack += old - float(w)
+        for d in stale:
+            del self._memo[d]
+        self.stats["invalidated"] += len(stale)
+        if stale:
+            self._publish_memo()
+
+    def _weight(self, u: str, v: str) -> Optional[float]:
+        ws = [w for n, w in self._graph.neighbors(u) if n == v]
+        return min(ws) if ws else None
+
+    def _set_arc(self, u: str, v: str, w: Optional[float]) -> None:
+        nbrs = [(n, c) for n, c in self._graph.adj.get(u, []) if n != v]
+        if w is not None:
+            nbrs.append((v, float(w)))
+        self._graph.adj[u] = nbrs
+        self._graph.adj.setdefault(v, [])
+
+    def _uses(self, path: Tuple[str, ...], u: str, v: str) -> bool:
+        for a, b in zip(path, path[1:]):
+            if (a, b) == (u, v) or (self._undirected and (a, b) == (v, u)):
+                return True
+        return False
+
+    # ---- Modo perezoso ----
+    def _landmarks(self):
+        if self._lm is None:
+            frm = select_landmarks(self._graph, self.me, self._k)
+            marks = list(frm)
+            back = reversed_graph(self._graph)
+            to = frm if back is self._graph else {lm: dijkstra(back, lm)[0] for lm in marks}
+            self._lm = (marks, frm, to)
+            self._lm_graph = self._graph
+            self._lm_slack = 0.0
+        return self._lm
+
+    def _lower_bound(self, a: str, b: str) -> float:
+        """Cota ALT de dist(a, b) por desigualdad triangular con cada landmark."""
+        if self._lm is None:
+            return 0.0
+        marks, frm, to = self._lm
+        best = 0.0
+        for lm in marks:
+            fa, fb = frm[lm].get(a, INF), frm[lm].get(b, INF)
+            if fa < INF and fb < INF:
+                best = max(best, fb - fa)      # d(L, b) <= d(L, a) + d(a, b)
+            ta, tb = to[lm].get(a, INF), to[lm].get(b, INF)
+            if ta < INF and tb < INF:
+                best = max(best, ta - tb)      # d(a, L) <= d(a, b) + d(b, L)
+        return max(0.0, best - self._lm_slack)
+
+    def _query(self, dest: str) -> Tuple[float, Tuple[str, ...]]:
+        hit = self._memo.get(dest)
+        if hit is not None:
+            self.stats["hits"] += 1
+            return hit
+        self.stats["misses"] += 1
+        if dest == self.me:
+            entry = (0.0, (self.me,))
+            self._memo[dest] = entry
+            return entry
+        self._landmarks()
+        dist, prev, settled = astar(self._graph, self.me, dest, lambda n: self._lower_bound(n, dest))
+        self.stats["settled"] += settled
+        path = reconstruct_path(prev, self.me, dest) if dest in dist else []
+        if path:
+            # Cada prefijo es a su vez un camino mínimo: se memoriza también
+            for i in range(1, len(path)):
+                self._memo.setdefault(str(path[i]), (dist[path[i]], tuple(str(n) for n in path[:i + 1])))
+        else:
+            self._memo[dest] = (INF, ())
+        self._publish_memo()
+        return self._memo[dest]
+
+    def _publish_memo(self) -> None:
+        table: Dict[str, Optional[str]] = {self.me: None}
+        costs: Dict[str, float] = {self.me: 0.0}
+        for d, (cost, path) in self._memo.items():
+            table[d] = path[1] if len(path) > 1 else None
+            costs[d] = cost
+        self.fib.publish(table, costs)
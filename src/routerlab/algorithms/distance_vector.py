@@ -1,59 +1,369 @@
 # Distance Vector (minimo)
-from typing import Dict, Any, Optional
+import time
+from typing import Dict, Any, Iterable, List, Optional, Set
+import numpy as np
+from routerlab.core.tables import Fib
+
+# Costo a partir del cual un destino se considera inalcanzable (corta el count-to-infinity)
+DV_INFINITY = 1024.0
+# Segundos que un destino ACTIVO espera respuestas antes de darlas por "inalcanzable"
+DV_SIA_TIMEOUT = 15.0
 
 class DistanceVector:
+    """
+    Bellman-Ford distribuido sobre una tabla indexada:
+      - _adv[d, j]: costo anunciado por el vecino j hacia el destino d (inf si no lo anuncia);
+        destinos y vecinos se indexan en _dest_idx/_nbr_idx y la matriz crece por duplicación
+      - recompute(): solo para los destinos tocados desde la última vez,
+        min_j(cost[j] + _adv[d, j]) vectorizado con NumPy. Un cambio en el costo de un
+        enlace toca todos los destinos. Se parte de cero en cada destino, así que los
+        aumentos de costo y los retiros se reflejan.
+      - vector_for(vecino): split horizon con poison reverse (las rutas que salen por ese
+        vecino se le anuncian como inalcanzables: None en el wire)
+      - take_changes(): destinos cuyo costo/next hop cambió desde el último envío
+        (el nodo los manda como INFO delta)
+    mode="dual" agrega sucesores factibles al estilo DUAL (EIGRP):
+      - FD[d] (distancia factible): menor distancia propia hacia d desde la última vez
+        que el destino estuvo PASIVO
+      - un vecino j es sucesor factible si su distancia anunciada adv[d, j] < FD[d]
+        (no puede estar enrutando a través de mí): se conmuta localmente, sin avisar
+      - si no queda ninguno, d pasa a ACTIVO: se envía un query a los vecinos vivos y
+        la ruta se congela hasta recibir todas las respuestas; recién ahí se elige el
+        mejor sin restricción, FD se reinicia y se responde a quien preguntó
+      - stuck-in-active: si una respuesta no llega en sia_timeout s (query o reply
+        perdidos), expire_active() la da por recibida como "inalcanzable" y cierra el
+        cómputo con lo que hay
+    """
     name = "dvr"
 
-    def __init__(self):
+    def __init__(self, infinity: float = DV_INFINITY, mode: str = "bf",
+                 sia_timeout: float = DV_SIA_TIMEOUT):
+        if mode not in ("bf", "dual"):
+            raise ValueError(f"modo DV no soportado: {mode}")
+        self.mode = mode
         self.me: str = ""
         self.neighbors: list[str] = []
         self.dv: Dict[str, Dict[str, Any]] = {}      # destino
-        self.recv: Dict[str, Dict[str, float]] = {}  # vecino
         self.cost: Dict[str, float] = {}             # costo directo a vecinos
+        self.fib = Fib()                             # next hops publicados
+        self.infinity = float(infinity)
+        self.sia_timeout = float(sia_timeout)
+        self._changed: Set[str] = set()              # destinos a anunciar en el próximo delta
+
+        # Tabla indexada destinos x vecinos
+        self._dests: List[str] = []
+        self._dest_idx: Dict[str, int] = {}
+        self._nbr_idx: Dict[str, int] = {}
+        self._adv = np.full((16, 4), np.inf)
+        self._link = np.full(4, np.inf)              # cost[] alineado a las columnas de _adv
+        self._touched: Set[int] = set()
+
+        # Estado DUAL
+        self._fd = np.full(16, np.inf)               # distancia factible por destino
+        self._live: Set[str] = set()                 # vecinos de los que recibí vector
+        self._active: Dict[int, Set[str]] = {}       # destino ACTIVO -> respuestas pendientes
+        self._active_since: Dict[int, float] = {}    # destino ACTIVO -> monotonic del query
+        self._owed: Dict[int, Set[str]] = {}         # destino -> vecinos que esperan mi respuesta
+        self._out_queries: Dict[str, Set[str]] = {}  # vecino -> destinos a consultar
+        self._out_replies: Dict[str, Set[str]] = {}  # vecino -> destinos a responder
+        self.stats: Dict[str, int] = {"local_switches": 0, "active_episodes": 0,
+                                      "queries": 0, "replies": 0, "sia": 0}
+
+    # ---- Índices ----
+    def _dest(self, d: str) -> int:
+        i = self._dest_idx.get(d)
+        if i is None:
+            i = len(self._dests)
+            if i == self._adv.shape[0]:
+                grown = np.full((2 * i, self._adv.shape[1]), np.inf)
+                grown[:i] = self._adv
+                self._adv = grown
+                fd = np.full(2 * i, np.inf)
+                fd[:i] = self._fd
+                self._fd = fd
+            self._dests.append(d)
+            self._dest_idx[d] = i
+        return i
+
+    def _nbr(self, n: str) -> int:
+        j = self._nbr_idx.get(n)
+        if j is None:
+            j = len(self._nbr_idx)
+            if j == self._adv.shape[1]:
+                grown = np.full((self._adv.shape[0], 2 * j), np.inf)
+                grown[:, :j] = self._adv
+                self._adv = grown
+                link = np.full(2 * j, np.inf)
+                link[:j] = self._link
+                self._link = link
+            self._nbr_idx[n] = j
+        return j
 
-    def on_init(self, me: str, neighbors: list[str]) -> None:
+    @property
+    def recv(self) -> Dict[str, Dict[str, float]]:
+        """Vectores conocidos por vecino (vista armada desde la tabla; para inspección)."""
+        n = len(self._dests)
+        out: Dict[str, Dict[str, float]] = {}
+        for nbr, j in self._nbr_idx.items():
+            col = self._adv[:n, j]
+            finite = np.flatnonzero(np.isfinite(col))
+            if finite.size:
+                out[nbr] = {self._dests[i]: float(col[i]) for i in finite}
+        return out
+
+    # ---- Interfaz tipo RoutingAlgorithm ----
+    def on_init(self, me: str, neighbors) -> None:
         self.me = me
-        self.neighbors = neighbors[:]
-        self.cost = {n: 1.0 for n in neighbors}
+        if isinstance(neighbors, dict):
+            self.neighbors = list(neighbors.keys())
+            self.cost = {n: float(w) for n, w in neighbors.items()}
+        else:
+            self.neighbors = list(neighbors)
+            self.cost = {n: 1.0 for n in self.neighbors}
+        for n in self.neighbors:
+            self._nbr(n)
+        self._dest(self.me)
         self.dv[self.me] = {"cost": 0.0, "next": None}
+        self._changed = {self.me}
+        self.fib.publish({self.me: None})
 
     def on_hello(self, neighbor: str, metric: float = 1.0) -> None:
         if neighbor not in self.cost:
             self.cost[neighbor] = metric
             if neighbor not in self.neighbors:
                 self.neighbors.append(neighbor)
+            self._nbr(neighbor)
 
     def on_info(self, from_node: str, payload: Dict[str, Any]) -> None:
-        vector = payload.get("vector", {})
-        self.recv[from_node] = {d: float(c) for d, c in vector.items() if float(c) >= 0}
+        """
+        payload = {"vector": {dest: costo|None}, "full": bool}
+        Sin "full" se asume vector completo (compatibilidad con INFO de otras implementaciones).
+        None o un costo >= infinity retiran el destino del vector del vecino.
+        """
+        vector = payload.get("vector", {}) or {}
+        j = self._nbr(from_node)
+        self._live.add(from_node)
+        n = len(self._dests)
+        if payload.get("full", True):
+            # Todo lo que el vecino anunciaba antes queda tocado (puede desaparecer)
+            prev = np.flatnonzero(np.isfinite(self._adv[:n, j]))
+            self._touched.update(prev.tolist())
+            self._adv[:n, j] = np.inf
+        for d, c in vector.items():
+            if c is not None and 0 <= float(c) < self.infinity:
+                value = float(c)
+            elif c is None or float(c) >= self.infinity:
+                value = np.inf
+            else:
+                continue  # costos negativos se ignoran
+            if value == np.inf and d not in self._dest_idx:
+                continue
+            i = self._dest(d)
+            if self._adv[i, j] != value:
+                self._adv[i, j] = value
+                self._touched.add(i)
 
     def recompute(self) -> None:
+        # Costos de enlace: si cambió alguno, todos los destinos quedan tocados
+        k = self._adv.shape[1]
+        link = np.full(k, np.inf)
+        for nbr in self.neighbors:
+            link[self._nbr(nbr)] = self.cost.get(nbr, float("inf"))
+        if link.shape != self._link.shape or not np.array_equal(link, self._link):
+            self._link = link
+            self._touched.update(range(len(self._dests)))
+        finished: List[int] = []
+        if self.mode == "dual":
+            # Destinos ACTIVOS sin respuestas pendientes: se cierra el cómputo difuso
+            finished = [i for i, pending in self._active.items() if not pending]
+            for i in finished:
+                del self._active[i]
+                self._active_since.pop(i, None)
+                self._fd[i] = np.inf
+                self._touched.add(i)
+            self._touched.difference_update(self._active)   # congelados hasta las respuestas
+        self._touched.discard(self._dest_idx.get(self.me, -1))
+        if not self._touched:
+            self._queue_owed_replies()
+            return
+
+        idx = np.fromiter(self._touched, dtype=np.intp, count=len(self._touched))
+        self._touched = set()
+        totals = self._adv[idx] + self._link          # (destinos tocados) x (vecinos)
+        if self.mode == "dual":
+            # Solo compiten los sucesores factibles: adv[d, j] < FD[d]
+            unconstrained = totals.min(axis=1)
+            totals = np.where(self._adv[idx] < self._fd[idx, None], totals, np.inf)
+        best_j = np.argmin(totals, axis=1)
+        best = totals[np.arange(idx.size), best_j]
+        if self.mode != "dual":
+            unconstrained = best
+
+        cols = {j: n for n, j in self._nbr_idx.items()}
         changed = False
-        all_dests = set(self.dv.keys()) | {self.me}
-        for v in self.recv.values():
-            all_dests |= set(v.keys())
+        for i, j, c, c_any in zip(idx.tolist(), best_j.tolist(), best.tolist(), unconstrained.tolist()):
+            dest = self._dests[i]
+            if c >= self.infinity:
+                c, nxt = float("inf"), None
+            else:
+                nxt = cols[j]
+            old = self.dv.get(dest)
+            if self.mode == "dual":
+                if (old is not None and old["next"] is not None and i not in finished
+                        and (nxt is None or c_any < c)):
+                    # Sin sucesor factible, o el mejor camino no es factible: cómputo difuso
+                    c, nxt = self._go_active(i, old)
+                else:
+                    if nxt is not None:
+                        self._fd[i] = min(self._fd[i], c)
+                        if old is not None and old["next"] not in (None, nxt) and c > old["cost"]:
+                            self.stats["local_switches"] += 1
+            if old is None:
+                if nxt is None:
+                    continue  # destino nunca alcanzado: no se agrega
+            elif old["cost"] == c and old["next"] == nxt:
+                continue
+            self.dv[dest] = {"cost": c, "next": nxt}
+            self._changed.add(dest)
+            changed = True
+
+        if changed:
+            # Se publica la tabla completa de una vez (nunca a medias)
+            self.fib.publish({d: e.get("next") for d, e in self.dv.items()},
+                             {d: e.get("cost") for d, e in self.dv.items()})
+        self._queue_owed_replies()
+
+    # ---- DUAL: cómputo difuso ----
+    def _go_active(self, i: int, old: Dict[str, Any]):
+        """Pasa el destino i a ACTIVO. Devuelve la ruta (costo, next hop) mientras dure."""
+        pending = set(self._live)
+        succ = old["next"]
+        # Se mantiene el sucesor actual si sigue alcanzable (su distancia ya no es factible)
+        j = self._nbr_idx.get(succ)
+        c = float(self._adv[i, j] + self._link[j]) if j is not None else float("inf")
+        route = (c, succ) if c < self.infinity else (float("inf"), None)
+        if not pending:
+            self._fd[i] = np.inf
+            return route
+        self._active[i] = pending
+        self._active_since[i] = time.monotonic()
+        self.stats["active_episodes"] += 1
+        dest = self._dests[i]
+        for nbr in pending:
+            self._out_queries.setdefault(nbr, set()).add(dest)
+        return route
+
+    def on_query(self, from_node: str, vector: Dict[str, Optional[float]]) -> None:
+        """Query DUAL: el vecino perdió su sucesor factible; le debo una respuesta por destino."""
+        self.on_info(from_node, {"vector": vector, "full": False})
+        for d in vector:
+            i = self._dest(d)
+            self._owed.setdefault(i, set()).add(from_node)
+            self._touched.add(i)
 
-        for dest in all_dests:
-            if dest == self.me:
-                self.dv[self.me] = {"cost": 0.0, "next": None}
+    def on_reply(self, from_node: str, vector: Dict[str, Optional[float]]) -> None:
+        """Respuesta DUAL a un query propio."""
+        self.on_info(from_node, {"vector": vector, "full": False})
+        for d in vector:
+            i = self._dest_idx.get(d)
+            if i is not None and i in self._active:
+                self._active[i].discard(from_node)
+
+    def expire_active(self, now: Optional[float] = None) -> bool:
+        """
+        Timer stuck-in-active: los vecinos que no respondieron en sia_timeout s cuentan
+        como respuesta "inalcanzable" (su distancia anunciada pasa a inf), así el cómputo
+        difuso se cierra en el próximo recompute(). Devuelve True si cerró alguno.
+        """
+        now = time.monotonic() if now is None else now
+        expired = False
+        for i, pending in self._active.items():
+            if not pending or now - self._active_since.get(i, now) < self.sia_timeout:
                 continue
-            best_cost = self.dv.get(dest, {}).get("cost", float("inf"))
-            best_next = self.dv.get(dest, {}).get("next", None)
+            dest = self._dests[i]
+            print(f"[WARN][{self.me}] SIA {dest}: sin respuesta de {sorted(pending)} "
+                  f"en {self.sia_timeout}s")
+            for nbr in pending:
+                j = self._nbr_idx.get(nbr)
+                if j is not None:
+                    self._adv[i, j] = np.inf
+            pending.clear()
+            self.stats["sia"] += 1
+            expired = True
+        return expired
 
-            for nbr in self.neighbors:
-                c_me_nbr = self.cost.get(nbr, float("inf"))
-                c_nbr_dest = self.recv.get(nbr, {}).get(dest, float("inf"))
-                cand = c_me_nbr + c_nbr_dest
-                if cand < best_cost:
-                    best_cost, best_next = cand, nbr
+    def _queue_owed_replies(self) -> None:
+        """
+        Las respuestas salen de inmediato con la distancia actual, también estando ACTIVO:
+        así ningún cómputo difuso espera a otro (no hay esperas cruzadas entre nodos).
+        """
+        for i, owed in self._owed.items():
+            dest = self._dests[i]
+            for nbr in owed:
+                self._out_replies.setdefault(nbr, set()).add(dest)
+        self._owed.clear()
 
-            if best_cost != self.dv.get(dest, {}).get("cost", float("inf")) or best_next != self.dv.get(dest, {}).get("next", None):
-                self.dv[dest] = {"cost": best_cost, "next": best_next}
-                changed = True
+    def take_diffusing(self) -> Dict[str, Dict[str, Dict[str, Optional[float]]]]:
+        """
+        Queries y respuestas pendientes de envío: {"query"|"reply": {vecino: vector}}.
+        El vector lleva mi distancia actual (poison reverse incluido).
+        """
+        out: Dict[str, Dict[str, Dict[str, Optional[float]]]] = {"query": {}, "reply": {}}
+        for kind, pending in (("query", self._out_queries), ("reply", self._out_replies)):
+            for nbr, dests in pending.items():
+                out[kind][nbr] = self.vector_for(nbr, sorted(dests))
+                self.stats["queries" if kind == "query" else "replies"] += 1
+            pending.clear()
+        return out
 
-    def next_hop(self, dest: str) -> Optional[str]:
-        e = self.dv.get(dest)
-        return None if not e else e.get("next")
+    def next_hop(self, dest: str, flow: Optional[int] = None) -> Optional[str]:
+        # DV mantiene un único next hop por destino: 'flow' se acepta por uniformidad
+        return self.fib.lookup(dest)
 
     def build_info(self) -> Dict[str, Any]:
         return {"vector": {d: float(v["cost"]) for d, v in self.dv.items() if v["cost"] < float("inf")}}
+
+    # ---- Intercambio incremental ----
+    def vector_for(self, neighbor: str, dests: Optional[Iterable[str]] = None) -> Dict[str, Optional[float]]:
+        """
+        Vector a anunciar a 'neighbor' (todos los destinos o solo 'dests').
+        Split horizon + poison reverse: lo que enruto por 'neighbor' va como None.
+        """
+        out: Dict[str, Optional[float]] = {}
+        for d in (self.dv.keys() if dests is None else dests):
+            e = self.dv.get(d)
+            if e is None or e["cost"] == float("inf") or e["next"] == neighbor:
+                out[d] = None
+            else:
+                out[d] = float(e["cost"])
+        return out
+
+    def take_changes(self) -> Set[str]:
+        """Destinos modificados desde la última llamada (se vacía el registro)."""
+        changed, self._changed = self._changed, set()
+        return changed
+
+    def purge_node_everywhere(self, node: str) -> bool:
+        """
+        Olvida el vector de 'node' (vecino caído). Las rutas que dependían de él se
+        recalculan en recompute() y salen como delta (envenenadas si no hay alternativa).
+        """
+        j = self._nbr_idx.get(node)
+        if j is None:
+            return False
+        # Un vecino caído no va a responder: cuenta como respuesta "inalcanzable"
+        self._live.discard(node)
+        waited = False
+        for pending in self._active.values():
+            if node in pending:
+                pending.discard(node)
+                waited = True
+        for owed in self._owed.values():
+            owed.discard(node)
+        n = len(self._dests)
+        known = np.flatnonzero(np.isfinite(self._adv[:n, j]))
+        if not known.size:
+            return waited
+        self._adv[:n, j] = np.inf
+        self._touched.update(known.tolist())
+        return True
@@ -1,27 +1,316 @@
-from typing import Dict, Any, Optional
-from routerlab.algorithms.dijkstra import Graph, dijkstra, _first_hop
+import json, time, zlib
+from types import MappingProxyType
+from typing import Dict, Any, Iterable, Iterator, List, Mapping, Optional, Callable, Tuple
+from routerlab.algorithms.dijkstra import Graph, Arcs, Backups, Paths, graph_arcs, spf_routes, spf_routes_lfa
 from routerlab.algorithms.flooding import FloodingAlgo
+from routerlab.core.spf_cache import SpfCache, arcs_digest
+from routerlab.core.tables import Fib, format_route_diff
+
+class LinkStateDB(Mapping):
+    """
+    LSDB versionada.
+      - rows: anuncios por origen (origen -> {vecino: costo}); mi fila son los HELLO aceptados
+      - observed: adyacencias aprendidas por tráfico (simétricas, costo mínimo)
+      - version: sube en cada cambio efectivo; snapshot(), edges(), graph() y arcs()
+        se memoizan y solo se recalculan cuando cambia la versión
+      - edges(): aristas no dirigidas deduplicadas {(u, v): costo mínimo entre fuentes},
+        así el grafo tiene una sola entrada por vecino en cada lista de adyacencia
+      - seq: número de secuencia por origen. Mi fila lo incrementa en cada cambio; las
+        filas aprendidas por flooding de aristas sueltas quedan en 0 (sin secuencia)
+      - summary(): resumen compacto (origen, seq, checksum) para sincronizar por digest
+    Se comporta como Mapping de solo lectura sobre rows (lsdb[u][v], items(), ...);
+    las modificaciones pasan por los métodos set_link/remove_link/observe/remove_node.
+    """
+
+    def __init__(self, me: str = "") -> None:
+        self.me = me
+        self._rows: Dict[str, Dict[str, float]] = {}
+        self._observed: Dict[str, Dict[str, float]] = {}
+        self._seq: Dict[str, int] = {}
+        self.version = 0
+        self._memo_version = -1
+        self._memo: Dict[str, Any] = {}
+
+    # ---- Mapping (solo lectura) ----
+    def __getitem__(self, origin: str) -> Mapping[str, float]:
+        return MappingProxyType(self._rows[origin])
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._rows)
+
+    def __len__(self) -> int:
+        return len(self._rows)
+
+    @property
+    def observed(self) -> Mapping[str, Mapping[str, float]]:
+        return MappingProxyType(self._observed)
+
+    def seq(self, origin: str) -> int:
+        return self._seq.get(origin, 0)
+
+    # ---- Modificaciones ----
+    def _bump(self, origin: Optional[str] = None) -> None:
+        self.version += 1
+        # Mi propia fila avanza de secuencia en cada cambio (como un LSA re-originado)
+        if origin is not None and origin == self.me:
+            self._seq[origin] = self._seq.get(origin, 0) + 1
+
+    def set_link(self, u: str, v: str, w: float) -> bool:
+        """Fija el costo anunciado u -> v. Devuelve True si la LSDB cambió."""
+        w = float(w)
+        row = self._rows.setdefault(u, {})
+        if row.get(v) == w:
+            return False
+        row[v] = w
+        self._bump(u)
+        return True
+
+    def remove_link(self, u: str, v: str) -> bool:
+        row = self._rows.get(u)
+        if row is None or v not in row:
+            return False
+        del row[v]
+        self._bump(u)
+        return True
+
+    def observe(self, u: str, v: str, w: float) -> bool:
+        """Registra una adyacencia observada u <-> v (se conserva el menor costo)."""
+        w = float(w)
+        changed = False
+        d = self._observed.setdefault(u, {})
+        if d.get(v, float("inf")) > w:
+            d[v] = w; changed = True
+        d2 = self._observed.setdefault(v, {})
+        if d2.get(u, float("inf")) > w:
+            d2[u] = w; changed = True
+        if changed:
+            self._bump()
+        return changed
+
+    def forget_observed(self, u: str, v: str) -> bool:
+        changed = self._observed.get(u, {}).pop(v, None) is not None
+        changed = (self._observed.get(v, {}).pop(u, None) is not None) or changed
+        if changed:
+            self._bump()
+        return changed
+
+    def remove_node(self, node: str) -> bool:
+        """Quita la fila del nodo y toda referencia a él (anuncios y observadas)."""
+        changed = False
+        mine = False
+        for table in (self._rows, self._observed):
+            if table.pop(node, None) is not None:
+                changed = True
+            for u, nbrs in table.items():
+                if nbrs.pop(node, None) is not None:
+                    changed = True
+                    mine = mine or (table is self._rows and u == self.me)
+        self._seq.pop(node, None)
+        if changed:
+            self._bump(self.me if mine else None)
+        return changed
+
+    def install_row(self, origin: str, seq: int, links: Mapping[str, float]) -> bool:
+        """
+        Instala la fila de 'origin' recibida por sincronización:
+          - seq mayor que la local: reemplaza la fila completa
+          - misma seq con otro contenido: une los enlaces con el menor costo por vecino. El
+            flooding de aristas cambia filas sin subir la seq, así que ninguna de las dos
+            copias es "la nueva"; la unión es la misma en ambos extremos y no pierde enlaces
+          - ambas sin secuencia (0): une los enlaces (mismo criterio que el flooding de aristas)
+          - mi propia fila nunca se reemplaza; si alguien tiene una versión más nueva
+            (p.ej. previa a un reinicio) solo adelanto mi secuencia por encima de ella
+        Devuelve True si la LSDB cambió.
+        """
+        seq = int(seq)
+        local = self._seq.get(origin, 0)
+        if origin == self.me:
+            if seq > 0 and seq >= local:
+                self._seq[origin] = seq + 1
+                self.version += 1
+                return True
+            return False
+        new_links = {str(v): float(w) for v, w in links.items()}
+        if seq == local > 0 and origin in self._rows:
+            row = self._rows[origin]
+            changed = False
+            for v, w in new_links.items():
+                if w < row.get(v, float("inf")):
+                    row[v] = w
+                    changed = True
+            if changed:
+                self.version += 1
+            return changed
+        if seq > local:
+            same = self._rows.get(origin) == new_links
+            self._rows[origin] = new_links
+            self._seq[origin] = seq
+            self.version += 1
+            return not same
+        if seq == 0 and local == 0:
+            row = self._rows.setdefault(origin, {})
+            changed = False
+            for v, w in new_links.items():
+                if row.get(v) != w:
+                    row[v] = w
+                    changed = True
+            if changed:
+                self.version += 1
+            return changed
+        return False
+
+    def drop_row(self, origin: str) -> bool:
+        """Quita solo la fila anunciada por 'origin' (las referencias de otros quedan)."""
+        if self._rows.pop(origin, None) is None:
+            return False
+        self._seq.pop(origin, None)
+        self._bump()
+        return True
+
+    def clear(self) -> None:
+        self._rows.clear()
+        self._observed.clear()
+        self._bump()
+
+    # ---- Vistas memoizadas por versión ----
+    def _cached(self, key: str, build: Callable[[], Any]) -> Any:
+        if self._memo_version != self.version:
+            self._memo = {}
+            self._memo_version = self.version
+        if key not in self._memo:
+            self._memo[key] = build()
+        return self._memo[key]
+
+    def snapshot(self) -> Dict[str, Dict[str, float]]:
+        """
+        LSDB consolidada (memoizada; no mutar):
+          enlaces directos vivos (mi fila) + adyacencias observadas + LSPs de otros,
+          tomando el menor costo cuando una arista aparece en varias fuentes.
+        """
+        return self._cached("snapshot", self._build_snapshot)
+
+    def _build_snapshot(self) -> Dict[str, Dict[str, float]]:
+        snap: Dict[str, Dict[str, float]] = {}
+        if self.me in self._rows:
+            snap[self.me] = dict(self._rows[self.me])
+        sources = [self._observed.items(),
+                   ((u, nbrs) for u, nbrs in self._rows.items() if u != self.me)]
+        for items in sources:
+            for u, nbrs in items:
+                d = snap.setdefault(u, {})
+                for v, w in nbrs.items():
+                    d[v] = min(w, d.get(v, float("inf")))
+        return snap
+
+    def edges(self) -> Dict[Tuple[str, str], float]:
+        """Aristas no dirigidas deduplicadas: {(min(u,v), max(u,v)): costo mínimo}."""
+        return self._cached("edges", self._build_edges)
+
+    def _build_edges(self) -> Dict[Tuple[str, str], float]:
+        out: Dict[Tuple[str, str], float] = {}
+        for table in (self._rows, self._observed):
+            for u, nbrs in table.items():
+                for v, w in nbrs.items():
+                    if u == v:
+                        continue
+                    key = (u, v) if u <= v else (v, u)
+                    if w < out.get(key, float("inf")):
+                        out[key] = w
+        return out
+
+    def graph(self) -> Graph:
+        """Grafo no dirigido con una arista por par (memoizado; no mutar)."""
+        return self._cached("graph", self._build_graph)
+
+    def _build_graph(self) -> Graph:
+        g = Graph(undirected=True)
+        for (u, v), w in self.edges().items():
+            g.add_edge(u, v, w)
+        return g
+
+    def arcs(self) -> Arcs:
+        """Snapshot inmutable del grafo (tupla de arcos) para SPF."""
+        return self._cached("arcs", lambda: graph_arcs(self.graph()))
+
+    def digest(self) -> str:
+        """Huella del grafo consolidado (clave del cache de SPF), memoizada por versión."""
+        return self._cached("digest", lambda: arcs_digest(self.arcs()))
+
+    # ---- Sincronización por digest (database description) ----
+    @staticmethod
+    def row_checksum(links: Mapping[str, float]) -> int:
+        """CRC32 de la fila en forma canónica (estable entre procesos y nodos)."""
+        canon = json.dumps(sorted((str(v), float(w)) for v, w in links.items()), separators=(",", ":"))
+        return zlib.crc32(canon.encode("utf-8"))
+
+    def summary(self) -> List[Tuple[str, int, int]]:
+        """Resumen compacto de la LSDB: [(origen, seq, checksum)] ordenado por origen."""
+        return self._cached("summary", lambda: [
+            (u, self._seq.get(u, 0), self.row_checksum(links))
+            for u, links in sorted(self._rows.items())
+        ])
+
+    def wants(self, summary: Iterable[Iterable[Any]]) -> List[str]:
+        """
+        Orígenes del resumen remoto que me faltan o que tengo desactualizados. Con la misma
+        seq se pide si el checksum difiere (install_row une ambas copias; una vez unidas en
+        los dos extremos los checksums coinciden y se deja de pedir).
+        """
+        out: List[str] = []
+        for origin, seq, checksum in summary:
+            origin, seq = str(origin), int(seq)
+            if origin == self.me:
+                if seq >= self._seq.get(origin, 0) and seq > 0:
+                    out.append(origin)   # para adelantar mi secuencia
+                continue
+            if origin not in self._rows:
+                out.append(origin)
+                continue
+            local = self._seq.get(origin, 0)
+            if seq > local or (seq == local and int(checksum) != self.row_checksum(self._rows[origin])):
+                out.append(origin)
+        return out
+
+    def rows_for(self, origins: Iterable[str]) -> Dict[str, Dict[str, Any]]:
+        """Filas pedidas en formato de actualización: {origen: {"seq": s, "links": {...}}}."""
+        return {
+            o: {"seq": self._seq.get(o, 0), "links": dict(self._rows[o])}
+            for o in origins if o in self._rows
+        }
 
 class LinkState:
     name = "lsr"
 
-    def __init__(self):
+    def __init__(self, lfa: bool = True, spf_cache: Optional[SpfCache] = None):
         self.me: str = ""
+        # SPF a usar (función de módulo, apta para executor); con LFA calcula también respaldos
+        self.spf_fn = spf_routes_lfa if lfa else spf_routes
+        # Cache de resultados por (digest de la LSDB, origen); None = sin cache
+        self.spf_cache = spf_cache
         # Vecinos para el forwarder (lista de ids)
         self._neighbors_list: list[str] = []
         # Costos directos (diccionario)
         self._neighbors_costs: Dict[str, float] = {}
-        # Base de estado de enlaces: nodo -> {vecino: costo}
-        self.lsdb: Dict[str, Dict[str, float]] = {}
+        # Base de estado de enlaces (versionada): nodo -> {vecino: costo}
+        self.lsdb = LinkStateDB()
         # Grafo + rutas
         self._graph: Graph = Graph(undirected=True)
         self._prev: Dict[str, Optional[str]] = {}
-        self._next: Dict[str, Optional[str]] = {}
+        # Tabla de forwarding publicada (swap atómico por generación)
+        self.fib = Fib()
         # Motor de flooding interno
         self._flood: Optional[FloodingAlgo] = None
 
-        self.adj_observed: Dict[str, Dict[str, float]] = {}  # bordes aprendidos por tráfico
         self._dist: Dict[str, float] = {}
+        # Si se define (p.ej. SpfScheduler.request), reemplaza los recompute() internos
+        self.recompute_hook: Optional[Callable[[], None]] = None
+        # Enlaces propios caídos en hold-down: vecino -> instante (monotonic) de liberación
+        self._held_links: Dict[str, float] = {}
+        # Reinicio en caliente: filas y enlaces propios restaurados de un snapshot que
+        # todavía nadie confirmó; se descartan en _stale_until (monotonic)
+        self._stale_rows: set[str] = set()
+        self._stale_links: set[str] = set()
+        self._stale_until = 0.0
 
     # -------------------------------
     # Interfaz estilo RoutingAlgorithm
@@ -40,8 +329,9 @@ class LinkState:
             self._neighbors_costs = {n: 1.0 for n in self._neighbors_list}
 
         # Arrancamos VACÍOS (sin entradas en LSDB)
-        self.lsdb = {}
-        self._prev, self._next = {}, {}
+        self.lsdb = LinkStateDB(self.me)
+        self._prev = {}
+        self.fib.publish({})
         # Mantén el motor de flooding
         self._flood = FloodingAlgo(self.me, self._neighbors_list)
 
@@ -56,14 +346,7 @@ class LinkState:
         Marca/actualiza un vecino como ACTIVO dentro de mi LSDB (entrada propia).
         Devuelve True si la LSDB cambió.
         """
-        if self.me not in self.lsdb:
-            self.lsdb[self.me] = {}
-        old = self.lsdb[self.me].get(neighbor)
-        new = float(metric)
-        if old is None or old != new:
-            self.lsdb[self.me][neighbor] = new
-            return True
-        return False
+        return self.lsdb.set_link(self.me, neighbor, metric)
 
     def is_neighbor_known(self, neighbor: str) -> bool:
         """Devuelve True si el vecino está en la lista conocida por config."""
@@ -75,10 +358,13 @@ class LinkState:
             return
 
         self._neighbors_costs[neighbor] = float(metric)
+        # El vecino volvió a saludar: el enlace deja de estar en hold-down
+        self._held_links.pop(neighbor, None)
+        self._stale_links.discard(neighbor)
         # Activa solo este vecino en mi LSDB
         changed = self.mark_neighbor_active(neighbor, metric)
         if changed:
-            self.recompute()
+            self._trigger_recompute()
 
     def on_message(self, from_node: str, to_node: str, hops: float) -> None:
         if not from_node or not to_node:
@@ -88,69 +374,219 @@ class LinkState:
             print(f"[WARN][{self.me}] Ignorando enlace fantasma: {from_node} -> {to_node}")
             return
 
-
-        if from_node not in self.lsdb:
-            self.lsdb[from_node] = {}
-        old = self.lsdb[from_node].get(to_node)
-        if old is None or old != float(hops):
-            self.lsdb[from_node][to_node] = float(hops)
+        if self._is_held(from_node, to_node):
+            return
+        self._stale_rows.discard(from_node)
+        if self.lsdb.set_link(from_node, to_node, hops):
             print(f"[{self.me}] Aprendí un nuevo enlace: {from_node} -> {to_node} (hops={hops})")
+            self._trigger_recompute()
+
+    def on_info(self, from_node: str, payload: Dict[str, Any]) -> None:
+        """INFO estilo RoutingAlgorithm: {"lsdb": {origen: {vecino: costo}}} (filas sin secuencia)."""
+        rows = payload.get("lsdb", {}) or {}
+        changed = False
+        for origin, links in rows.items():
+            if origin and origin != "*" and isinstance(links, dict):
+                self._stale_rows.discard(str(origin))
+                changed = self.lsdb.install_row(str(origin), 0, self._without_held(str(origin), links)) or changed
+        if changed:
+            self._trigger_recompute()
+
+    def build_info(self) -> Dict[str, Any]:
+        return {"lsdb": self.lsdb_snapshot()}
+
+    # -------------------------------
+    # Sincronización por digest al levantar una adyacencia
+    # -------------------------------
+    def database_summary(self) -> List[Tuple[str, int, int]]:
+        """Resumen (origen, seq, checksum) que se envía en el DBD."""
+        return self.lsdb.summary()
+
+    def ls_request_for(self, summary: Iterable[Iterable[Any]]) -> List[str]:
+        """Orígenes a pedir tras recibir el DBD de un vecino."""
+        summary = [tuple(e) for e in summary]
+        if self._stale_rows:
+            # El vecino tiene la misma versión (seq + checksum): la fila restaurada sigue vigente
+            for origin, seq, checksum in (e[:3] for e in summary if len(e) >= 3):
+                if (origin in self._stale_rows and int(seq) == self.lsdb.seq(origin)
+                        and int(checksum) == self.lsdb.row_checksum(self.lsdb[origin])):
+                    self._stale_rows.discard(origin)
+        return self.lsdb.wants(summary)
+
+    def ls_update_for(self, origins: Iterable[str]) -> Dict[str, Dict[str, Any]]:
+        """Filas pedidas por un vecino (respuesta a su LS request)."""
+        return self.lsdb.rows_for(origins)
+
+    def on_ls_update(self, rows: Mapping[str, Mapping[str, Any]]) -> bool:
+        """Instala filas recibidas; recalcula rutas una sola vez si algo cambió."""
+        changed = False
+        for origin, entry in rows.items():
+            if not origin or origin == "*" or not isinstance(entry, Mapping):
+                continue
+            links = self._without_held(str(origin), entry.get("links", {}) or {})
+            if int(entry.get("seq", 0)) >= self.lsdb.seq(str(origin)):
+                # Copia fresca (igual o más nueva): la fila restaurada queda confirmada
+                self._stale_rows.discard(str(origin))
+            changed = self.lsdb.install_row(str(origin), int(entry.get("seq", 0)), links) or changed
+        if changed:
+            self._trigger_recompute()
+        return changed
+
+    # -------------------------------
+    # Hold-down de enlaces propios caídos
+    # -------------------------------
+    def hold_down_link(self, neighbor: str, seconds: float) -> None:
+        """
+        Ignora el enlace me <-> neighbor durante 'seconds' (o hasta un HELLO del vecino),
+        para que copias viejas en LSPs de otros nodos no lo reintroduzcan.
+        """
+        self._held_links[neighbor] = time.monotonic() + float(seconds)
+
+    def _is_held(self, u: str, v: str) -> bool:
+        if not self._held_links:
+            return False
+        other = v if u == self.me else (u if v == self.me else None)
+        if other is None or other not in self._held_links:
+            return False
+        if time.monotonic() >= self._held_links[other]:
+            del self._held_links[other]
+            return False
+        return True
+
+    def _without_held(self, origin: str, links: Mapping[str, float]) -> Mapping[str, float]:
+        if not self._held_links:
+            return links
+        return {v: w for v, w in links.items() if not self._is_held(origin, v)}
+
+    # -------------------------------
+    # Reinicio en caliente (snapshot de LSDB + FIB)
+    # -------------------------------
+    def warm_state(self) -> Dict[str, Any]:
+        """Estado a persistir: filas con su secuencia y la FIB vigente."""
+        return {
+            "rows": self.lsdb.rows_for(list(self.lsdb)),
+            "seq": self.lsdb.seq(self.me),
+            "fib": {d: [nh, cost] for d, (nh, cost) in self.fib.routes.items()},
+        }
+
+    def restore_warm(self, state: Mapping[str, Any], grace: float) -> int:
+        """
+        Carga un snapshot como estado VIEJO pero usable (estilo graceful restart):
+          - la FIB guardada se publica de inmediato (se reenvía desde el primer paquete)
+          - las filas remotas entran con su secuencia; mis enlaces, como adyacencias a confirmar
+          - mi secuencia salta por encima de la guardada (mis LSP nuevos ganan a las copias viejas)
+        Cada fila se confirma con un LSP/INFO fresco de su origen y cada enlace propio con un
+        HELLO; lo que siga sin confirmar tras 'grace' segundos se descarta (expire_stale()).
+        Devuelve la cantidad de filas restauradas.
+        """
+        rows = state.get("rows", {}) or {}
+        for origin, entry in rows.items():
+            links = {str(v): float(w) for v, w in (entry.get("links", {}) or {}).items()}
+            if origin == self.me:
+                for n, w in links.items():
+                    if self.lsdb.set_link(self.me, n, w):
+                        self._stale_links.add(n)
+            elif self.lsdb.install_row(origin, int(entry.get("seq", 0)), links):
+                self._stale_rows.add(origin)
+        self.lsdb.install_row(self.me, int(state.get("seq", 0)), {})
+        fib = state.get("fib", {}) or {}
+        if fib:
+            self.fib.publish({d: r[0] for d, r in fib.items()}, {d: r[1] for d, r in fib.items()})
+        self._stale_until = time.monotonic() + float(grace)
+        print(f"[{self.me}] warm restart: {len(self._stale_rows)} filas y "
+              f"{len(self._stale_links)} enlaces propios restaurados, {len(fib)} rutas")
+        return len(rows)
+
+    def stale_state(self) -> Dict[str, Any]:
+        return {"rows": sorted(self._stale_rows), "links": sorted(self._stale_links),
+                "expires_in": max(0.0, self._stale_until - time.monotonic())}
+
+    def expire_stale(self) -> bool:
+        """Descarta lo restaurado que no se confirmó dentro del período de gracia."""
+        if not (self._stale_rows or self._stale_links) or time.monotonic() < self._stale_until:
+            return False
+        changed = False
+        for origin in self._stale_rows:
+            changed = self.lsdb.drop_row(origin) or changed
+        for n in self._stale_links:
+            changed = self.lsdb.remove_link(self.me, n) or changed
+        print(f"[{self.me}] warm restart: descartado lo no confirmado "
+              f"(filas={sorted(self._stale_rows)}, enlaces={sorted(self._stale_links)})")
+        self._stale_rows.clear()
+        self._stale_links.clear()
+        if changed:
+            self._trigger_recompute()
+        return changed
+
+    def _trigger_recompute(self) -> None:
+        if self.recompute_hook is not None:
+            self.recompute_hook()
+        else:
             self.recompute()
 
     def recompute(self) -> None:
+        arcs = self.spf_snapshot()
+        if self.spf_cache is not None:
+            self.install_routes(*self.spf_cache.compute(arcs, self.me, self.spf_fn, self.spf_digest()))
+        else:
+            self.install_routes(*self.spf_fn(arcs, self.me))
+
+    def spf_snapshot(self) -> Arcs:
+        """Snapshot inmutable del grafo actual (tupla de arcos), apto para correr SPF en un executor."""
         self._graph = self._build_graph_from_sources()
-        dist, prev = dijkstra(self._graph, self.me)
-        self._dist = dist
-        self._prev = {str(k): (None if v is None else str(v)) for k, v in prev.items()}
-
-        nh = {}
-        for dest in self._prev.keys():
-            if dest == self.me:
-                nh[dest] = None
-                continue
-            hop = _first_hop(self._prev, self.me, dest)
-            nh[dest] = hop if hop is None else str(hop)
-        self._next = nh
-        self.print_lsdb()
-        self.print_routes()
+        return self.lsdb.arcs()
+
+    def spf_digest(self) -> str:
+        """Huella del snapshot de spf_snapshot() (sin rehashear: la LSDB la memoiza)."""
+        return self.lsdb.digest()
+
+    def install_routes(self, dist: Dict[str, float], prev: Dict[str, Optional[str]],
+                       next_hop: Dict[str, Optional[str]], paths: Optional[Paths] = None,
+                       backups: Optional[Backups] = None) -> None:
+        """
+        Instala un resultado de SPF completo (se reemplazan las tablas, nunca a medias).
+        Solo se reportan los cambios de rutas (RouteDiff); la tabla completa queda en print_routes().
+        """
+        self._dist, self._prev = dist, prev
+        self._print_diff(self.fib.publish(next_hop, dist, backups, paths))
+
+    def fail_over(self, neighbor: str) -> bool:
+        """
+        Conmuta en la FIB los destinos que salían por 'neighbor' a su LFA precalculado.
+        No toca la LSDB: el SPF completo (purge + recompute) debe correr después.
+        """
+        diff = self.fib.fail_over(neighbor)
+        self._print_diff(diff)
+        return bool(diff)
+
+    def _print_diff(self, diff) -> None:
+        if diff:
+            print(f"[{self.me}] Cambios de rutas (gen={diff.generation}):")
+            for line in format_route_diff(self.me, diff):
+                print(line)
 
-    def next_hop(self, dest: str) -> Optional[str]:
-        return self._next.get(dest)
+    def next_hop(self, dest: str, flow: Optional[int] = None) -> Optional[str]:
+        """Primer salto hacia 'dest'; con 'flow' (ver flow_hash) se reparte entre rutas ECMP."""
+        return self.fib.lookup(dest, flow)
 
     # -------------------------------
     # Integración con Flooding
     # -------------------------------
     def on_edge_observed(self, u: str, v: str, w: float) -> bool:
         print(f"[{self.me}] on_edge_observed(u={u}, v={v}, w_in={w})", flush=True)
-        w = float(w)
-        changed = False
-        d = self.adj_observed.setdefault(u, {})
-        if d.get(v, float("inf")) > w:
-            d[v] = w; changed = True
-        d2 = self.adj_observed.setdefault(v, {})
-        if d2.get(u, float("inf")) > w:
-            d2[u] = w; changed = True
+        changed = self.lsdb.observe(u, v, w)
         if changed:
-            print(f"[{self.me}] learned edge {u}<->{v} w={w}")
+            print(f"[{self.me}] learned edge {u}<->{v} w={float(w)}")
         return changed
-    
+
+    @property
+    def adj_observed(self) -> Mapping[str, Mapping[str, float]]:
+        """Bordes aprendidos por tráfico (vista de solo lectura de la LSDB)."""
+        return self.lsdb.observed
+
     def _build_graph_from_sources(self) -> Graph:
-        g = Graph(undirected=True)
-        # 1) mis enlaces directos vivos (HELLO aceptados)
-        if self.me in self.lsdb:
-            for v, w in self.lsdb[self.me].items():
-                g.add_edge(self.me, v, float(w))
-        # 2) adyacencias observadas
-        for u, nbrs in self.adj_observed.items():
-            for v, w in nbrs.items():
-                g.add_edge(u, v, float(w))
-        # 3) LSPs de otros (ya poblados en lsdb vía on_message)
-        for u, nbrs in self.lsdb.items():
-            if u == self.me:
-                continue
-            for v, w in nbrs.items():
-                g.add_edge(u, v, float(w))
-        return g
+        # mis enlaces vivos + adyacencias observadas + LSPs de otros, una arista por par
+        return self.lsdb.graph()
 
     # -------------------------------
     # Utilidades de Tabla / Inspección
@@ -160,28 +596,9 @@ class LinkState:
         LSDB consolidada = enlaces directos vivos (self.lsdb[self.me])
                          + adyacencias observadas (self.adj_observed)
                          + LSPs de otros (self.lsdb[otros]).
+        Memoizada por versión de la LSDB: no mutar el resultado.
         """
-        snap: dict[str, dict[str, float]] = {}
-
-        # enlaces directos vivos (hello)
-        if self.me in self.lsdb:
-            snap[self.me] = {v: float(w) for v, w in self.lsdb[self.me].items()}
-
-        # adyacencias observadas
-        for u, nbrs in self.adj_observed.items():
-            d = snap.setdefault(u, {})
-            for v, w in nbrs.items():
-                d[v] = min(float(w), float(d.get(v, float("inf"))))
-
-        # LSPs de otros nodos
-        for u, nbrs in self.lsdb.items():
-            if u == self.me:
-                continue
-            d = snap.setdefault(u, {})
-            for v, w in nbrs.items():
-                d[v] = min(float(w), float(d.get(v, float("inf"))))
-
-        return snap
+        return self.lsdb.snapshot()
 
     def _fmt_cost(self, x):
         try:
@@ -208,7 +625,7 @@ class LinkState:
                 continue
             cost = self._dist.get(dst, float("inf"))
             if cost != float("inf"):
-                nh = self._next.get(dst)
+                nh = self.fib.lookup(dst)
                 print(f"{self.me} -> {dst} : {self._fmt_cost(cost)} (nh={nh})")
 
     # -------------------------------
@@ -219,11 +636,9 @@ class LinkState:
         Elimina un vecino directo de MI fila en la LSDB (self.me).
         Devuelve True si cambió algo.
         """
-        if self.me in self.lsdb and neighbor in self.lsdb[self.me]:
-            del self.lsdb[self.me][neighbor]
+        if self.lsdb.remove_link(self.me, neighbor):
             # opcional: también olvida lo observado hacia ese vecino
-            self.adj_observed.get(self.me, {}).pop(neighbor, None)
-            self.adj_observed.get(neighbor, {}).pop(self.me, None)
+            self.lsdb.forget_observed(self.me, neighbor)
             return True
         return False
 
@@ -233,34 +648,16 @@ class LinkState:
         Elimina un nodo NO vecino (o cualquiera) de:
           - LSDB (su entrada y referencias en otras entradas)
           - adj_observed (bordes aprendidos por tráfico)
-          - caches de rutas (prev/next)
+          - caches de rutas (prev) y la FIB publicada
         Devuelve True si cambió algo.
         """
-        changed = False
-
-        # entrada propia del nodo
-        if node in self.lsdb:
-            del self.lsdb[node]
-            changed = True
-
-        # referencias en otras entradas
-        for u in list(self.lsdb.keys()):
-            if node in self.lsdb[u]:
-                del self.lsdb[u][node]
-                changed = True
-
-        # observado por tráfico
-        if node in self.adj_observed:
-            del self.adj_observed[node]
-            changed = True
-        for u in list(self.adj_observed.keys()):
-            if node in self.adj_observed[u]:
-                del self.adj_observed[u][node]
-                changed = True
+        changed = self.lsdb.remove_node(node)
 
         # caches de rutas
-        self._next.pop(node, None)
-        self._prev.pop(node, None)
+        self.fib.withdraw(node)
+        if node in self._prev:
+            # Copia: 'prev' puede venir compartido desde el cache de SPF
+            self._prev = {d: p for d, p in self._prev.items() if d != node}
 
         return changed
 
@@ -24,6 +24,8 @@ def main():
     p.add_argument("--names", required=True, help="ruta a names-*.json")
     p.add_argument("--port", type=int, default=0,
                    help="Solo para socket. En XMPP/Redis se ignora.")
+    p.add_argument("--record", default=None, metavar="TRAZA",
+                   help="Graba las tramas entrantes/salientes en TRAZA (ver routerlab.net.trace)")
     args = p.parse_args()
 
     # Driver de red (TCP local)
@@ -41,6 +43,10 @@ def main():
     else:
         raise ValueError("driver no soportado")
 
+    if args.record:
+        from routerlab.net.trace import RecordingTransport
+        transport = RecordingTransport(transport, args.record)
+
     # Router con el protocolo seleccionado
     node = RouterNode(
         node_id=args.node,
@@ -3,6 +3,7 @@ import asyncio, time
 from typing import Dict, Any, Callable, Set, Deque, Optional
 from collections import deque
 from pydantic import ValidationError
+from routerlab.core.tables import RouteDiff, RouteSubscription, flow_hash
 
 class Forwarder:
     def __init__(self,
@@ -21,6 +22,119 @@ class Forwarder:
         self._seen_ttl = seen_ttl
         self._route_next_hop = route_next_hop
         self._rq = route_event_queue
+        # Cache de next hop por flujo (dest -> {flow: nh}); lo invalidan los RouteDiff
+        self._flow_cache: Dict[str, Dict[int, str]] = {}
+        self._routes_sub: Optional[RouteSubscription] = None
+        self.stats: Dict[str, int] = {"cache_hits": 0, "cache_misses": 0, "invalidated": 0, "resyncs": 0,
+                                      "delivered": 0, "forwarded": 0, "no_route": 0, "ttl_expired": 0}
+
+    FLOW_CACHE_PER_DEST = 1024
+
+    def follow_routes(self, sub: RouteSubscription) -> None:
+        """
+        Se suscribe a los cambios de la FIB (fib.changes.subscribe()). Antes de cada
+        consulta se drenan los RouteDiff pendientes y se olvidan los flujos de los
+        destinos afectados; si la suscripción se desbordó se vacía todo el cache.
+        """
+        if self._routes_sub is not None:
+            self._routes_sub.close()
+        self._routes_sub = sub
+        self._flow_cache.clear()
+
+    def _sync_routes(self) -> None:
+        sub = self._routes_sub
+        if sub is None:
+            return
+        while True:
+            try:
+                diff = sub.get_nowait()
+            except asyncio.QueueEmpty:
+                break
+            self.apply_route_diff(diff)
+        if sub.overflowed:
+            sub.overflowed = False
+            self._flow_cache.clear()
+            self.stats["resyncs"] += 1
+
+    def apply_route_diff(self, diff: RouteDiff) -> None:
+        for dest in (*diff.added, *diff.changed, *diff.removed):
+            if self._flow_cache.pop(dest, None) is not None:
+                self.stats["invalidated"] += 1
+
+    def next_hop_for(self, raw: Dict[str, Any]) -> Optional[str]:
+        """
+        Next hop para un paquete unicast. Con rutas ECMP el flujo se identifica por
+        (origin, to, flow) -> todos los paquetes de un flujo van por el mismo camino
+        (sin reordenamiento) y flujos distintos se reparten entre los caminos.
+        Sin campo 'flow' el flujo es el par origen/destino.
+        """
+        if self._route_next_hop is None:
+            return None
+        dest = raw.get("to")
+        origin = raw.get("origin", raw.get("from"))
+        flow = flow_hash(origin, dest, raw.get("flow"))
+        if self._routes_sub is None:
+            return self._route_next_hop(dest, flow)
+        self._sync_routes()
+        flows = self._flow_cache.get(dest)
+        if flows is not None and flow in flows:
+            self.stats["cache_hits"] += 1
+            return flows[flow]
+        self.stats["cache_misses"] += 1
+        nh = self._route_next_hop(dest, flow)
+        if nh is not None:
+            if flows is None:
+                flows = self._flow_cache[dest] = {}
+            elif len(flows) >= self.FLOW_CACHE_PER_DEST:
+                flows.clear()
+            flows[flow] = nh
+        return nh
+
+    @property
+    def routes_unicast(self) -> bool:
+        """True si hay un algoritmo de routing detrás (dvr / dijkstra / lsr)."""
+        return self._route_next_hop is not None
+
+    def _remember(self, msg_id: str) -> bool:
+        """Registra 'msg_id'; False si ya se había visto (duplicado)."""
+        if msg_id in self._seen:
+            return False
+        self._seen.add(msg_id)
+        self._order.append((msg_id, time.time()))
+        self._gc_seen()
+        return True
+
+    async def forward_unicast(self, raw: Dict[str, Any]) -> str:
+        """
+        Paquete de datos unicast (con 'payload'): entrega local si 'to' soy yo; si no,
+        decrementa 'ttl' y lo envía al next hop de la FIB (next_hop_for). Devuelve la
+        decisión: delivered | forwarded | no_route | ttl_expired | duplicate.
+        """
+        dest = raw.get("to")
+        if raw.get("id") is not None and not self._remember(f"data:{raw['id']}"):
+            return "duplicate"
+        if dest == self._me or dest == "*":
+            self.stats["delivered"] += 1
+            print(f"[DELIVER][{self._me}] de {raw.get('origin', raw.get('from'))}: {raw.get('payload')}")
+            return "delivered"
+        ttl = int(raw.get("ttl", 8)) - 1
+        if ttl <= 0:
+            self.stats["ttl_expired"] += 1
+            print(f"[{self._me}] drop: ttl agotado hacia {dest}")
+            return "ttl_expired"
+        nh = self.next_hop_for(raw)
+        if nh is None:
+            self.stats["no_route"] += 1
+            print(f"[{self._me}] drop: sin ruta hacia {dest}")
+            return "no_route"
+        fwd = dict(raw)
+        fwd["from"] = self._me
+        fwd["via"] = self._me
+        fwd["ttl"] = ttl
+        self.stats["forwarded"] += 1
+        print(f"[FWD][{self._me}] {fwd.get('origin')} -> {dest} por {nh} (ttl={ttl})")
+        await self._send(nh, fwd)
+        return "forwarded"
 
     def _gc_seen(self):
         now = time.time()
@@ -44,11 +158,8 @@ class Forwarder:
 
         # Deduplicación
         msg_id = f"{raw['from']}->{raw['to']}:{raw['type']}:{raw.get('hops')}"
-        if msg_id in self._seen:
+        if not self._remember(msg_id):
             return
-        self._seen.add(msg_id)
-        self._order.append((msg_id, time.time()))
-        self._gc_seen()
 
         if pkt_type == "hello":
             # Pasar HELLO a la cola de routing
@@ -0,0 +1,74 @@
+# src/routerlab/core/link_metrics.py
+# Métricas dinámicas por enlace a partir del RTT medido (EWMA + cuantización + histéresis)
+from typing import Any, Dict, Optional
+
+class LinkMetrics:
+    """
+    Convierte muestras de RTT por vecino en la métrica que se anuncia:
+      - srtt: promedio móvil exponencial, srtt = (1 - alpha) * srtt + alpha * rtt
+      - cuantización: métrica = max(1, round(srtt_ms / quantum_ms)) -> variaciones
+        menores a un cuanto no llegan al routing
+      - histéresis: la métrica vigente m solo cambia si srtt_ms / quantum_ms sale de
+        [m * (1 - h) - 0.5, m * (1 + h) + 0.5]; cerca de un borde de cuanto el valor
+        no oscila entre dos métricas
+    Hasta la primera muestra se usa la métrica estática (topología).
+    """
+
+    def __init__(self,
+                 base: Optional[Dict[str, float]] = None,
+                 alpha: float = 0.25,
+                 quantum_ms: float = 5.0,
+                 hysteresis: float = 0.2) -> None:
+        if not 0 < alpha <= 1:
+            raise ValueError("alpha debe estar en (0, 1]")
+        if quantum_ms <= 0 or hysteresis < 0:
+            raise ValueError("se requiere quantum_ms > 0 e hysteresis >= 0")
+        self.base: Dict[str, float] = dict(base or {})
+        self.alpha = float(alpha)
+        self.quantum_ms = float(quantum_ms)
+        self.hysteresis = float(hysteresis)
+        self.srtt: Dict[str, float] = {}         # vecino -> RTT suavizado (s)
+        self._metric: Dict[str, float] = {}      # vecino -> métrica anunciada
+        self._stats: Dict[str, int] = {"samples": 0, "changes": 0, "suppressed": 0}
+
+    def metric(self, neighbor: str, default: float = 1.0) -> float:
+        """Métrica vigente: medida si hay muestras; si no, la estática."""
+        return self._metric.get(neighbor, self.base.get(neighbor, default))
+
+    def on_rtt(self, neighbor: str, rtt_s: float) -> Optional[float]:
+        """Incorpora una muestra. Devuelve la nueva métrica si cambió, o None."""
+        if rtt_s < 0:
+            return None
+        self._stats["samples"] += 1
+        prev = self.srtt.get(neighbor)
+        srtt = rtt_s if prev is None else (1 - self.alpha) * prev + self.alpha * rtt_s
+        self.srtt[neighbor] = srtt
+
+        units = srtt * 1000.0 / self.quantum_ms
+        cur = self._metric.get(neighbor)
+        if cur is not None:
+            lo = cur * (1 - self.hysteresis) - 0.5
+            hi = cur * (1 + self.hysteresis) + 0.5
+            if lo <= units <= hi:
+                if max(1.0, float(round(units))) != cur:
+                    self._stats["suppressed"] += 1
+                return None
+        new = max(1.0, float(round(units)))
+        if new == cur:
+            return None
+        self._metric[neighbor] = new
+        self._stats["changes"] += 1
+        return new
+
+    def forget(self, neighbor: str) -> None:
+        """El vecino cayó: la próxima adyacencia arranca midiendo de cero."""
+        self.srtt.pop(neighbor, None)
+        self._metric.pop(neighbor, None)
+
+    def stats(self) -> Dict[str, Any]:
+        out: Dict[str, Any] = dict(self._stats)
+        out["neighbors"] = {
+            n: {"srtt_ms": round(s * 1000.0, 3), "metric": self.metric(n)}
+            for n, s in self.srtt.items()
+        }
+        return out
@@ -0,0 +1,95 @@
+# src/routerlab/core/liveness.py
+# Detección rápida de caída de vecinos (sondas livianas estilo BFD)
+import asyncio
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+class LivenessSession:
+    """Estado de una sesión con un vecino."""
+    __slots__ = ("neighbor", "up", "remote_interval", "timer", "rx", "downs")
+
+    def __init__(self, neighbor: str) -> None:
+        self.neighbor = neighbor
+        self.up = False                       # pasa a True con el primer probe recibido
+        self.remote_interval: Optional[float] = None
+        self.timer: Optional[asyncio.TimerHandle] = None
+        self.rx = 0
+        self.downs = 0
+
+class LivenessMonitor:
+    """
+    Sondas de vida por vecino (modo asíncrono, como BFD):
+      - cada tx_interval se envía un 'probe' mínimo a cada sesión activa
+      - cada probe recibido re-arma un temporizador de detección
+        (mult × max(tx local, tx anunciado por el vecino)) con loop.call_later:
+        no hay polling, la caída se notifica en cuanto vence el temporizador
+      - al vencer se llama on_down(vecino) una sola vez; la sesión vuelve a UP
+        con el siguiente probe que llegue
+      - una sesión solo puede caer si estuvo UP: los vecinos que no envían probes
+        (otras implementaciones) nunca se declaran caídos por este mecanismo
+    """
+
+    def __init__(self,
+                 send: Callable[[str, float], Awaitable[None]],
+                 on_down: Callable[[str], None],
+                 tx_interval: float = 0.2,
+                 mult: int = 3) -> None:
+        if tx_interval <= 0 or mult < 1:
+            raise ValueError("se requiere tx_interval > 0 y mult >= 1")
+        self._send = send
+        self._on_down = on_down
+        self.tx_interval = float(tx_interval)
+        self.mult = int(mult)
+        self.sessions: Dict[str, LivenessSession] = {}
+
+    # ---- Sesiones ----
+    def start(self, neighbor: str) -> None:
+        self.sessions.setdefault(neighbor, LivenessSession(neighbor))
+
+    def stop(self, neighbor: str) -> None:
+        s = self.sessions.pop(neighbor, None)
+        if s is not None and s.timer is not None:
+            s.timer.cancel()
+
+    def detection_time(self, neighbor: str) -> float:
+        s = self.sessions.get(neighbor)
+        remote = s.remote_interval if s is not None and s.remote_interval else 0.0
+        return self.mult * max(self.tx_interval, remote)
+
+    # ---- Recepción (event-driven) ----
+    def on_probe(self, neighbor: str, interval: Optional[float] = None) -> None:
+        s = self.sessions.get(neighbor)
+        if s is None:
+            return
+        s.rx += 1
+        if interval:
+            s.remote_interval = float(interval)
+        if not s.up:
+            s.up = True
+            print(f"[BFD] sesión con {neighbor} UP (detección={self.detection_time(neighbor):.3f}s)")
+        if s.timer is not None:
+            s.timer.cancel()
+        loop = asyncio.get_running_loop()
+        s.timer = loop.call_later(self.detection_time(neighbor), self._expire, neighbor)
+
+    def _expire(self, neighbor: str) -> None:
+        s = self.sessions.get(neighbor)
+        if s is None or not s.up:
+            return
+        s.up = False
+        s.timer = None
+        s.downs += 1
+        print(f"[BFD] sesión con {neighbor} DOWN ({self.mult} probes perdidos)")
+        self._on_down(neighbor)
+
+    # ---- Transmisión ----
+    async def run(self) -> None:
+        while True:
+            for nbr in list(self.sessions):
+                await self._send(nbr, self.tx_interval)
+            await asyncio.sleep(self.tx_interval)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            n: {"up": s.up, "rx": s.rx, "downs": s.downs, "detection_s": self.detection_time(n)}
+            for n, s in self.sessions.items()
+        }
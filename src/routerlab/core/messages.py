@@ -1,4 +1,4 @@
-from typing import Dict, Any
+from typing import Dict, Any, List, Optional, Tuple
 
 def _node_to_addr(node: str, group_prefix: str = "grupo") -> str:
     """
@@ -19,16 +19,24 @@ def addr_to_node(addr: str) -> str:
         return addr   # si ya está como "N#"
 
 
-def make_hello(src: str, dst: str, hops: float, group_prefix: str = "grupo") -> Dict[str, Any]:
+def make_hello(src: str, dst: str, hops: float, group_prefix: str = "grupo",
+               interval: float | None = None, probe: bool = False) -> Dict[str, Any]:
     """
     Construye un mensaje tipo 'hello'
+      - interval: intervalo de HELLO vigente del emisor (el receptor ajusta su hold time)
+      - probe: pide al vecino que responda con un HELLO inmediato
     """
-    return {
+    wire = {
         "type": "hello",
         "from": _node_to_addr(src, group_prefix),
         "to": _node_to_addr(dst, group_prefix),
         "hops": float(hops)
     }
+    if interval is not None:
+        wire["interval"] = float(interval)
+    if probe:
+        wire["probe"] = True
+    return wire
 
 def make_message(src: str, dst: str, hops: float, group_prefix: str = "grupo") -> Dict[str, Any]:
     """
@@ -40,3 +48,93 @@ def make_message(src: str, dst: str, hops: float, group_prefix: str = "grupo") -
         "to": _node_to_addr(dst, group_prefix),
         "hops": float(hops)
     }
+
+def make_probe(src: str, dst: str, interval: float, group_prefix: str = "grupo") -> Dict[str, Any]:
+    """
+    Construye un 'probe' de vida (mínimo, sin payload): anuncia el intervalo de envío
+    para que el vecino dimensione su tiempo de detección.
+    """
+    return {
+        "type": "probe",
+        "from": _node_to_addr(src, group_prefix),
+        "to": _node_to_addr(dst, group_prefix),
+        "interval": float(interval),
+    }
+
+def make_echo(src: str, dst: str, ts: float, reply: bool = False,
+              group_prefix: str = "grupo") -> Dict[str, Any]:
+    """
+    Sonda de RTT: 'echo' lleva el reloj monotónico del emisor y el vecino lo devuelve
+    intacto en un 'echo_reply' (RTT = ahora - ts, sin sincronizar relojes).
+    """
+    return {
+        "type": "echo_reply" if reply else "echo",
+        "from": _node_to_addr(src, group_prefix),
+        "to": _node_to_addr(dst, group_prefix),
+        "ts": float(ts),
+    }
+
+def make_info(src: str, dst: str, vector: Dict[str, Optional[float]], full: bool = False,
+              group_prefix: str = "grupo") -> Dict[str, Any]:
+    """
+    Vector de distancias (DVR).
+      - full=True: vector completo (al levantar la adyacencia); reemplaza al anterior
+      - full=False: delta con solo los destinos que cambiaron
+      - costo None = inalcanzable (retiro o poison reverse)
+    """
+    return {
+        "type": "info",
+        "from": _node_to_addr(src, group_prefix),
+        "to": _node_to_addr(dst, group_prefix),
+        "vector": dict(vector),
+        "full": bool(full),
+    }
+
+def make_dv_query(src: str, dst: str, vector: Dict[str, Optional[float]], reply: bool = False,
+                  group_prefix: str = "grupo") -> Dict[str, Any]:
+    """
+    Cómputo difuso DUAL (DV_MODE=dual): 'dv_query' pide a los vecinos su distancia a
+    los destinos del vector (que lleva la del emisor); se contesta con 'dv_reply'.
+    """
+    return {
+        "type": "dv_reply" if reply else "dv_query",
+        "from": _node_to_addr(src, group_prefix),
+        "to": _node_to_addr(dst, group_prefix),
+        "vector": dict(vector),
+    }
+
+def make_dbd(src: str, dst: str, summary: List[Tuple[str, int, int]], reply: bool = False,
+             group_prefix: str = "grupo") -> Dict[str, Any]:
+    """
+    Construye un 'dbd' (database description): resumen [origen, seq, checksum] de la LSDB.
+    reply=True indica que es la respuesta a un DBD recibido (no se vuelve a responder).
+    """
+    return {
+        "type": "dbd",
+        "from": _node_to_addr(src, group_prefix),
+        "to": _node_to_addr(dst, group_prefix),
+        "summary": [[o, int(seq), int(ck)] for o, seq, ck in summary],
+        "reply": bool(reply),
+    }
+
+def make_ls_request(src: str, dst: str, origins: List[str], group_prefix: str = "grupo") -> Dict[str, Any]:
+    """
+    Construye un 'lsreq': orígenes cuyas filas faltan o están desactualizadas.
+    """
+    return {
+        "type": "lsreq",
+        "from": _node_to_addr(src, group_prefix),
+        "to": _node_to_addr(dst, group_prefix),
+        "origins": list(origins),
+    }
+
+def make_ls_update(src: str, dst: str, rows: Dict[str, Dict[str, Any]], group_prefix: str = "grupo") -> Dict[str, Any]:
+    """
+    Construye un 'lsu' con las filas pedidas: {origen: {"seq": s, "links": {vecino: costo}}}.
+    """
+    return {
+        "type": "lsu",
+        "from": _node_to_addr(src, group_prefix),
+        "to": _node_to_addr(dst, group_prefix),
+        "rows": rows,
+    }
@@ -1,22 +1,41 @@
 
-import json, asyncio, os
-from typing import Dict, Any, Optional, Callable
+import json, asyncio, os, time
+from typing import Dict, Any, Mapping, Optional, Callable
 from routerlab.core.forwarding import Forwarder
-from routerlab.algorithms.distance_vector import DistanceVector
+from routerlab.algorithms.distance_vector import DV_INFINITY, DV_SIA_TIMEOUT, DistanceVector
 from routerlab.algorithms.dijkstra import Dijkstra
 from routerlab.algorithms.link_state import LinkState
-from routerlab.core.messages import make_hello, make_message, addr_to_node
-
-def _load_topo(path: str) -> dict[str, Any]:
-    with open(path, "r", encoding="utf-8") as f:
-        data = json.load(f)
-    assert data.get("type") == "topo"
-    return data["config"]
+from routerlab.core.messages import (
+    make_hello, make_message, make_probe, make_echo, make_info, make_dv_query, make_dbd, make_ls_request,
+    make_ls_update, addr_to_node,
+)
+from routerlab.core.link_metrics import LinkMetrics
+from routerlab.core.liveness import LivenessMonitor
+from routerlab.core.persistence import StateStore
+from routerlab.core.profiling import StageTimers, TimedTransport, install_toggle, shared_profiler
+from routerlab.core.queues import IngressQueue
+from routerlab.core.routing import SpfScheduler
+from routerlab.core.spf_cache import shared_spf_cache
+from routerlab.core.tables import RouteDiff, format_route_diff
+from routerlab.core.timers import AdaptiveTimer
+from routerlab.core.watchdog import shared_watchdog
+from routerlab.core.topology import load_topology
+
+def _load_topo(path: str) -> Mapping[str, Any]:
+    # JSON o artefacto compilado (mmap): solo se lee la fila de este nodo
+    return load_topology(path)
 
 class RouterNode:
     def __init__(self, node_id: str, transport, topo_path: str, proto: str = "flooding"):
         self.id = node_id
         self.transport = transport
+        # PROFILE=1: tiempos por etapa (decode, cola, SPF, INFO, send); SIGUSR1 alterna el muestreo
+        self.timers = StageTimers(enabled=self._env("PROFILE", "0") == "1")
+        if self.timers.enabled:
+            self.transport = TimedTransport(transport, self.timers)
+        self.profiler = shared_profiler(self.id)
+        # WATCHDOG=1: lag del event loop + stack de la tarea que lo bloquea (uno por proceso)
+        self.watchdog = shared_watchdog()
         topo = _load_topo(topo_path)
 
         # neighbors_raw puede ser list[str] o dict[str, float]
@@ -29,29 +48,57 @@ class RouterNode:
             self.neighbors_costs = {n: 1.0 for n in self.neighbors_list}
 
         self.proto = proto
-        self.route_queue: asyncio.Queue[Dict[str, Any]] = asyncio.Queue()
+        # Cola de eventos de routing acotada: HELLO nunca espera detrás de LSPs
+        self.route_queue = IngressQueue.from_env("ROUTE_QUEUE", name=f"{self.id}:route_queue")
+
+        # SPF fuera del event loop: SPF_MODE=inline (default) | thread | process
+        self.SPF_MODE = os.getenv("SPF_MODE", "inline")
 
         # Selección de algoritmo
         next_hop_func: Optional[Callable[[str], Optional[str]]] = None
         if self.proto == "dvr":
-            self.alg = DistanceVector()
+            # DV_MODE=bf (Bellman-Ford + poison reverse) | dual (sucesores factibles)
+            self.alg = DistanceVector(infinity=float(os.getenv("DV_INFINITY", str(DV_INFINITY))),
+                                      mode=os.getenv("DV_MODE", "bf"),
+                                      sia_timeout=float(os.getenv("DV_SIA_TIMEOUT", str(DV_SIA_TIMEOUT))))
             # DV agradece costos directos si existen
             self.alg.on_init(self.id, self.neighbors_costs)
             next_hop_func = self.alg.next_hop
         elif self.proto == "dijkstra":
             # Si tu Dijkstra necesita el grafo global por path, déjalo como estaba;
             # si solo requiere vecindad, también puede usar neighbors_list.
-            self.alg = Dijkstra(topo_path)
+            # DIJKSTRA_MODE=eager (SPF completo al iniciar) | lazy (A* por destino, bajo demanda)
+            # NEXTHOP_TABLE: tabla precalculada con routerlab.algorithms.all_pairs (sin SPF local)
+            self.alg = Dijkstra(topo_path, mode=os.getenv("DIJKSTRA_MODE", "eager"),
+                                landmarks=int(os.getenv("DIJKSTRA_LANDMARKS", "0")),
+                                table_path=os.getenv("NEXTHOP_TABLE") or None,
+                                spf_cache=shared_spf_cache())
             self.alg.on_init(self.id, self.neighbors_list)
+            if os.getenv("NEXTHOP_TABLE") and not self.alg.table_loaded:
+                print(f"[{self.id}] NEXTHOP_TABLE no corresponde a la topología: se corre SPF local")
             next_hop_func = self.alg.next_hop
         elif self.proto == "lsr":
-            self.alg = LinkState()
+            # LFA=1 calcula respaldos (un SPF extra por vecino). Por defecto solo con el SPF
+            # fuera del loop: en inline esos SPF extra bloquearían el event loop
+            # SPF_CACHE_SIZE / SPF_CACHE_DIR: cache de SPF compartido por los nodos del proceso
+            lfa_default = "0" if self.SPF_MODE == "inline" else "1"
+            self.alg = LinkState(lfa=os.getenv("LFA", lfa_default) == "1", spf_cache=shared_spf_cache())
             # LinkState acepta list o dict; le pasamos dict (costos reales)
             self.alg.on_init(self.id, self.neighbors_costs)
             next_hop_func = self.alg.next_hop
         else:
             self.alg = None
 
+        self._spf: Optional[SpfScheduler] = None
+        if (self.SPF_MODE != "inline" and hasattr(self.alg, "spf_snapshot")
+                and not getattr(self.alg, "lazy", False)):
+            self._spf = SpfScheduler(self.alg, self.SPF_MODE, timers=self.timers)
+            if hasattr(self.alg, "recompute_hook"):
+                self.alg.recompute_hook = self._spf.request
+        elif hasattr(self.alg, "recompute_hook"):
+            # SPF que dispara el propio algoritmo (on_hello/on_message/on_ls_update): también se mide
+            self.alg.recompute_hook = self._recompute
+
         # Forwarder SIEMPRE recibe lista de vecinos (para flooding / envío)
         self.forwarder = Forwarder(
             send_func=self.transport.send,
@@ -60,56 +107,379 @@ class RouterNode:
             route_next_hop=next_hop_func,
             route_event_queue=self.route_queue,
         )
-
-        self.HELLO_INTERVAL = int(os.getenv("HELLO_INTERVAL", "3"))
-        self.INFO_INTERVAL  = int(os.getenv("INFO_INTERVAL",  "5"))
-        self.NEIGHBOR_DEAD = float(os.getenv("NEIGHBOR_DEAD", "5"))
-        self.NODE_DEAD     = float(os.getenv("NODE_DEAD", "15"))
+        # El cache de flujos del forwarder se invalida con los cambios de la FIB
+        fib = getattr(self.alg, "fib", None)
+        if fib is not None:
+            self.forwarder.follow_routes(fib.changes.subscribe())
+        # Volcado periódico de LSDB/rutas (ROUTE_DUMP_INTERVAL s, solo si cambiaron; 0 lo apaga)
+        self.ROUTE_DUMP_INTERVAL = float(self._env("ROUTE_DUMP_INTERVAL", "30"))
+        self._dumped_generation: Optional[int] = None
+        # Drivers con multicast a vecinos (REDIS_MULTICAST=1) escuchan el canal de salida de cada vecino
+        if hasattr(self.transport, "watch_neighbors"):
+            self.transport.watch_neighbors(self.neighbors_list)
+
+        self.HELLO_INTERVAL = int(self._env("HELLO_INTERVAL", "3"))
+        self.INFO_INTERVAL  = int(self._env("INFO_INTERVAL",  "5"))
+        self.NEIGHBOR_DEAD = float(self._env("NEIGHBOR_DEAD", "5"))
+        self.NODE_DEAD     = float(self._env("NODE_DEAD", "15"))
+
+        # Timers adaptativos: se alejan con la red estable y vuelven al mínimo ante cambios.
+        # Cotas por nodo: HELLO_MIN/HELLO_MAX/INFO_MIN/INFO_MAX (o <VAR>_<NODO>, p.ej. INFO_MAX_N1)
+        #   - HELLO_MAX (default HELLO_INTERVAL): el HELLO no se espacia salvo que se pida, porque
+        #     el vecino dimensiona su hold time como HOLD_MULT * intervalo anunciado
+        #   - INFO_MAX (default NODE_DEAD / HOLD_MULT, no menos que INFO_INTERVAL): el backoff
+        #     del INFO llega hasta donde el NODE_DEAD configurado sigue alcanzando
+        # Hold time = max(NEIGHBOR_DEAD, HOLD_MULT * intervalo anunciado por el vecino)
+        self.HOLD_MULT = float(self._env("HOLD_MULT", "1.5"))
+        backoff = float(self._env("TIMER_BACKOFF", "2"))
+        self.hello_timer = AdaptiveTimer("hello", self.HELLO_INTERVAL,
+                                         float(self._env("HELLO_MIN", "1")),
+                                         float(self._env("HELLO_MAX", str(self.HELLO_INTERVAL))), backoff)
+        info_max = max(float(self.INFO_INTERVAL), self.NODE_DEAD / self.HOLD_MULT)
+        self.info_timer = AdaptiveTimer("info", self.INFO_INTERVAL,
+                                        float(self._env("INFO_MIN", "1")),
+                                        float(self._env("INFO_MAX", str(info_max))), backoff)
+        # Los LSP remotos se refrescan a lo sumo cada INFO_MAX: no expirarlos antes. Con los
+        # defaults no cambia nada; un INFO_MAX explícito más alto sí alarga NODE_DEAD (se avisa)
+        node_dead = max(self.NODE_DEAD, self.HOLD_MULT * self.info_timer.max_s)
+        if node_dead > self.NODE_DEAD + 1e-9:
+            print(f"[TIMER][{self.id}] NODE_DEAD {self.NODE_DEAD}s -> {node_dead}s "
+                  f"(HOLD_MULT={self.HOLD_MULT} x INFO_MAX={self.info_timer.max_s}s)")
+            self.NODE_DEAD = node_dead
 
         # Estado de “suscripción”
         self._last_seen: Dict[str, float] = {}        # vecino -> ts del último hello/info
         self._active_neighbors: set[str] = set()      # vecinos confirmados (suscriptos)
+        self._hold: Dict[str, float] = {}             # vecino -> hold time según su intervalo
+        self._suspected: set[str] = set()             # vecinos con HELLO atrasado (sondeados)
+        self._seen_version = self._state_version()
+        # Overhead del plano de control DV (vectores completos vs deltas)
+        self._dv_stats: Dict[str, int] = {"full_msgs": 0, "delta_msgs": 0, "query_msgs": 0,
+                                          "reply_msgs": 0, "entries": 0, "bytes": 0}
+        self._dv_flush: Optional[asyncio.Task] = None
+        self.DV_TRIGGER_DELAY = float(self._env("DV_TRIGGER_DELAY", "0.2"))
+
+        # Detección rápida de caídas (LIVENESS=1): probes sub-segundo, aviso por evento
+        self.liveness: Optional[LivenessMonitor] = None
+        if self._env("LIVENESS", "0") == "1":
+            self.liveness = LivenessMonitor(
+                send=self._send_probe,
+                on_down=self._on_liveness_down,
+                tx_interval=float(self._env("PROBE_INTERVAL", "0.2")),
+                mult=int(self._env("PROBE_MULT", "3")),
+            )
         self.SUBSCRIBE_ACK = os.getenv("SUBSCRIBE_ACK", "1") == "1"  # responde hello inmediato
 
+        # Reinicio en caliente (WARM_STATE_DIR): snapshot de LSDB/secuencias/FIB cada
+        # WARM_SNAPSHOT_INTERVAL s; al arrancar se carga como estado viejo por WARM_GRACE s
+        self.state_store: Optional[StateStore] = None
+        warm_dir = self._env("WARM_STATE_DIR", "")
+        if warm_dir and hasattr(self.alg, "warm_state"):
+            self.state_store = StateStore(os.path.join(warm_dir, f"{self.id}.json"), self.id)
+            self.WARM_SNAPSHOT_INTERVAL = float(self._env("WARM_SNAPSHOT_INTERVAL", "5"))
+            self.WARM_GRACE = float(self._env("WARM_GRACE", str(self.NODE_DEAD)))
+        self._saved_version: Optional[tuple] = None
+
+        # Métricas por RTT (DYNAMIC_METRICS=1): echo cada ECHO_INTERVAL, EWMA + cuantos + histéresis
+        self.metrics: Optional[LinkMetrics] = None
+        if self._env("DYNAMIC_METRICS", "0") == "1":
+            self.ECHO_INTERVAL = float(self._env("ECHO_INTERVAL", "1"))
+            self.metrics = LinkMetrics(
+                base=self.neighbors_costs,
+                alpha=float(self._env("METRIC_ALPHA", "0.25")),
+                quantum_ms=float(self._env("METRIC_QUANTUM_MS", "5")),
+                hysteresis=float(self._env("METRIC_HYSTERESIS", "0.2")),
+            )
+
+    def _env(self, name: str, default: str) -> str:
+        """Variable de entorno con override por nodo: <NAME>_<NODE_ID> tiene prioridad."""
+        return os.getenv(f"{name}_{self.id}", os.getenv(name, default))
+
+    def _state_version(self) -> int:
+        """Versión del estado de routing (LSDB si existe; si no, generación de la FIB)."""
+        lsdb = getattr(self.alg, "lsdb", None)
+        if hasattr(lsdb, "version"):
+            return lsdb.version
+        fib = getattr(self.alg, "fib", None)
+        return fib.generation if fib is not None else 0
+
+    def _note_change(self):
+        """Si el estado de routing cambió, acorta HELLO/INFO (refresco rápido alrededor del cambio)."""
+        version = self._state_version()
+        if version != self._seen_version:
+            self._seen_version = version
+            self.hello_timer.tighten()
+            self.info_timer.tighten()
+
+    async def _send_probe(self, nbr: str, interval: float):
+        await self.transport.send(nbr, make_probe(self.id, nbr, interval))
+
+    def _on_liveness_down(self, nbr: str):
+        # Se encola como evento de control: el routing task lo procesa sin polling
+        self.route_queue.put_nowait({"type": "neighbor_down", "from": nbr})
+
+    async def _echo_task(self):
+        """Mide el RTT a cada vecino (activos; si no hay, los de la topología)."""
+        loop = asyncio.get_running_loop()
+        while True:
+            targets = list(self._active_neighbors) if self._active_neighbors else self.neighbors_list
+            for nbr in targets:
+                await self.transport.send(nbr, make_echo(self.id, nbr, loop.time()))
+            await asyncio.sleep(self.ECHO_INTERVAL)
+
+    def _on_echo_reply(self, nbr: str, ts: float):
+        rtt = asyncio.get_running_loop().time() - float(ts)
+        metric = self.metrics.on_rtt(nbr, rtt)
+        if metric is None:
+            return
+        print(f"[METRIC][{self.id}] {nbr}: srtt={self.metrics.srtt[nbr] * 1000:.2f}ms -> métrica {metric}")
+        # El HELLO anuncia la métrica nueva; el cambio de costo pasa por la cola de routing
+        self.neighbors_costs[nbr] = metric
+        self.route_queue.put_nowait({"type": "metric", "from": nbr, "metric": metric})
+
+    def _apply_metric(self, nbr: str, metric: float) -> bool:
+        """Instala el costo medido del enlace en el algoritmo. True si cambió algo."""
+        if hasattr(self.alg, "mark_neighbor_active"):
+            return nbr in self._active_neighbors and self.alg.mark_neighbor_active(nbr, metric)
+        if hasattr(self.alg, "cost") and self.alg.cost.get(nbr) != metric:
+            self.alg.cost[nbr] = metric
+            return True
+        return False
+
+    def _expire_neighbor(self, n: str, reason: str):
+        """Da de baja un vecino directo: sale de la LSDB y el enlace queda en hold-down."""
+        self._active_neighbors.discard(n)
+        self._suspected.discard(n)
+        if self.liveness is not None:
+            self.liveness.stop(n)
+        if self.metrics is not None:
+            self.metrics.forget(n)
+        if hasattr(self.alg, "fail_over"):
+            # Reparación local inmediata con los LFA; el SPF completo corre después
+            self.alg.fail_over(n)
+        if hasattr(self.alg, "hold_down_link"):
+            # Evita re-aprender el enlace caído desde LSPs viejos de otros nodos
+            self.alg.hold_down_link(n, self.NODE_DEAD)
+        if hasattr(self.alg, "purge_node_everywhere") and self.alg.purge_node_everywhere(n):
+            print(f"[{self.id}] neighbor expired: {n} ({reason})")
+            self._recompute()
+
+    def control_stats(self) -> Dict[str, Any]:
+        """Overhead de control (envíos/intervalos) y tiempo de detección vigente."""
+        holds = [self._hold.get(n, self.NEIGHBOR_DEAD) for n in self._active_neighbors]
+        return {
+            "hello": self.hello_timer.stats(),
+            "info": self.info_timer.stats(),
+            "detection_time_s": max(holds) if holds else self.NEIGHBOR_DEAD,
+            "node_dead_s": self.NODE_DEAD,
+            "liveness": self.liveness.stats() if self.liveness is not None else None,
+            "metrics": self.metrics.stats() if self.metrics is not None else None,
+            "warm": ({**self.state_store.stats, **self.alg.stale_state()}
+                     if self.state_store is not None else None),
+            "spf_cache": self.alg.spf_cache.stats() if getattr(self.alg, "spf_cache", None) else None,
+            "stages": self.timers.stats() if self.timers.enabled else None,
+            "watchdog": self.watchdog.stats() if self.watchdog is not None else None,
+            "publish": self.transport.publish_stats() if hasattr(self.transport, "publish_stats") else None,
+            "forwarder": dict(self.forwarder.stats),
+            "dv": {**self._dv_stats, **getattr(self.alg, "stats", {})} if hasattr(self.alg, "vector_for") else None,
+        }
+
+    def ingress_stats(self) -> Dict[str, Any]:
+        """Contadores de descarte/ocupación de las colas de ingreso (routing + transporte)."""
+        stats: Dict[str, Any] = {"route_queue": self.route_queue.stats()}
+        if hasattr(self.transport, "ingress_stats"):
+            stats["transport"] = self.transport.ingress_stats()
+        return stats
+
+    def _warm_restore(self) -> None:
+        """Carga el último snapshot (si hay) como estado viejo pero usable."""
+        if self.state_store is None:
+            return
+        state = self.state_store.load()
+        if not state:
+            return
+        self.alg.restore_warm(state, self.WARM_GRACE)
+        # Los orígenes restaurados cuentan su NODE_DEAD desde el arranque, no desde 0
+        now = asyncio.get_running_loop().time()
+        for origin, links in self.alg.lsdb.items():
+            self._last_seen.setdefault(origin, now)
+            for n in links:
+                self._last_seen.setdefault(n, now)
+        self._recompute()
+
+    def _save_state(self) -> None:
+        version = (self._state_version(), self.alg.fib.generation)
+        if version != self._saved_version and self.state_store.save(self.alg.warm_state()):
+            self._saved_version = version
+
+    async def _snapshot_task(self):
+        """Snapshot periódico (solo si cambió la LSDB o la FIB desde el último)."""
+        while True:
+            await asyncio.sleep(self.WARM_SNAPSHOT_INTERVAL)
+            self._save_state()
+
+    def dump_routes(self) -> None:
+        """Imprime la LSDB y la tabla de rutas completas (o la FIB si el algoritmo no las tiene)."""
+        fib = getattr(self.alg, "fib", None)
+        if fib is None:
+            return
+        self._dumped_generation = fib.generation
+        if hasattr(self.alg, "print_lsdb"):
+            self.alg.print_lsdb()
+        if hasattr(self.alg, "print_routes"):
+            self.alg.print_routes()
+            return
+        print(f"[{self.id}] Tabla de rutas (gen={fib.generation}):")
+        for line in format_route_diff(self.id, RouteDiff(fib.generation, added=dict(fib.routes))):
+            print(line)
+
+    async def _route_dump_task(self):
+        """Vuelca las tablas cada ROUTE_DUMP_INTERVAL s si la FIB cambió desde el último volcado."""
+        while True:
+            await asyncio.sleep(self.ROUTE_DUMP_INTERVAL)
+            if self.alg.fib.generation != self._dumped_generation:
+                self.dump_routes()
+
+    def _recompute(self):
+        """Recalcula rutas en línea o, si SPF_MODE lo indica, en el executor."""
+        if self._spf is not None:
+            self._spf.request()
+        else:
+            with self.timers.stage("spf"):
+                self.alg.recompute()
+
+    async def _send_dbd(self, nbr: str, reply: bool = False):
+        """Envía el resumen (origen, seq, checksum) de mi LSDB a 'nbr'."""
+        if not hasattr(self.alg, "database_summary"):
+            return
+        wire = make_dbd(self.id, nbr, self.alg.database_summary(), reply=reply)
+        print(f"[SYNC][{self.id}] DBD -> {nbr} ({len(wire['summary'])} orígenes)")
+        await self.transport.send(nbr, wire)
+
+    async def _send_vector(self, nbr: str, dests=None):
+        """INFO DV a 'nbr': completo si dests es None, si no solo esos destinos (delta)."""
+        full = dests is None
+        wire = make_info(self.id, nbr, self.alg.vector_for(nbr, dests), full=full)
+        self._dv_stats["full_msgs" if full else "delta_msgs"] += 1
+        self._dv_stats["entries"] += len(wire["vector"])
+        self._dv_stats["bytes"] += len(json.dumps(wire))
+        print(f"[INFO][{self.id}] {'vector' if full else 'delta'} -> {nbr} ({len(wire['vector'])} destinos)")
+        await self.transport.send(nbr, wire)
+
+    async def _flush_vector_changes(self):
+        """
+        Triggered update: agenda el envío de los destinos que cambiaron como delta a los
+        vecinos activos. Los cambios que llegan dentro de DV_TRIGGER_DELAY se agrupan en
+        un solo INFO por vecino (en lugar de un mensaje por evento).
+        """
+        if not hasattr(self.alg, "take_changes") or self._dv_flush is not None:
+            return
+        self._dv_flush = asyncio.create_task(self._send_vector_changes())
+
+    async def _send_vector_changes(self):
+        try:
+            await asyncio.sleep(self.DV_TRIGGER_DELAY)
+        finally:
+            self._dv_flush = None
+        if hasattr(self.alg, "take_diffusing"):
+            for kind, per_nbr in self.alg.take_diffusing().items():
+                for nbr, vector in per_nbr.items():
+                    wire = make_dv_query(self.id, nbr, vector, reply=(kind == "reply"))
+                    self._dv_stats[f"{kind}_msgs"] += 1
+                    self._dv_stats["bytes"] += len(json.dumps(wire))
+                    await self.transport.send(nbr, wire)
+        changed = self.alg.take_changes()
+        if not changed:
+            return
+        for nbr in list(self._active_neighbors):
+            await self._send_vector(nbr, sorted(changed))
+        self.info_timer.count_sent(len(self._active_neighbors))
+
     async def _send_hello(self):
         """
         Envía HELLO a vecinos. Si hay vecinos activos, saluda solo a esos;
         si no, a todos los definidos en la topología.
         """
+        last_version = self._state_version()
         while True:
             targets = list(self._active_neighbors) if self._active_neighbors else self.neighbors_list
             for nbr in targets:
-                metric = float(self.neighbors_costs.get(nbr, 1.0))
-                wire = make_hello(self.id, nbr, metric)
-                print(f"[HELLO][{self.id}] HELLO enviado -> {wire}")  
-
+                await self._send_hello_to(nbr)
+            self.hello_timer.count_sent(len(targets))
+
+            # Estable = sin vecinos sospechosos y sin cambios desde el último HELLO
+            version = self._state_version()
+            if not self._suspected and version == last_version and self.hello_timer.backoff():
+                print(f"[TIMER][{self.id}] hello: intervalo -> {self.hello_timer.interval}s")
+            last_version = version
+            await self.hello_timer.sleep()
+
+    async def _broadcast(self, targets, wire: Dict[str, Any]):
+        if hasattr(self.transport, "broadcast"):
+            await self.transport.broadcast(targets, wire)
+        else:
+            for nbr in targets:
                 await self.transport.send(nbr, wire)
-            await asyncio.sleep(self.HELLO_INTERVAL)
+
+    async def _send_hello_to(self, nbr: str, probe: bool = False):
+        metric = float(self.neighbors_costs.get(nbr, 1.0))
+        wire = make_hello(self.id, nbr, metric, interval=self.hello_timer.interval, probe=probe)
+        print(f"[HELLO][{self.id}] HELLO enviado -> {wire}")
+        await self.transport.send(nbr, wire)
+
+    async def _refresh_vectors(self):
+        """
+        DV: vector completo al levantar la adyacencia y luego deltas disparados por cambios
+        (_flush_vector_changes). Como red de seguridad, cada INFO_MAX s se reenvía el vector
+        completo a los vecinos activos: un delta perdido (descartado en una cola o en el
+        pub/sub) se repara solo en lugar de dejar la ruta vieja hasta que caiga la adyacencia.
+        """
+        while True:
+            await asyncio.sleep(self.info_timer.max_s)
+            targets = list(self._active_neighbors)
+            for nbr in targets:
+                await self._send_vector(nbr)
+            self.info_timer.count_sent(len(targets))
 
     async def _send_info(self):
         """
         Propaga TODA la LSDB que conozco (mis enlaces + enlaces aprendidos)
         """
-        if not self.alg:
+        if not hasattr(self.alg, "lsdb_snapshot"):
+            if hasattr(self.alg, "vector_for"):
+                await self._refresh_vectors()
             return
+        last_version = self._state_version()
         while True:
             confirmed = list(self._active_neighbors) if self._active_neighbors else []
             snapshot = self.alg.lsdb_snapshot()  # 👈 obtenemos toda la LSDB consolidada
 
-            for nbr in self.neighbors_list:
-                for u, adj in snapshot.items():
-                    for v, w in adj.items():
+            # El mismo enlace va a todos los vecinos: un broadcast (un PUBLISH en multicast)
+            sent = 0
+            for u, adj in snapshot.items():
+                for v, w in adj.items():
+                    with self.timers.stage("info_encode"):
                         wire = make_message(u, v, w)
-                        print(f"[MESSAGE][{self.id}] reenviando {u}->{v} w={w} a {nbr}")
-                        await self.transport.send(nbr, wire)
+                        print(f"[MESSAGE][{self.id}] reenviando {u}->{v} w={w} a {self.neighbors_list}")
+                    await self._broadcast(self.neighbors_list, wire)
+                    sent += len(self.neighbors_list)
+            self.info_timer.count_sent(sent)
 
-            await asyncio.sleep(self.INFO_INTERVAL)
+            # LSDB sin cambios desde el último INFO -> espaciar refrescos
+            version = self._state_version()
+            if version == last_version and self.info_timer.backoff():
+                print(f"[TIMER][{self.id}] info: intervalo -> {self.info_timer.interval}s")
+            last_version = version
+            await self.info_timer.sleep()
 
 
     async def _routing_task(self):
         loop = asyncio.get_event_loop()
         while True:
             evt = await self.route_queue.get()
+            t_in = evt.pop("_t", None)
+            if t_in is not None:
+                self.timers.observe("queue_wait", time.perf_counter() - t_in)
             if not self.alg:
                 continue
 
@@ -117,21 +487,52 @@ class RouterNode:
 
             if evt["type"] == "hello":
                 src = evt["from"]
-                metric = float(evt.get("payload", {}).get("metric", 1.0))
+                payload = evt.get("payload", {})
+                metric = float(payload.get("metric", 1.0))
+                if self.metrics is not None:
+                    # Con métricas dinámicas manda lo medido localmente, no lo que anuncia el vecino
+                    metric = self.metrics.metric(src, metric)
                 self._last_seen[src] = now
+                self._suspected.discard(src)
+                if payload.get("interval"):
+                    self._hold[src] = max(self.NEIGHBOR_DEAD, self.HOLD_MULT * float(payload["interval"]))
+                if payload.get("probe") and self.SUBSCRIBE_ACK:
+                    await self._send_hello_to(src)
                 print(f"[HELLO][{self.id}] Recibido HELLO de {src} (metric={metric})")
 
 
                 changed = False
+                newly_up = src not in self._active_neighbors
                 if hasattr(self.alg, "mark_neighbor_active") and self.alg.is_neighbor_known(src):
                     if self.alg.mark_neighbor_active(src, metric):
                         changed = True
+                    # El enlace puede venir ya en la LSDB (restaurado de un snapshot)
+                    if changed or newly_up:
                         self._active_neighbors.add(src)
                         print(f"[{self.id}] subscribe: vecino {src} ACTIVO (metric={metric})")
+                elif newly_up and src in self.neighbors_costs:
+                    self._active_neighbors.add(src)
+                    print(f"[{self.id}] subscribe: vecino {src} ACTIVO (metric={metric})")
 
                 self.alg.on_hello(src, metric)
                 if changed:
-                    self.alg.recompute()
+                    self._recompute()
+                if newly_up and src in self._active_neighbors:
+                    if self.liveness is not None:
+                        self.liveness.start(src)
+                    # Adyacencia nueva: sincronizar LSDB por digest (DBD -> LSREQ -> LSU)
+                    await self._send_dbd(src)
+                    if hasattr(self.alg, "vector_for"):
+                        await self._send_vector(src)
+
+            elif evt["type"] == "metric":
+                if self._apply_metric(evt["from"], float(evt["metric"])):
+                    self._recompute()
+
+            elif evt["type"] == "neighbor_down":
+                src = evt["from"]
+                if src in self._active_neighbors:
+                    self._expire_neighbor(src, f"sin probes en {self.liveness.detection_time(src):.3f}s")
 
             elif evt["type"] == "message":
                 src = evt["from"]
@@ -145,71 +546,199 @@ class RouterNode:
 
                 if hasattr(self.alg, "on_message"):
                     self.alg.on_message(src, dst, hops)
-                self.alg.recompute()
+                self._recompute()
+
+            elif evt["type"] == "info":
+                src = evt["from"]
+                self._last_seen[src] = now
+                self.alg.on_info(src, evt.get("payload", {}))
+                self._recompute()
+
+            elif evt["type"] in ("dv_query", "dv_reply") and hasattr(self.alg, "on_query"):
+                src = evt["from"]
+                self._last_seen[src] = now
+                vector = evt.get("payload", {}).get("vector", {})
+                if evt["type"] == "dv_query":
+                    self.alg.on_query(src, vector)
+                else:
+                    self.alg.on_reply(src, vector)
+                self._recompute()
+
+            elif evt["type"] == "dbd" and hasattr(self.alg, "database_summary"):
+                src = evt["from"]
+                self._last_seen[src] = now
+                wants = self.alg.ls_request_for(evt.get("summary", []))
+                if not evt.get("reply"):
+                    await self._send_dbd(src, reply=True)
+                if wants:
+                    print(f"[SYNC][{self.id}] pidiendo a {src}: {wants}")
+                    await self.transport.send(src, make_ls_request(self.id, src, wants))
+
+            elif evt["type"] == "lsreq" and hasattr(self.alg, "ls_update_for"):
+                src = evt["from"]
+                rows = self.alg.ls_update_for(evt.get("origins", []))
+                if rows:
+                    await self.transport.send(src, make_ls_update(self.id, src, rows))
+
+            elif evt["type"] == "lsu" and hasattr(self.alg, "on_ls_update"):
+                rows = evt.get("rows", {}) or {}
+                for origin in rows:
+                    self._last_seen[origin] = now
+                if self.alg.on_ls_update(rows):
+                    print(f"[SYNC][{self.id}] LSDB sincronizada con {evt['from']}: {sorted(rows)}")
+
+            await self._flush_vector_changes()
+            self._note_change()
+
+    @staticmethod
+    def _decode(raw) -> Optional[Dict[str, Any]]:
+        """Normaliza una trama del transporte (JSON o dict); None si no es un paquete."""
+        if isinstance(raw, str):
+            try:
+                msg = json.loads(raw)
+            except Exception:
+                # si llega basura, la ignoramos
+                return None
+            return msg if isinstance(msg, dict) else None
+        if isinstance(raw, dict):
+            return raw
+        return None
+
+    async def _dispatch(self, raw):
+        """Despacha una trama: bypass (probe/echo/datos) o evento en la cola de routing."""
+        msg = self._decode(raw)
+        if msg is None:
+            return
+
+        # BYPASS forwarder para el modo 'socket' + mensajes simples
+        t = msg.get("type")
+        if t == "probe":
+            # Sin cola: el probe solo re-arma el temporizador de detección
+            if self.liveness is not None:
+                self.liveness.on_probe(addr_to_node(msg.get("from")), msg.get("interval"))
+            return
+        if t == "echo":
+            # Respuesta inmediata (sin cola) para no inflar el RTT medido
+            src = addr_to_node(msg.get("from"))
+            await self.transport.send(src, make_echo(self.id, src, msg.get("ts", 0.0), reply=True))
+            return
+        if t == "echo_reply":
+            if self.metrics is not None:
+                self._on_echo_reply(addr_to_node(msg.get("from")), msg.get("ts", 0.0))
+            return
+        if t == "message" and "payload" in msg and self.forwarder.routes_unicast:
+            # Datos (send_unicast): se reenvían por la FIB, no son anuncios de enlace
+            await self.forwarder.forward_unicast({**msg, "to": addr_to_node(msg.get("to"))})
+            return
+        if t in ("hello", "message"):
+            if t == "hello":
+                await self._enqueue({
+                    "type": "hello",
+                    "from": addr_to_node(msg.get("from")),   
+                    "payload": {
+                        "metric": float(msg.get("hops", 1.0)),
+                        "interval": msg.get("interval"),
+                        "probe": bool(msg.get("probe")),
+                    }
+                })
+            else:
+                await self._enqueue({
+                    "type": "message",
+                    "from": addr_to_node(msg.get("from")),   
+                    "to":   addr_to_node(msg.get("to")),     
+                    "hops": float(msg.get("hops", 1.0))
+                })
+        elif t == "info":
+            await self._enqueue({
+                "type": "info",
+                "from": addr_to_node(msg.get("from")),
+                "payload": {"vector": msg.get("vector", {}), "full": msg.get("full", True)},
+            })
+        elif t in ("dv_query", "dv_reply"):
+            await self._enqueue({
+                "type": t,
+                "from": addr_to_node(msg.get("from")),
+                "payload": {"vector": msg.get("vector", {})},
+            })
+        elif t in ("dbd", "lsreq", "lsu"):
+            evt = {k: v for k, v in msg.items() if k in ("type", "summary", "reply", "origins", "rows")}
+            evt["from"] = addr_to_node(msg.get("from"))
+            await self._enqueue(evt)
+
+    async def _enqueue(self, evt: Dict[str, Any]):
+        if self.timers.enabled:
+            evt["_t"] = time.perf_counter()   # para medir la espera en la cola de routing
+        await self.route_queue.put(evt)
 
     async def run(self):
         print(f"[{self.id}] up. neighbors={self.neighbors_costs if self.neighbors_costs else self.neighbors_list} addr={self.transport.me()} proto={self.proto}")
+        self._warm_restore()
+        # Tareas con nombre "<nodo>:<rol>": el watchdog y el profiler las reportan así
         tasks = [
-            asyncio.create_task(self._routing_task()),
-            asyncio.create_task(self._send_hello()),
-            asyncio.create_task(self._send_info()),
-            asyncio.create_task(self._aging_task()),
+            asyncio.create_task(self._routing_task(), name=f"{self.id}:routing"),
+            asyncio.create_task(self._send_hello(), name=f"{self.id}:hello"),
+            asyncio.create_task(self._send_info(), name=f"{self.id}:info"),
+            asyncio.create_task(self._aging_task(), name=f"{self.id}:aging"),
         ]
+        if self.liveness is not None:
+            tasks.append(asyncio.create_task(self.liveness.run(), name=f"{self.id}:liveness"))
+        if self.metrics is not None:
+            tasks.append(asyncio.create_task(self._echo_task(), name=f"{self.id}:echo"))
+        if self.state_store is not None:
+            tasks.append(asyncio.create_task(self._snapshot_task(), name=f"{self.id}:snapshot"))
+        if self.ROUTE_DUMP_INTERVAL > 0 and hasattr(self.alg, "fib"):
+            tasks.append(asyncio.create_task(self._route_dump_task(), name=f"{self.id}:dump"))
+        if self.watchdog is not None:
+            self.watchdog.attach()
+        if self.profiler is not None:
+            install_toggle(asyncio.get_running_loop(), self.profiler, os.getenv("PROFILE_SIGNAL", "USR1"))
         try:
             async for raw in self.transport.run():
-                if isinstance(raw, str):
-                    try:
-                        msg = json.loads(raw)
-                    except Exception:
-                        # si llega basura, la ignoramos
-                        continue
-                elif isinstance(raw, dict):
-                    msg = raw
-                else:
-                    continue
-
-                # BYPASS forwarder para el modo 'socket' + mensajes simples
-                t = msg.get("type")
-                if t in ("hello", "message"):
-                    if t == "hello":
-                        await self.route_queue.put({
-                            "type": "hello",
-                            "from": addr_to_node(msg.get("from")),   
-                            "payload": {"metric": float(msg.get("hops", 1.0))}
-                        })
-                    else:
-                        await self.route_queue.put({
-                            "type": "message",
-                            "from": addr_to_node(msg.get("from")),   
-                            "to":   addr_to_node(msg.get("to")),     
-                            "hops": float(msg.get("hops", 1.0))
-                        })
-
+                with self.timers.stage("decode"):
+                    msg = self._decode(raw)
+                if msg is not None:
+                    with self.timers.stage("dispatch"):
+                        await self._dispatch(msg)
 
         finally:
             for t in tasks:
                 t.cancel()
+            if self._spf is not None:
+                self._spf.close()
+            if self._dv_flush is not None:
+                self._dv_flush.cancel()
+            if self.state_store is not None:
+                self._save_state()
+            if self.watchdog is not None:
+                self.watchdog.detach()
+            if self.profiler is not None and self.profiler.running:
+                self.profiler.stop()
+            if self.timers.enabled:
+                print(f"[PROF][{self.id}] etapas: {json.dumps(self.timers.stats())}")
     
     async def _aging_task(self):
         """
         Expira:
-          - vecinos directos sin HELLO en NEIGHBOR_DEAD
+          - vecinos directos sin HELLO en su hold time (NEIGHBOR_DEAD o HOLD_MULT × intervalo anunciado)
           - nodos no vecinos sin INFO (LSP) en NODE_DEAD
         """
         loop = asyncio.get_event_loop()
         while True:
             now = loop.time()
 
-            # Vecinos directos que expiraron por falta de HELLO
+            # Vecinos directos que expiraron por falta de HELLO (hold time por vecino)
             expired_neighbors = [
                 n for n in list(self._active_neighbors)
-                if (now - self._last_seen.get(n, now)) > self.NEIGHBOR_DEAD
+                if (now - self._last_seen.get(n, now)) > self._hold.get(n, self.NEIGHBOR_DEAD)
             ]
+            # Vecinos atrasados (más de medio hold): sondeo inmediato y HELLO al mínimo
+            for n in self._active_neighbors - set(expired_neighbors) - self._suspected:
+                if (now - self._last_seen.get(n, now)) > self._hold.get(n, self.NEIGHBOR_DEAD) / 2:
+                    self._suspected.add(n)
+                    self.hello_timer.tighten()
+                    await self._send_hello_to(n, probe=True)
             for n in expired_neighbors:
-                self._active_neighbors.discard(n)
-                if hasattr(self.alg, "purge_node_everywhere") and self.alg.purge_node_everywhere(n):
-                    print(f"[{self.id}] neighbor expired: {n} (>{self.NEIGHBOR_DEAD}s sin HELLO)")
-                    self.alg.recompute()
+                self._expire_neighbor(n, f">{self._hold.get(n, self.NEIGHBOR_DEAD)}s sin HELLO")
             # Nodos no vecinos que expiraron por falta de INFO/LSP
             lsdb = getattr(self.alg, "lsdb", {}) or {}
             # Nodos que aparecen como 'from'
@@ -217,7 +746,7 @@ class RouterNode:
             # Nodos que aparecen como 'to' dentro de cualquier entrada
             keys_to = set()
             for u, nbrs in lsdb.items():
-                if isinstance(nbrs, dict):
+                if isinstance(nbrs, Mapping):
                     keys_to.update(nbrs.keys())
 
             candidates = (keys_from | keys_to) - {self.id} - set(self.neighbors_list)
@@ -229,6 +758,15 @@ class RouterNode:
             for n in expired_remote:
                 if hasattr(self.alg, "purge_node_everywhere") and self.alg.purge_node_everywhere(n):
                     print(f"[{self.id}] node expired: {n} (>{self.NODE_DEAD}s sin INFO)")
-                    self.alg.recompute()
+                    self._recompute()
+            # Estado restaurado que nadie confirmó dentro de WARM_GRACE
+            if hasattr(self.alg, "expire_stale"):
+                self.alg.expire_stale()
+            # Destinos DUAL atascados en ACTIVO: las respuestas perdidas cuentan como inalcanzable
+            if hasattr(self.alg, "expire_active") and self.alg.expire_active():
+                self._recompute()
+
+            await self._flush_vector_changes()
+            self._note_change()
 
             await asyncio.sleep(1.0)
@@ -0,0 +1,66 @@
+# src/routerlab/core/persistence.py
+# Snapshots del estado de routing a disco, a prueba de caídas (para reinicio en caliente)
+import json, os, time
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+SNAPSHOT_VERSION = 1
+
+class StateStore:
+    """
+    Un archivo JSON por nodo con el último estado guardado.
+      - save(): escribe en <archivo>.tmp, fsync, os.replace y fsync del directorio. Un corte
+        en cualquier punto deja el snapshot anterior o el nuevo completo, nunca uno a medias.
+      - load(): None si no hay snapshot, está corrupto, es de otra versión o de otro nodo.
+    """
+
+    def __init__(self, path: str, node_id: str) -> None:
+        self.path = Path(path)
+        self.node_id = node_id
+        self.stats: Dict[str, int] = {"saves": 0, "bytes": 0, "errors": 0}
+
+    def save(self, state: Dict[str, Any]) -> bool:
+        doc = {"version": SNAPSHOT_VERSION, "node": self.node_id, "saved_at": time.time(), **state}
+        data = json.dumps(doc, separators=(",", ":"), sort_keys=True).encode("utf-8")
+        tmp = self.path.with_name(self.path.name + ".tmp")
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            with open(tmp, "wb") as f:
+                f.write(data)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp, self.path)
+            self._fsync_dir()
+        except OSError as e:
+            self.stats["errors"] += 1
+            print(f"[WARM][{self.node_id}] no se pudo guardar el snapshot en {self.path}: {e}")
+            return False
+        self.stats["saves"] += 1
+        self.stats["bytes"] = len(data)
+        return True
+
+    def _fsync_dir(self) -> None:
+        # El rename solo es durable cuando el directorio también llega a disco
+        try:
+            fd = os.open(self.path.parent, os.O_RDONLY)
+        except OSError:
+            return
+        try:
+            os.fsync(fd)
+        except OSError:
+            pass
+        finally:
+            os.close(fd)
+
+    def load(self) -> Optional[Dict[str, Any]]:
+        try:
+            doc = json.loads(self.path.read_text(encoding="utf-8"))
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError) as e:
+            print(f"[WARM][{self.node_id}] snapshot ilegible en {self.path}: {e}")
+            return None
+        if not isinstance(doc, dict) or doc.get("version") != SNAPSHOT_VERSION or doc.get("node") != self.node_id:
+            print(f"[WARM][{self.node_id}] snapshot de otra versión/nodo en {self.path}: ignorado")
+            return None
+        return doc
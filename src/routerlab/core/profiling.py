@@ -0,0 +1,235 @@
+# src/routerlab/core/profiling.py
+# Tiempos por etapa del pipeline y profiler por muestreo activable en caliente
+#
+#   PROFILE=1              -> StageTimers en decode / dispatch / cola de routing / SPF / armado de INFO / send
+#   kill -USR1 <pid>       -> (con PROFILE=1) arranca el muestreo; un segundo USR1 lo detiene y
+#                             escribe <PROFILE_DIR>/<nodo>-<epoch>.folded (stacks colapsados:
+#                             flamegraph.pl, speedscope o inferno los leen tal cual). Un solo
+#                             profiler y un solo handler por proceso (routerlab-<pid> con el launcher)
+#   PROFILE_HZ (default 200), PROFILE_DIR (default "."), PROFILE_SIGNAL (default USR1; "" lo apaga)
+import os, signal, sys, threading, time, weakref
+from collections import Counter
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+class _Stage:
+    __slots__ = ("_timers", "_name", "_t0")
+
+    def __init__(self, timers: "StageTimers", name: str) -> None:
+        self._timers = timers
+        self._name = name
+
+    def __enter__(self) -> "_Stage":
+        self._t0 = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        self._timers.observe(self._name, time.perf_counter() - self._t0)
+
+class _NoStage:
+    __slots__ = ()
+
+    def __enter__(self) -> "_NoStage":
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        return None
+
+_NO_STAGE = _NoStage()
+
+class StageTimers:
+    """
+    Acumula por etapa: cantidad, total, máximo y un histograma log2 en µs (para p50/p99
+    sin guardar muestras). Desactivado, stage() devuelve un contexto vacío compartido.
+      with timers.stage("spf"): alg.recompute()
+      timers.observe("queue_wait", segundos)
+    """
+
+    BUCKETS = 32   # 2^31 µs ~ 35 min: de sobra
+
+    def __init__(self, enabled: bool = True) -> None:
+        self.enabled = enabled
+        self._stages: Dict[str, Dict[str, Any]] = {}
+
+    def stage(self, name: str):
+        return _Stage(self, name) if self.enabled else _NO_STAGE
+
+    def observe(self, name: str, seconds: float) -> None:
+        if not self.enabled:
+            return
+        s = self._stages.get(name)
+        if s is None:
+            s = self._stages[name] = {"count": 0, "total": 0.0, "max": 0.0, "hist": [0] * self.BUCKETS}
+        s["count"] += 1
+        s["total"] += seconds
+        if seconds > s["max"]:
+            s["max"] = seconds
+        s["hist"][min(self.BUCKETS - 1, int(max(seconds, 0.0) * 1e6).bit_length())] += 1
+
+    def _quantile(self, s: Dict[str, Any], q: float) -> float:
+        # Cota superior del bucket que contiene el cuantil (ms), acotada por el máximo visto
+        rank = q * s["count"]
+        seen = 0
+        for i, n in enumerate(s["hist"]):
+            seen += n
+            if seen >= rank and n:
+                return min((1 << i) / 1000.0, round(s["max"] * 1000, 3))
+        return 0.0
+
+    def stats(self) -> Dict[str, Dict[str, float]]:
+        out: Dict[str, Dict[str, float]] = {}
+        for name, s in sorted(self._stages.items()):
+            n = s["count"]
+            out[name] = {
+                "count": n,
+                "total_ms": round(s["total"] * 1000, 3),
+                "mean_ms": round(s["total"] * 1000 / n, 4) if n else 0.0,
+                "p50_ms": self._quantile(s, 0.50),
+                "p99_ms": self._quantile(s, 0.99),
+                "max_ms": round(s["max"] * 1000, 3),
+            }
+        return out
+
+    def reset(self) -> None:
+        self._stages.clear()
+
+class TimedTransport:
+    """Envuelve un Transport y mide send() como etapa 'send'; el resto se delega."""
+
+    def __init__(self, inner: Any, timers: StageTimers) -> None:
+        self.inner = inner
+        self.timers = timers
+
+    def __getattr__(self, name: str) -> Any:
+        if name == "inner":
+            raise AttributeError(name)
+        return getattr(self.inner, name)
+
+    async def send(self, to: str, message: Dict[str, Any]) -> None:
+        t0 = time.perf_counter()
+        try:
+            await self.inner.send(to, message)
+        finally:
+            self.timers.observe("send", time.perf_counter() - t0)
+
+    async def broadcast(self, targets, message: Dict[str, Any]) -> None:
+        t0 = time.perf_counter()
+        try:
+            await self.inner.broadcast(targets, message)
+        finally:
+            self.timers.observe("send", time.perf_counter() - t0)
+
+class SamplingProfiler:
+    """
+    Profiler por muestreo del hilo del event loop: un hilo aparte lee su frame actual cada
+    1/hz s (sys._current_frames) y cuenta stacks colapsados "f1 (a.py:10);f2 (b.py:3)".
+    Sin instrumentar el código: el costo por muestra es recorrer el stack una vez.
+    """
+
+    def __init__(self, hz: float = 200.0, out_dir: str = ".", label: str = "routerlab") -> None:
+        self.interval = 1.0 / max(1.0, float(hz))
+        self.out_dir = Path(out_dir)
+        self.label = label
+        self.samples: Counter = Counter()
+        self._target: Optional[int] = None
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None
+
+    def start(self, target_thread: Optional[int] = None) -> None:
+        if self.running:
+            return
+        self._target = target_thread or threading.get_ident()
+        self.samples = Counter()
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._loop, name="routerlab-profiler", daemon=True)
+        self._thread.start()
+        print(f"[PROF][{self.label}] muestreo activado ({1 / self.interval:.0f} Hz)")
+
+    def stop(self) -> Optional[Path]:
+        """Detiene el muestreo y escribe el perfil; devuelve la ruta (None si no hubo muestras)."""
+        if not self.running:
+            return None
+        self._stop.set()
+        self._thread.join()
+        self._thread = None
+        return self.dump()
+
+    def toggle(self) -> Optional[Path]:
+        if self.running:
+            return self.stop()
+        self.start()
+        return None
+
+    def _loop(self) -> None:
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self._target)
+            if frame is None:
+                continue
+            self.samples[collapse(frame)] += 1
+
+    def dump(self, path: Optional[str | Path] = None) -> Optional[Path]:
+        if not self.samples:
+            print(f"[PROF][{self.label}] sin muestras")
+            return None
+        if path is None:
+            self.out_dir.mkdir(parents=True, exist_ok=True)
+            path = self.out_dir / f"{self.label}-{int(time.time())}.folded"
+        path = Path(path)
+        with open(path, "w", encoding="utf-8") as f:
+            for stack, n in self.samples.most_common():
+                f.write(f"{stack} {n}\n")
+        print(f"[PROF][{self.label}] {sum(self.samples.values())} muestras -> {path}")
+        return path
+
+def collapse(frame) -> str:
+    """Stack de 'frame' en formato colapsado (raíz primero, separado por ';')."""
+    parts = []
+    while frame is not None:
+        code = frame.f_code
+        parts.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})")
+        frame = frame.f_back
+    return ";".join(reversed(parts))
+
+# Señales ya registradas por loop: con varios nodos en un proceso (launcher) la primera
+# instalación gana y las siguientes no pisan el handler
+_toggles: "weakref.WeakKeyDictionary[Any, Dict[int, SamplingProfiler]]" = weakref.WeakKeyDictionary()
+
+def install_toggle(loop, profiler: SamplingProfiler, signame: str = "USR1") -> bool:
+    """
+    Registra (una vez por loop) la señal que activa/detiene el profiler. False si la
+    plataforma no la soporta o si la señal ya alterna otro profiler en este loop.
+    """
+    sig = getattr(signal, f"SIG{signame.upper()}", None) if signame else None
+    if sig is None:
+        return False
+    installed = _toggles.setdefault(loop, {})
+    if sig in installed:
+        return installed[sig] is profiler
+    try:
+        loop.add_signal_handler(sig, profiler.toggle)
+    except (NotImplementedError, RuntimeError, ValueError):
+        return False
+    installed[sig] = profiler
+    return True
+
+_shared: Optional[SamplingProfiler] = None
+
+def shared_profiler(label: str) -> Optional[SamplingProfiler]:
+    """
+    Profiler por muestreo común a los nodos del proceso (muestrea el único event loop).
+    Solo con PROFILE=1 y PROFILE_SIGNAL no vacío. Si lo comparten varios nodos el
+    perfil se etiqueta routerlab-<pid> en lugar del nodo.
+    """
+    global _shared
+    if os.getenv("PROFILE", "0") != "1" or not os.getenv("PROFILE_SIGNAL", "USR1"):
+        return None
+    if _shared is None:
+        _shared = SamplingProfiler(hz=float(os.getenv("PROFILE_HZ", "200")),
+                                   out_dir=os.getenv("PROFILE_DIR", "."), label=label)
+    elif _shared.label != label:
+        _shared.label = f"routerlab-{os.getpid()}"
+    return _shared
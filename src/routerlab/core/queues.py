@@ -0,0 +1,133 @@
+# src/routerlab/core/queues.py
+# Colas de ingreso acotadas (backpressure + descarte priorizando el plano de control)
+import asyncio, os
+from collections import deque
+from typing import Any, Callable, Deque, Dict
+
+# Tipos de paquete que se consideran plano de control (nunca esperan detrás de datos)
+CONTROL_TYPES = {"hello", "probe", "echo", "echo_reply", "neighbor_down", "metric",
+                 "info", "dv_query", "dv_reply", "dbd", "lsreq", "lsu"}
+
+def is_control(item: Any) -> bool:
+    """Clasificador por defecto: HELLO (y afines) es control; el resto es datos."""
+    return isinstance(item, dict) and item.get("type") in CONTROL_TYPES
+
+class IngressQueue:
+    """
+    Cola de ingreso acotada con dos carriles (control / datos):
+      - get() siempre drena primero el carril de control.
+      - maxsize: límite duro de elementos encolados (ambos carriles).
+      - high/low: marcas de agua con histéresis. Al llegar a 'high' se entra en
+        modo sobrecarga y se descarta todo paquete de datos nuevo hasta bajar a 'low'.
+      - El control solo se descarta con la cola llena: primero se desaloja el
+        paquete de datos más antiguo y, si no hay, el control más antiguo.
+    put()/put_nowait() nunca bloquean: devuelven False si el paquete se descartó.
+    """
+
+    def __init__(self,
+                 maxsize: int = 4096,
+                 high: int | None = None,
+                 low: int | None = None,
+                 classify: Callable[[Any], bool] = is_control,
+                 name: str = "ingress"):
+        if maxsize <= 0:
+            raise ValueError("maxsize debe ser > 0")
+        self.maxsize = int(maxsize)
+        self.high = int(high) if high is not None else max(1, int(self.maxsize * 0.8))
+        self.low = int(low) if low is not None else int(self.maxsize * 0.5)
+        if not (0 <= self.low < self.high <= self.maxsize):
+            raise ValueError("se requiere 0 <= low < high <= maxsize")
+        self.name = name
+        self._classify = classify
+        self._control: Deque[Any] = deque()
+        self._data: Deque[Any] = deque()
+        self._not_empty = asyncio.Event()
+        self.shedding = False
+        self._stats: Dict[str, int] = {
+            "enqueued_control": 0,
+            "enqueued_data": 0,
+            "shed_data": 0,
+            "shed_control": 0,
+            "overload_episodes": 0,
+            "peak": 0,
+        }
+
+    @classmethod
+    def from_env(cls, prefix: str = "INGRESS", name: str = "ingress", **kw) -> "IngressQueue":
+        """
+        Lee límites desde variables de entorno:
+          <prefix>_MAX, <prefix>_HIGH, <prefix>_LOW
+        """
+        maxsize = int(os.getenv(f"{prefix}_MAX", "4096"))
+        high = os.getenv(f"{prefix}_HIGH")
+        low = os.getenv(f"{prefix}_LOW")
+        return cls(maxsize=maxsize,
+                   high=int(high) if high else None,
+                   low=int(low) if low else None,
+                   name=name, **kw)
+
+    # ---- API tipo asyncio.Queue ----
+    def qsize(self) -> int:
+        return len(self._control) + len(self._data)
+
+    def empty(self) -> bool:
+        return self.qsize() == 0
+
+    def put_nowait(self, item: Any) -> bool:
+        control = self._classify(item)
+        size = self.qsize()
+
+        if not self.shedding and size >= self.high:
+            self.shedding = True
+            self._stats["overload_episodes"] += 1
+            print(f"[{self.name}] sobrecarga: {size} en cola (high={self.high}); descartando datos")
+
+        if not control:
+            if self.shedding or size >= self.maxsize:
+                self._stats["shed_data"] += 1
+                return False
+            self._data.append(item)
+            self._stats["enqueued_data"] += 1
+        else:
+            if size >= self.maxsize:
+                if self._data:
+                    self._data.popleft()
+                    self._stats["shed_data"] += 1
+                else:
+                    self._control.popleft()
+                    self._stats["shed_control"] += 1
+            self._control.append(item)
+            self._stats["enqueued_control"] += 1
+
+        self._stats["peak"] = max(self._stats["peak"], self.qsize())
+        self._not_empty.set()
+        return True
+
+    async def put(self, item: Any) -> bool:
+        return self.put_nowait(item)
+
+    def get_nowait(self) -> Any:
+        if self._control:
+            item = self._control.popleft()
+        elif self._data:
+            item = self._data.popleft()
+        else:
+            raise asyncio.QueueEmpty
+        if self.shedding and self.qsize() <= self.low:
+            self.shedding = False
+            print(f"[{self.name}] sobrecarga resuelta: {self.qsize()} en cola (low={self.low})")
+        return item
+
+    async def get(self) -> Any:
+        while self.empty():
+            self._not_empty.clear()
+            await self._not_empty.wait()
+        return self.get_nowait()
+
+    # ---- Instrumentación ----
+    def stats(self) -> Dict[str, int]:
+        """Contadores exportados (copias) + ocupación actual."""
+        out = dict(self._stats)
+        out["depth"] = self.qsize()
+        out["shedding"] = int(self.shedding)
+        return out
@@ -0,0 +1,103 @@
+# src/routerlab/core/routing.py
+# Cálculo de SPF sobre snapshots inmutables, opcionalmente fuera del event loop
+import asyncio
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Dict, Optional
+
+from routerlab.algorithms.dijkstra import Arcs, spf_routes
+from routerlab.core.profiling import StageTimers
+from routerlab.core.spf_cache import arcs_digest
+
+class SpfScheduler:
+    """
+    Ejecuta el SPF de un algoritmo (LinkState/Dijkstra) en un executor:
+      - mode="thread" -> ThreadPoolExecutor, mode="process" -> ProcessPoolExecutor
+      - a lo sumo UN cálculo en vuelo; las solicitudes que llegan mientras tanto se
+        coalescen y, al terminar, se lanza un único cálculo nuevo sobre un snapshot fresco
+        (las solicitudes intermedias quedan superadas y nunca se calculan)
+      - el resultado se instala de golpe con alg.install_routes(dist, prev, next_hop, paths[, backups])
+    El algoritmo debe exponer spf_snapshot() -> Arcs e install_routes(...). Si define
+    'spf_fn' (función de módulo, p.ej. spf_routes_lfa) se usa en lugar de spf_routes.
+    Si tiene 'spf_cache' se consulta antes de ir al executor (un hit no sale del loop).
+    Con 'timers' cada cálculo (snapshot, executor e instalación) se mide como etapa "spf".
+    """
+
+    def __init__(self, alg, mode: str = "thread", timers: Optional[StageTimers] = None) -> None:
+        if mode not in ("thread", "process"):
+            raise ValueError(f"modo SPF no soportado: {mode}")
+        self.alg = alg
+        self.mode = mode
+        self.timers = timers if timers is not None else StageTimers(enabled=False)
+        self._executor: Executor = (
+            ProcessPoolExecutor(max_workers=1) if mode == "process" else ThreadPoolExecutor(max_workers=1)
+        )
+        self._inflight: Optional[asyncio.Task] = None
+        self._requested = 0    # versión de la última solicitud
+        self._installed = 0    # versión del último resultado instalado
+        self.stats: Dict[str, int] = {"requested": 0, "computed": 0, "coalesced": 0, "failed": 0}
+
+    def request(self) -> None:
+        """Pide un recálculo. Sin event loop activo (p.ej. tests) se calcula en línea."""
+        self._requested += 1
+        self.stats["requested"] += 1
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            with self.timers.stage("spf"):
+                arcs = self.alg.spf_snapshot()
+                key, result = self._cached(arcs)
+                if result is None:
+                    result = self._spf_fn(arcs, self.alg.me)
+                    self._store(key, result)
+                self.alg.install_routes(*result)
+            self._installed = self._requested
+            return
+        if self._inflight is not None and not self._inflight.done():
+            self.stats["coalesced"] += 1
+            return
+        self._inflight = loop.create_task(self._run())
+        self._inflight.add_done_callback(self._on_done)
+
+    def _on_done(self, task: asyncio.Task) -> None:
+        # Un SPF que falla deja las rutas anteriores: que al menos quede registrado
+        if task.cancelled() or task.exception() is None:
+            return
+        self.stats["failed"] += 1
+        print(f"[SPF][{self.alg.me}] el cálculo de SPF falló; se mantienen las rutas anteriores: "
+              f"{task.exception()!r}")
+
+    async def _run(self) -> None:
+        loop = asyncio.get_running_loop()
+        while self._installed < self._requested:
+            version = self._requested
+            with self.timers.stage("spf"):
+                arcs = self.alg.spf_snapshot()
+                key, result = self._cached(arcs)
+                if result is None:
+                    result = await loop.run_in_executor(self._executor, self._spf_fn, arcs, self.alg.me)
+                    self.stats["computed"] += 1
+                    self._store(key, result)
+                self.alg.install_routes(*result)
+            self._installed = version
+
+    def _cached(self, arcs: Arcs):
+        """(clave, resultado cacheado o None); clave None si el algoritmo no usa cache."""
+        cache = getattr(self.alg, "spf_cache", None)
+        if cache is None:
+            return None, None
+        digest = self.alg.spf_digest() if hasattr(self.alg, "spf_digest") else arcs_digest(arcs)
+        key = cache.key(digest, self.alg.me, self._spf_fn)
+        return key, cache.get(key)
+
+    def _store(self, key: Optional[str], result) -> None:
+        if key is not None:
+            self.alg.spf_cache.put(key, result)
+
+    @property
+    def _spf_fn(self):
+        return getattr(self.alg, "spf_fn", spf_routes)
+
+    def close(self) -> None:
+        if self._inflight is not None:
+            self._inflight.cancel()
+        self._executor.shutdown(wait=False, cancel_futures=True)
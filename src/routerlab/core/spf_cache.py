@@ -0,0 +1,115 @@
+# src/routerlab/core/spf_cache.py
+# Cache de resultados de SPF direccionado por contenido: (digest del grafo, origen, función)
+import hashlib, os, pickle
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Callable, Dict, Optional
+
+from routerlab.algorithms.dijkstra import Arcs
+
+def arcs_digest(arcs: Arcs) -> str:
+    """Huella canónica de un snapshot de arcos (independiente del orden de inserción)."""
+    h = hashlib.blake2b(digest_size=16)
+    for u, v, w in sorted(arcs):
+        h.update(f"{u}\t{v}\t{float(w)!r}\n".encode("utf-8"))
+    return h.hexdigest()
+
+class SpfCache:
+    """
+    LRU de resultados de SPF. Dos nodos (o dos recálculos) con el mismo grafo y el mismo
+    origen comparten el resultado en lugar de correr Dijkstra de nuevo.
+      - clave: (digest del grafo, origen, nombre de la función SPF)
+      - maxsize: entradas en memoria (la menos usada sale primero)
+      - cache_dir (opcional): cada resultado se guarda también como <clave>.pkl; un miss en
+        memoria busca ahí antes de calcular (sobrevive reinicios, se comparte entre procesos)
+    Los resultados cacheados se comparten: quien los recibe no debe mutarlos.
+    """
+
+    def __init__(self, maxsize: int = 128, cache_dir: Optional[str] = None) -> None:
+        if maxsize < 1:
+            raise ValueError("maxsize debe ser >= 1")
+        self.maxsize = maxsize
+        self.cache_dir = Path(cache_dir) if cache_dir else None
+        if self.cache_dir is not None:
+            self.cache_dir.mkdir(parents=True, exist_ok=True)
+        self._lru: "OrderedDict[str, Any]" = OrderedDict()
+        self._stats: Dict[str, int] = {"hits": 0, "disk_hits": 0, "misses": 0, "evictions": 0}
+
+    @staticmethod
+    def key(digest: str, source: str, fn: Callable) -> str:
+        name = f"{getattr(fn, '__module__', '')}.{getattr(fn, '__qualname__', repr(fn))}"
+        h = hashlib.blake2b(f"{digest}\0{source}\0{name}".encode("utf-8"), digest_size=16)
+        return h.hexdigest()
+
+    def get(self, key: str) -> Optional[Any]:
+        if key in self._lru:
+            self._lru.move_to_end(key)
+            self._stats["hits"] += 1
+            return self._lru[key]
+        if self.cache_dir is not None:
+            path = self.cache_dir / f"{key}.pkl"
+            try:
+                with open(path, "rb") as f:
+                    result = pickle.load(f)
+            except (OSError, pickle.UnpicklingError, EOFError):
+                result = None
+            if result is not None:
+                self._stats["disk_hits"] += 1
+                self._remember(key, result)
+                return result
+        self._stats["misses"] += 1
+        return None
+
+    def put(self, key: str, result: Any) -> None:
+        self._remember(key, result)
+        if self.cache_dir is not None:
+            path = self.cache_dir / f"{key}.pkl"
+            tmp = path.with_suffix(f".{os.getpid()}.tmp")
+            try:
+                with open(tmp, "wb") as f:
+                    pickle.dump(result, f, protocol=pickle.HIGHEST_PROTOCOL)
+                os.replace(tmp, path)
+            except OSError as e:
+                print(f"[SPF-CACHE] no se pudo persistir {path}: {e}")
+
+    def _remember(self, key: str, result: Any) -> None:
+        self._lru[key] = result
+        self._lru.move_to_end(key)
+        while len(self._lru) > self.maxsize:
+            self._lru.popitem(last=False)
+            self._stats["evictions"] += 1
+
+    def compute(self, arcs: Arcs, source: str, fn: Callable[[Arcs, str], Any],
+                digest: Optional[str] = None) -> Any:
+        """fn(arcs, source) a través del cache ('digest' evita rehashear si ya se conoce)."""
+        key = self.key(digest or arcs_digest(arcs), source, fn)
+        result = self.get(key)
+        if result is None:
+            result = fn(arcs, source)
+            self.put(key, result)
+        return result
+
+    def stats(self) -> Dict[str, Any]:
+        out: Dict[str, Any] = dict(self._stats)
+        lookups = out["hits"] + out["disk_hits"] + out["misses"]
+        out["size"] = len(self._lru)
+        out["hit_rate"] = round((out["hits"] + out["disk_hits"]) / lookups, 4) if lookups else 0.0
+        return out
+
+    def clear(self) -> None:
+        self._lru.clear()
+
+_shared: Optional[SpfCache] = None
+
+def shared_spf_cache() -> Optional[SpfCache]:
+    """
+    Cache común a todos los nodos del proceso (varios RouterNode en una simulación).
+    SPF_CACHE_SIZE (default 128; 0 lo desactiva) y SPF_CACHE_DIR (persistencia opcional).
+    """
+    global _shared
+    size = int(os.getenv("SPF_CACHE_SIZE", "128"))
+    if size <= 0:
+        return None
+    if _shared is None:
+        _shared = SpfCache(size, os.getenv("SPF_CACHE_DIR") or None)
+    return _shared
@@ -0,0 +1,250 @@
+# src/routerlab/core/tables.py
+# Tablas de forwarding (FIB) con intercambio atómico por generación
+import asyncio, zlib
+from dataclasses import dataclass, field
+from types import MappingProxyType
+from typing import Dict, Mapping, Optional, Set, Tuple
+
+# Ruta publicada: (next hop, costo). El costo es None si el algoritmo no lo reporta.
+Route = Tuple[str, Optional[float]]
+
+def flow_hash(origin: str, dest: str, flow_id: object) -> int:
+    """Hash estable (igual en todos los procesos) que identifica un flujo."""
+    return zlib.crc32(f"{origin}|{dest}|{flow_id}".encode("utf-8"))
+
+def pick_path(flow: int, paths: Tuple[str, ...]) -> str:
+    """
+    Elige un primer salto para el flujo por rendezvous hashing: si una ruta desaparece,
+    solo se mueven los flujos que la usaban (un módulo simple los barajaría a todos).
+    """
+    return max(paths, key=lambda nh: zlib.crc32(f"{flow}|{nh}".encode("utf-8")))
+
+@dataclass(frozen=True)
+class RouteDiff:
+    """
+    Cambios entre dos generaciones de la FIB:
+      - added:   destinos que pasan a ser alcanzables -> (next hop, costo)
+      - removed: destinos que dejan de ser alcanzables
+      - changed: destinos cuyo next hop o costo cambió -> (next hop, costo) nuevos
+    """
+    generation: int
+    added: Dict[str, Route] = field(default_factory=dict)
+    removed: Tuple[str, ...] = ()
+    changed: Dict[str, Route] = field(default_factory=dict)
+
+    def __len__(self) -> int:
+        return len(self.added) + len(self.removed) + len(self.changed)
+
+    def __bool__(self) -> bool:
+        return len(self) > 0
+
+def diff_routes(old: Mapping[str, Route], new: Mapping[str, Route], generation: int) -> RouteDiff:
+    """Compara dos tablas de rutas {dest: (nh, costo)} y arma el RouteDiff."""
+    added = {d: r for d, r in new.items() if d not in old}
+    removed = tuple(sorted(d for d in old if d not in new))
+    changed = {d: r for d, r in new.items() if d in old and old[d] != r}
+    return RouteDiff(generation, added, removed, changed)
+
+def format_route_diff(me: str, diff: RouteDiff) -> list[str]:
+    """Líneas legibles de un RouteDiff (una por destino afectado)."""
+    def fmt(r: Route) -> str:
+        nh, cost = r
+        if cost is None:
+            return f"nh={nh}"
+        return f"nh={nh} costo={int(cost) if float(cost).is_integer() else round(cost, 3)}"
+    lines = [f"  + {me} -> {d} : {fmt(r)}" for d, r in sorted(diff.added.items())]
+    lines += [f"  ~ {me} -> {d} : {fmt(r)}" for d, r in sorted(diff.changed.items())]
+    lines += [f"  - {me} -> {d}" for d in diff.removed]
+    return lines
+
+class RouteSubscription:
+    """
+    Suscripción a los RouteDiff de una FIB (iterador asíncrono).
+    Si el consumidor se atrasa y la cola se llena, se descarta el diff más antiguo y se
+    marca 'overflowed': el consumidor debe resincronizar leyendo fib.snapshot().
+    """
+
+    def __init__(self, stream: "RouteEventStream", maxsize: int) -> None:
+        self._stream = stream
+        self._q: asyncio.Queue[RouteDiff] = asyncio.Queue(maxsize)
+        self.overflowed = False
+
+    def _push(self, diff: RouteDiff) -> None:
+        if self._q.full():
+            self._q.get_nowait()
+            self.overflowed = True
+        self._q.put_nowait(diff)
+
+    def get_nowait(self) -> RouteDiff:
+        return self._q.get_nowait()
+
+    def __aiter__(self) -> "RouteSubscription":
+        return self
+
+    async def __anext__(self) -> RouteDiff:
+        return await self._q.get()
+
+    def close(self) -> None:
+        self._stream._subs.discard(self)
+
+class RouteEventStream:
+    """Difusión de RouteDiff a todos los suscriptores (sin bloquear al publicador)."""
+
+    def __init__(self) -> None:
+        self._subs: Set[RouteSubscription] = set()
+
+    def subscribe(self, maxsize: int = 256) -> RouteSubscription:
+        sub = RouteSubscription(self, maxsize)
+        self._subs.add(sub)
+        return sub
+
+    def publish(self, diff: RouteDiff) -> None:
+        for sub in list(self._subs):
+            sub._push(diff)
+
+class Fib:
+    """
+    Forwarding Information Base: destino -> next hop.
+      - Doble buffer: los algoritmos arman la tabla completa aparte y la publican con
+        publish(); el intercambio es una sola asignación de referencia, así que una
+        consulta nunca observa una tabla a medio construir.
+      - generation: sube en cada publicación. Un cache externo solo necesita comparar
+        este entero para saber si quedó obsoleto.
+      - lookup(dest): un único acceso a dict sobre la tabla vigente.
+      - changes: cada publicación que altera rutas emite un RouteDiff a los suscriptores,
+        así el costo de reportar es proporcional a los cambios y no al tamaño de la tabla.
+      - backups: next hop alternativo precalculado (LFA) por destino; fail_over(vecino)
+        los activa de inmediato, sin esperar al SPF, cuando se cae el primario.
+      - paths: primeros saltos de igual costo (ECMP). lookup(dest, flow) reparte los
+        flujos entre ellos; sin 'flow' se usa siempre el next hop primario.
+    """
+
+    def __init__(self) -> None:
+        self._table: Dict[str, Optional[str]] = {}
+        self._routes: Dict[str, Route] = {}
+        self._backups: Dict[str, Route] = {}
+        self._paths: Dict[str, Tuple[str, ...]] = {}
+        self.generation = 0
+        self.changes = RouteEventStream()
+
+    def publish(self, table: Mapping[str, Optional[str]],
+                costs: Optional[Mapping[str, float]] = None,
+                backups: Optional[Mapping[str, Route]] = None,
+                paths: Optional[Mapping[str, Tuple[str, ...]]] = None) -> RouteDiff:
+        """
+        Instala 'table' como tabla vigente (se copia: el llamador puede reutilizarla).
+        'costs' (opcional) acompaña cada destino con su costo para el diff.
+        'backups' (opcional) reemplaza los respaldos: destino -> (next hop, costo).
+        'paths' (opcional) reemplaza los conjuntos ECMP: destino -> primeros saltos.
+        Devuelve el RouteDiff respecto de la generación anterior.
+        """
+        routes: Dict[str, Route] = {
+            d: (nh, None if costs is None else costs.get(d))
+            for d, nh in table.items() if nh is not None
+        }
+        self._backups = dict(backups) if backups else {}
+        return self._swap(dict(table), routes,
+                          {d: tuple(p) for d, p in paths.items() if len(p) > 1} if paths else {})
+
+    def backup(self, dest: str) -> Optional[str]:
+        b = self._backups.get(dest)
+        return None if b is None else b[0]
+
+    def fail_over(self, neighbor: str) -> RouteDiff:
+        """
+        Reparación local ante la caída de 'neighbor': cada destino que salía por él pasa
+        a su respaldo (si hay uno que no use ese vecino) y el resto se retira.
+        Se publica como una generación nueva; el SPF completo llega después.
+        """
+        table = dict(self._table)
+        routes = dict(self._routes)
+        paths = dict(self._paths)
+        for dest, nh in self._table.items():
+            multi = self._paths.get(dest)
+            if multi is not None and neighbor in multi:
+                # ECMP: basta con dejar de usar el camino caído
+                rest = tuple(p for p in multi if p != neighbor)
+                if len(rest) > 1:
+                    paths[dest] = rest
+                else:
+                    del paths[dest]
+                if nh == neighbor:
+                    table[dest] = rest[0]
+                    routes[dest] = (rest[0], self._routes.get(dest, (None, None))[1])
+                continue
+            if nh != neighbor:
+                continue
+            b = self._backups.get(dest)
+            if b is not None and b[0] != neighbor:
+                table[dest], routes[dest] = b[0], b
+            else:
+                del table[dest]
+                routes.pop(dest, None)
+        # Los respaldos ya usados o que pasaban por el vecino caído dejan de valer
+        self._backups = {
+            d: b for d, b in self._backups.items()
+            if b[0] != neighbor and self._table.get(d) != neighbor
+        }
+        return self._swap(table, routes, paths)
+
+    def withdraw(self, dest: str) -> bool:
+        """Publica una tabla nueva sin la entrada 'dest'. Devuelve True si existía."""
+        if dest not in self._table:
+            return False
+        nxt = dict(self._table)
+        del nxt[dest]
+        routes = dict(self._routes)
+        routes.pop(dest, None)
+        self._backups.pop(dest, None)
+        paths = dict(self._paths)
+        paths.pop(dest, None)
+        self._swap(nxt, routes, paths)
+        return True
+
+    def _swap(self, table: Dict[str, Optional[str]], routes: Dict[str, Route],
+              paths: Dict[str, Tuple[str, ...]]) -> RouteDiff:
+        old, old_paths = self._routes, self._paths
+        self._table, self._routes, self._paths = table, routes, paths
+        self.generation += 1
+        diff = diff_routes(old, routes, self.generation)
+        # Un cambio solo en el conjunto ECMP también mueve flujos: se reporta como 'changed'
+        moved = {d: routes[d] for d in old_paths.keys() | paths.keys()
+                 if old_paths.get(d) != paths.get(d) and d in routes
+                 and d not in diff.added and d not in diff.changed}
+        if moved:
+            diff = RouteDiff(diff.generation, diff.added, diff.removed, {**diff.changed, **moved})
+        if diff:
+            self.changes.publish(diff)
+        return diff
+
+    def lookup(self, dest: str, flow: Optional[int] = None) -> Optional[str]:
+        if flow is not None:
+            multi = self._paths.get(dest)
+            if multi is not None:
+                return pick_path(flow, multi)
+        return self._table.get(dest)
+
+    def paths(self, dest: str) -> Tuple[str, ...]:
+        """Todos los primeros saltos vigentes hacia 'dest' (vacío si no hay ruta)."""
+        multi = self._paths.get(dest)
+        if multi is not None:
+            return multi
+        nh = self._table.get(dest)
+        return () if nh is None else (nh,)
+
+    @property
+    def table(self) -> Mapping[str, Optional[str]]:
+        """Vista de solo lectura de la tabla vigente."""
+        return MappingProxyType(self._table)
+
+    @property
+    def routes(self) -> Mapping[str, Route]:
+        """Vista de solo lectura de las rutas vigentes: destino -> (next hop, costo)."""
+        return MappingProxyType(self._routes)
+
+    def snapshot(self) -> Tuple[int, Mapping[str, Optional[str]]]:
+        """(generation, tabla) consistentes entre sí."""
+        return self.generation, MappingProxyType(self._table)
+
+    def __len__(self) -> int:
+        return len(self._table)
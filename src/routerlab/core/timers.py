@@ -0,0 +1,67 @@
+# src/routerlab/core/timers.py
+# Temporizadores adaptativos para HELLO/INFO (backoff en estabilidad, ajuste ante cambios)
+import asyncio
+from typing import Any, Dict
+
+class AdaptiveTimer:
+    """
+    Intervalo de refresco adaptativo:
+      - backoff(): red estable -> el intervalo crece por 'factor' hasta 'max_s'
+      - tighten(): cambio en la LSDB o vecino sospechoso -> vuelve a 'min_s' y
+        despierta a quien esté esperando en sleep() (respetando 'min_s' desde el
+        último envío, para no generar ráfagas)
+      - stats(): envíos, ajustes e intervalo vigente (overhead de control)
+    """
+
+    def __init__(self, name: str, base: float, min_s: float, max_s: float, factor: float = 2.0):
+        if min_s <= 0 or max_s < min_s:
+            raise ValueError(f"{name}: se requiere 0 < min <= max")
+        if factor < 1.0:
+            raise ValueError(f"{name}: factor debe ser >= 1")
+        self.name = name
+        self.min_s = float(min_s)
+        self.max_s = float(max_s)
+        self.factor = float(factor)
+        self.interval = min(max(float(base), self.min_s), self.max_s)
+        self._wake = asyncio.Event()
+        self._stats: Dict[str, int] = {"ticks": 0, "sent": 0, "backoffs": 0, "tightens": 0}
+
+    def backoff(self) -> bool:
+        """Aleja el próximo refresco. Devuelve True si el intervalo cambió."""
+        new = min(self.interval * self.factor, self.max_s)
+        if new == self.interval:
+            return False
+        self.interval = new
+        self._stats["backoffs"] += 1
+        return True
+
+    def tighten(self) -> bool:
+        """Vuelve al intervalo mínimo y adelanta el próximo refresco."""
+        self._wake.set()
+        if self.interval == self.min_s:
+            return False
+        self.interval = self.min_s
+        self._stats["tightens"] += 1
+        return True
+
+    def count_sent(self, n: int = 1) -> None:
+        self._stats["sent"] += n
+
+    async def sleep(self) -> None:
+        """Espera el intervalo vigente o hasta un tighten() (nunca menos que min_s)."""
+        loop = asyncio.get_running_loop()
+        start = loop.time()
+        self._stats["ticks"] += 1
+        self._wake.clear()
+        try:
+            await asyncio.wait_for(self._wake.wait(), self.interval)
+        except asyncio.TimeoutError:
+            return
+        remaining = self.min_s - (loop.time() - start)
+        if remaining > 0:
+            await asyncio.sleep(remaining)
+
+    def stats(self) -> Dict[str, Any]:
+        out: Dict[str, Any] = dict(self._stats)
+        out.update(interval=self.interval, min=self.min_s, max=self.max_s)
+        return out
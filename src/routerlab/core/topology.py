@@ -0,0 +1,227 @@
+# src/routerlab/core/topology.py
+# Topología compilada: tabla de nodos + adyacencia CSR en un archivo binario leído con mmap
+#
+# Uso:
+#   PYTHONPATH=src python -m routerlab.core.topology configs/topo-11.txt -o configs/topo-11.rlt
+#   make run TOPO=configs/topo-11.rlt ...      (se detecta por los bytes mágicos)
+#
+# Todos los procesos de un host mapean el mismo archivo: comparten las páginas del page
+# cache y arrancan sin parsear JSON. Buscar un nodo es una búsqueda binaria sobre la
+# tabla de nombres (ordenada); solo se decodifica lo que se consulta.
+#
+# Formato (orden de bytes nativo, registrado en el encabezado):
+#   encabezado  MAGIC(8) | version u32 | byteorder u32 (1 = little) | n u32 | m u32 | digest 16B
+#   name_off    (n + 1) x u32   offsets de cada nombre dentro de 'names'
+#   row_ptr     (n + 1) x u32   CSR: arcos de i en [row_ptr[i], row_ptr[i + 1])
+#   col         m x u32         índice del vecino
+#   weight      m x f64         costo del arco
+#   names       bytes utf-8     nombres concatenados, ordenados
+# Cada sección arranca alineada a 8 bytes.
+from __future__ import annotations
+import argparse, hashlib, json, mmap, os, struct, sys
+from array import array
+from collections.abc import Mapping
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional
+
+MAGIC = b"RLTOPO\x00\x01"
+VERSION = 1
+_HEADER = struct.Struct("=8sIIII16s")
+
+def config_digest(cfg: Mapping[str, Any]) -> str:
+    """Huella de una config de topología (JSON canónico): 16 caracteres hex."""
+    canon = json.dumps(cfg, sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(canon.encode("utf-8")).hexdigest()[:16]
+
+def is_compiled(path: str | Path) -> bool:
+    try:
+        with open(path, "rb") as f:
+            return f.read(len(MAGIC)) == MAGIC
+    except OSError:
+        return False
+
+def _pad(n: int) -> int:
+    return (n + 7) & ~7
+
+def compile_topology(topo_path: str | Path, out_path: str | Path) -> int:
+    """
+    Compila un topo JSON ({"type":"topo","config":{...}}) al formato binario.
+    Se conservan las filas tal como están declaradas (lista = costo 1). Devuelve los bytes
+    escritos. La escritura es atómica (archivo temporal + os.replace).
+    """
+    data = json.loads(Path(topo_path).read_text(encoding="utf-8"))
+    if data.get("type") != "topo":
+        raise ValueError("topo inválido: se espera {'type':'topo','config':{...}}")
+    cfg: Dict[str, Any] = data.get("config", {})
+
+    rows: Dict[str, Dict[str, float]] = {}
+    for u, neigh in cfg.items():
+        if isinstance(neigh, list):
+            rows[u] = {v: 1.0 for v in neigh}
+        elif isinstance(neigh, dict):
+            rows[u] = {v: float(w) for v, w in neigh.items()}
+        else:
+            raise ValueError(f"Vecinos de {u} deben ser list o dict.")
+    names = sorted(set(rows) | {v for r in rows.values() for v in r})
+    index = {n: i for i, n in enumerate(names)}
+
+    name_off, blob = array("I", [0]), bytearray()
+    for n in names:
+        blob += n.encode("utf-8")
+        name_off.append(len(blob))
+    row_ptr, col, weight = array("I", [0]), array("I"), array("d")
+    for n in names:
+        for v, w in sorted(rows.get(n, {}).items()):
+            col.append(index[v])
+            weight.append(w)
+        row_ptr.append(len(col))
+
+    order = 1 if sys.byteorder == "little" else 0
+    header = _HEADER.pack(MAGIC, VERSION, order, len(names), len(col),
+                          config_digest(cfg).encode("ascii"))
+    out = bytearray(header)
+    for section in (name_off.tobytes(), row_ptr.tobytes(), col.tobytes(), weight.tobytes(), bytes(blob)):
+        out += b"\x00" * (_pad(len(out)) - len(out))
+        out += section
+
+    tmp = Path(f"{out_path}.tmp")
+    with open(tmp, "wb") as f:
+        f.write(out)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp, out_path)
+    return len(out)
+
+class CompiledTopology(Mapping):
+    """
+    Vista de solo lectura sobre un artefacto compilado. Se comporta como la 'config'
+    del topo JSON: topo[nodo] -> {vecino: costo}, iterable por nombre, len = nodos.
+    """
+
+    def __init__(self, path: str | Path) -> None:
+        self.path = str(path)
+        with open(path, "rb") as f:
+            self._mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        self._views: List[memoryview] = []
+        try:
+            if len(self._mm) < _HEADER.size:
+                raise ValueError("artefacto de topología truncado")
+            magic, version, order, n, m, digest = _HEADER.unpack_from(self._mm, 0)
+            if magic != MAGIC or version != VERSION:
+                raise ValueError("no es una topología compilada (o versión distinta)")
+            if order != (1 if sys.byteorder == "little" else 0):
+                raise ValueError("topología compilada en otra arquitectura: recompilar")
+            self.n, self.m = n, m
+            self.digest = digest.decode("ascii")
+
+            mv = memoryview(self._mm)
+            self._views.append(mv)
+            pos = _HEADER.size
+            sections = []
+            for fmt, count in (("I", n + 1), ("I", n + 1), ("I", m), ("d", m)):
+                pos = _pad(pos)
+                size = count * (8 if fmt == "d" else 4)
+                if pos + size > len(self._mm):
+                    raise ValueError("artefacto de topología truncado")
+                sections.append(mv[pos:pos + size].cast(fmt))
+                self._views.append(sections[-1])
+                pos += size
+            self._name_off, self._row_ptr, self._col, self._weight = sections
+            self._names_at = _pad(pos)
+            if self._names_at + self._name_off[n] > len(self._mm):
+                raise ValueError("artefacto de topología truncado")
+        except Exception:
+            self.close()
+            raise
+
+    # ---- Tabla de nombres ----
+    def name(self, i: int) -> str:
+        a = self._names_at + self._name_off[i]
+        b = self._names_at + self._name_off[i + 1]
+        return self._mm[a:b].decode("utf-8")
+
+    def index(self, node: str) -> Optional[int]:
+        """Índice de 'node' por búsqueda binaria (los nombres están ordenados)."""
+        lo, hi = 0, self.n
+        while lo < hi:
+            mid = (lo + hi) // 2
+            cur = self.name(mid)
+            if cur < node:
+                lo = mid + 1
+            elif cur > node:
+                hi = mid
+            else:
+                return mid
+        return None
+
+    # ---- Interfaz Mapping (igual que la 'config' del JSON) ----
+    def __getitem__(self, node: str) -> Dict[str, float]:
+        i = self.index(node)
+        if i is None:
+            raise KeyError(node)
+        a, b = self._row_ptr[i], self._row_ptr[i + 1]
+        return {self.name(self._col[k]): self._weight[k] for k in range(a, b)}
+
+    def __iter__(self) -> Iterator[str]:
+        return (self.name(i) for i in range(self.n))
+
+    def __len__(self) -> int:
+        return self.n
+
+    def close(self) -> None:
+        # Las vistas se liberan antes: mmap no se cierra con buffers exportados
+        for mv in reversed(self._views):
+            mv.release()
+        self._views = []
+        self._mm.close()
+
+# Topologías ya cargadas (JSON parseado o artefacto mapeado): varios nodos en un mismo
+# proceso (launcher) abren el archivo una vez
+_parsed: Dict[str, tuple] = {}
+
+def load_topology(path: str | Path) -> Mapping[str, Any]:
+    """
+    Config de topología desde JSON o desde un artefacto compilado (según los bytes mágicos).
+    Se carga una vez por proceso mientras el archivo no cambie (mtime/tamaño); el resultado
+    se comparte entre quienes lo piden: no mutarlo ni cerrarlo. Si el archivo cambia, la
+    CompiledTopology anterior no se cierra (puede seguir en uso): su mmap se libera cuando
+    nadie la referencia.
+    """
+    key = os.path.abspath(path)
+    st = os.stat(key)
+    stamp = (st.st_mtime_ns, st.st_size)
+    hit = _parsed.get(key)
+    if hit is not None and hit[0] == stamp:
+        return hit[1]
+    if is_compiled(path):
+        topo = CompiledTopology(path)
+        _parsed[key] = (stamp, topo)
+        return topo
+    data = json.loads(Path(path).read_text(encoding="utf-8"))
+    assert data.get("type") == "topo", "topo inválido: se espera {'type':'topo','config':{...}}"
+    cfg = data.get("config", {})
+    _parsed[key] = (stamp, cfg)
+    return cfg
+
+def topology_digest(path: str | Path) -> str:
+    """Huella de la topología; en un artefacto compilado se lee del encabezado (la del JSON fuente)."""
+    if is_compiled(path):
+        with open(path, "rb") as f:
+            return _HEADER.unpack(f.read(_HEADER.size))[5].decode("ascii")
+    data = json.loads(Path(path).read_text(encoding="utf-8"))
+    return config_digest(data.get("config", {}))
+
+def main() -> None:
+    ap = argparse.ArgumentParser(prog="routerlab.core.topology",
+                                 description="Compila un topo JSON a un artefacto binario (mmap)")
+    ap.add_argument("topo", help="ruta a topo-*.txt")
+    ap.add_argument("-o", "--out", default=None, help="salida (default: <topo>.rlt)")
+    args = ap.parse_args()
+    out = args.out or str(Path(args.topo).with_suffix(".rlt"))
+    size = compile_topology(args.topo, out)
+    topo = CompiledTopology(out)
+    print(f"{len(topo)} nodos, {topo.m} arcos -> {out} ({size} bytes, digest {topo.digest})")
+    topo.close()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,156 @@
+# src/routerlab/core/watchdog.py
+# Detector de bloqueos del event loop con atribución de la tarea/código culpable
+#
+#   WATCHDOG=1                  -> mide el lag del loop cada WATCHDOG_INTERVAL_MS (default 50)
+#   WATCHDOG_THRESHOLD_MS=100   -> lag a partir del cual se considera bloqueo y se captura el stack
+import asyncio, os, sys, threading, time
+from collections import deque
+from typing import Any, Deque, Dict, Optional
+
+from routerlab.core.profiling import StageTimers, collapse
+
+_PKG_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+class LoopWatchdog:
+    """
+    Dos piezas:
+      - latido (corutina en el loop): duerme 'interval' y mide cuánto tarde despierta;
+        ese lag va a un histograma (StageTimers, etapa 'lag').
+      - vigía (hilo aparte): si el latido lleva más de 'threshold' sin llegar, el loop está
+        bloqueado ahora mismo: lee el stack del hilo del loop y la tarea en curso.
+    Cuando el loop vuelve, el latido registra el bloqueo (lag, tarea, código) y lo imprime.
+    Un solo watchdog por loop alcanza para todos los nodos del proceso: attach()/detach().
+    """
+
+    def __init__(self, threshold: float = 0.1, interval: float = 0.05, keep: int = 20) -> None:
+        self.threshold = float(threshold)
+        self.interval = float(interval)
+        self.timers = StageTimers()
+        self.stalls: Deque[Dict[str, Any]] = deque(maxlen=keep)
+        self.stall_count = 0
+        self._users = 0
+        self._task: Optional[asyncio.Task] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._loop_thread: Optional[int] = None
+        self._beat = 0.0
+        self._pending: Optional[Dict[str, Any]] = None
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    # ---- ciclo de vida ----
+    def attach(self) -> None:
+        """Un usuario más (p. ej. un RouterNode); el primero arranca latido y vigía."""
+        self._users += 1
+        if self._task is None or self._task.done():
+            self._task = asyncio.get_running_loop().create_task(self._heartbeat(), name="watchdog")
+
+    def detach(self) -> None:
+        self._users = max(0, self._users - 1)
+        if self._users == 0 and self._task is not None:
+            self._task.cancel()
+            self._task = None
+
+    async def _heartbeat(self) -> None:
+        self._loop = asyncio.get_running_loop()
+        self._loop_thread = threading.get_ident()
+        self._beat = time.monotonic()
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._watch, name="routerlab-watchdog", daemon=True)
+        self._thread.start()
+        try:
+            while True:
+                await asyncio.sleep(self.interval)
+                now = time.monotonic()
+                lag = max(0.0, now - self._beat - self.interval)
+                self._beat = now
+                self.timers.observe("lag", lag)
+                if lag >= self.threshold:
+                    self._report(lag)
+        finally:
+            self._stop.set()
+            self._thread = None
+
+    # ---- vigía (hilo) ----
+    def _watch(self) -> None:
+        captured_for = None
+        poll = min(self.interval, self.threshold) / 2
+        while not self._stop.wait(poll):
+            beat = self._beat
+            if beat == captured_for or time.monotonic() - beat < self.threshold:
+                continue
+            info = self._capture()
+            if info is None:
+                # El loop está en select(): el latido ya está por correr, probar de nuevo
+                continue
+            captured_for = beat
+            # Si el loop despertó mientras leíamos, el stack ya no es el del bloqueo
+            if self._beat == beat:
+                self._pending = info
+
+    def _capture(self) -> Optional[Dict[str, Any]]:
+        frame = sys._current_frames().get(self._loop_thread)
+        if frame is None or os.path.basename(frame.f_code.co_filename) == "selectors.py":
+            return None
+        task = None
+        try:
+            task = asyncio.current_task(self._loop)
+        except RuntimeError:
+            pass
+        return {
+            "task": describe_task(task),
+            "where": _location(frame),
+            "site": _location(_own_frame(frame) or frame),
+            "stack": collapse(frame),
+        }
+
+    def _report(self, lag: float) -> None:
+        info = self._pending or {"task": "?", "where": "?", "site": "?", "stack": ""}
+        self._pending = None
+        self.stall_count += 1
+        record = {"at": time.time(), "lag_ms": round(lag * 1000, 1), **info}
+        self.stalls.append(record)
+        print(f"[WATCHDOG] event loop bloqueado {record['lag_ms']:.0f} ms: tarea {info['task']} "
+              f"en {info['site']} (frame actual: {info['where']})")
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "threshold_ms": self.threshold * 1000,
+            "stalls": self.stall_count,
+            "lag": self.timers.stats().get("lag"),
+            "recent": [{k: v for k, v in s.items() if k != "stack"} for s in list(self.stalls)[-5:]],
+        }
+
+def describe_task(task: Optional[asyncio.Task]) -> str:
+    """'<nombre> (<corutina>)' de la tarea en curso; '-' si el loop corría un callback."""
+    if task is None:
+        return "-"
+    coro = task.get_coro()
+    qual = getattr(coro, "__qualname__", None) or type(coro).__name__
+    return f"{task.get_name()} ({qual})"
+
+def _location(frame) -> str:
+    code = frame.f_code
+    return f"{code.co_name} ({os.path.basename(code.co_filename)}:{frame.f_lineno})"
+
+def _own_frame(frame):
+    # Frame más interno que pertenece a routerlab (el print o json.dumps no dicen quién llamó)
+    while frame is not None:
+        if os.path.abspath(frame.f_code.co_filename).startswith(_PKG_DIR):
+            return frame
+        frame = frame.f_back
+    return None
+
+_shared: Optional[LoopWatchdog] = None
+
+def shared_watchdog() -> Optional[LoopWatchdog]:
+    """
+    Watchdog común a los nodos del proceso (WATCHDOG=1). WATCHDOG_THRESHOLD_MS (default 100)
+    y WATCHDOG_INTERVAL_MS (default 50).
+    """
+    global _shared
+    if os.getenv("WATCHDOG", "0") != "1":
+        return None
+    if _shared is None:
+        _shared = LoopWatchdog(threshold=float(os.getenv("WATCHDOG_THRESHOLD_MS", "100")) / 1000,
+                               interval=float(os.getenv("WATCHDOG_INTERVAL_MS", "50")) / 1000)
+    return _shared
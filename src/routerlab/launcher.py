@@ -0,0 +1,88 @@
+# src/routerlab/launcher.py
+# Varios nodos en un solo proceso y un solo event loop (drivers reales: socket o redis)
+#
+# Uso:
+#   PYTHONPATH=src python -m routerlab.launcher --proto lsr --driver redis \
+#       --topo configs/topo-11.txt --names configs/names-redis-11.txt            # todos
+#   ... --nodes N1,N2,N7                                                        # un subconjunto
+#
+# Comparten imports, la topología parseada (load_topology), el cache de SPF y, con redis,
+# una sola conexión + un solo PubSub (RedisHub) en lugar de uno por nodo.
+import argparse
+import asyncio
+import json
+import time
+from typing import List, Optional
+
+from routerlab.core.node import RouterNode
+from routerlab.core.topology import load_topology
+
+def _socket_port(names: dict, node: str) -> int:
+    host_port = names.get(node)
+    if not host_port or ":" not in host_port:
+        raise ValueError(f"{node}: sin host:puerto en el archivo de nombres")
+    return int(host_port.rsplit(":", 1)[1])
+
+def build_nodes(proto: str, driver: str, topo_path: str, names_path: str,
+                nodes: Optional[List[str]] = None) -> List[RouterNode]:
+    """RouterNode de cada nodo pedido (default: todos los de la topología)."""
+    topo = load_topology(topo_path)
+    selected = nodes or sorted(topo)
+    unknown = [n for n in selected if n not in topo]
+    if unknown:
+        raise ValueError(f"nodos que no están en {topo_path}: {unknown}")
+
+    if driver == "socket":
+        from routerlab.net.socket_driver import SocketDriver
+        with open(names_path, "r", encoding="utf-8") as f:
+            names = json.load(f)["config"]
+        transports = {n: SocketDriver(node=n, port=_socket_port(names, n), names_path=names_path)
+                      for n in selected}
+    elif driver == "redis":
+        from routerlab.net.redis_driver import RedisDriver, RedisHub
+        hub = RedisHub()
+        transports = {n: RedisDriver(node=n, names_path=names_path, hub=hub) for n in selected}
+    else:
+        raise ValueError("driver no soportado")
+
+    return [RouterNode(node_id=n, transport=transports[n], topo_path=topo_path, proto=proto)
+            for n in selected]
+
+async def _run_node(node: RouterNode) -> None:
+    # Un nodo que se cae no tira a los demás
+    try:
+        await node.run()
+    except asyncio.CancelledError:
+        raise
+    except Exception as e:
+        print(f"[LAUNCHER] nodo {node.id} terminó con error: {e!r}")
+
+async def run_nodes(nodes: List[RouterNode]) -> None:
+    await asyncio.gather(*(_run_node(n) for n in nodes))
+
+def main():
+    p = argparse.ArgumentParser(prog="routerlab.launcher",
+                                description="Levanta varios nodos en un solo proceso")
+    p.add_argument("--proto", required=True, choices=["flooding", "dvr", "dijkstra", "lsr"])
+    p.add_argument("--driver", required=True, choices=["socket", "redis"])
+    p.add_argument("--topo", required=True, help="ruta a topo-*.txt")
+    p.add_argument("--names", required=True, help="ruta a names-*.txt (socket: host:puerto por nodo)")
+    p.add_argument("--nodes", default="", help="lista separada por comas (default: todos los de --topo)")
+    args = p.parse_args()
+
+    t0 = time.perf_counter()
+    selected = [n.strip() for n in args.nodes.split(",") if n.strip()] or None
+    try:
+        nodes = build_nodes(args.proto, args.driver, args.topo, args.names, selected)
+    except ValueError as e:
+        p.error(str(e))
+    print(f"[LAUNCHER] {len(nodes)} nodos ({args.proto}/{args.driver}) creados en "
+          f"{(time.perf_counter() - t0) * 1000:.1f} ms: {[n.id for n in nodes]}")
+
+    try:
+        asyncio.run(run_nodes(nodes))
+    except KeyboardInterrupt:
+        pass
+
+if __name__ == "__main__":
+    main()
@@ -1,16 +1,150 @@
 # src/routerlab/net/redis_driver.py
 import os, json, asyncio, uuid
-from typing import AsyncIterator, Dict, Any
+from typing import AsyncIterator, Callable, Dict, Any, Iterable, List, Optional
 from redis.asyncio import Redis
 from routerlab.net.transport import Transport
+from routerlab.core.queues import IngressQueue, is_control
 from dotenv import load_dotenv
 
+def _connect() -> Redis:
+    """Cliente Redis según REDIS_URL o REDIS_HOST/PORT/DB/PASSWORD/TLS."""
+    load_dotenv()
+    url = os.getenv("REDIS_URL")
+    host = os.getenv("REDIS_HOST", "127.0.0.1")
+    port = int(os.getenv("REDIS_PORT", "6379"))
+    db   = int(os.getenv("REDIS_DB",   "0"))
+    password = os.getenv("REDIS_PASSWORD")
+    tls = os.getenv("REDIS_TLS", "0") == "1"
+
+    if url:
+        return Redis.from_url(url, decode_responses=False, ssl=tls)
+    return Redis(
+        host=host, port=port, db=db, password=password,
+        ssl=tls, decode_responses=False
+    )
+
+# Marca que el hub deja en la cola de cada driver cuando el PubSub no se pudo recuperar
+_HUB_DOWN = object()
+
+class RedisHub:
+    """
+    Una conexión Redis y un único PubSub para varios RedisDriver del mismo proceso
+    (routerlab.launcher). Cada driver registra su canal con un callback; una sola tarea
+    lee el PubSub y reparte cada mensaje al dueño del canal.
+    Si la lectura falla se reconecta (PubSub nuevo, mismos canales) con backoff hasta
+    REDIS_HUB_RETRIES veces seguidas (default 5); agotados los reintentos avisa a los
+    drivers (on_failure) y su run() termina con el error.
+    """
+
+    RETRY_BASE_S = 0.5
+    RETRY_MAX_S = 10.0
+
+    def __init__(self, retries: Optional[int] = None) -> None:
+        self.redis = _connect()
+        self.retries = int(os.getenv("REDIS_HUB_RETRIES", "5")) if retries is None else retries
+        self._subs: Dict[str, List[Callable[[str, Any], None]]] = {}
+        self._subscribed: set[str] = set()
+        self._failure_cbs: List[Callable[[BaseException], None]] = []
+        self._pubsub = None
+        self._task: Optional[asyncio.Task] = None
+        self._lock: Optional[asyncio.Lock] = None
+        self.error: Optional[BaseException] = None
+        self.stats: Dict[str, int] = {"channels": 0, "received": 0, "unrouted": 0,
+                                      "errors": 0, "reconnects": 0}
+
+    def register(self, channel: str, deliver: Callable[[str, Any], None]) -> None:
+        self._subs.setdefault(channel, []).append(deliver)
+        self.stats["channels"] = len(self._subs)
+
+    def on_failure(self, callback: Callable[[BaseException], None]) -> None:
+        """'callback(error)' se llama una vez si el PubSub queda caído sin más reintentos."""
+        self._failure_cbs.append(callback)
+
+    async def start(self) -> None:
+        """Suscribe (en un solo SUBSCRIBE) los canales registrados y arranca el reparto."""
+        if self.error is not None:
+            raise ConnectionError(f"RedisHub caído: {self.error!r}") from self.error
+        if self._lock is None:
+            self._lock = asyncio.Lock()
+        async with self._lock:
+            pending = [ch for ch in self._subs if ch not in self._subscribed]
+            if self._pubsub is None:
+                self._pubsub = self.redis.pubsub()
+            if pending:
+                await self._pubsub.subscribe(*pending)
+                self._subscribed.update(pending)
+            if self._task is None:
+                self._task = asyncio.create_task(self._dispatch(), name="redis-hub")
+
+    async def _resubscribe(self) -> None:
+        old, self._pubsub = self._pubsub, self.redis.pubsub()
+        close = getattr(old, "aclose", None) or getattr(old, "reset", None)
+        if close is not None:
+            try:
+                await close()
+            except Exception:
+                pass
+        await self._pubsub.subscribe(*self._subscribed)
+        self.stats["reconnects"] += 1
+
+    async def _dispatch(self) -> None:
+        failures = 0
+        while True:
+            try:
+                if failures:
+                    await self._resubscribe()
+                async for msg in self._pubsub.listen():
+                    failures = 0
+                    self._route(msg)
+                raise ConnectionError("el PubSub dejó de entregar mensajes")
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                failures += 1
+                self.stats["errors"] += 1
+                if failures > self.retries:
+                    print(f"[REDIS-HUB] PubSub caído tras {failures} intentos: {e!r}")
+                    self._fail(e)
+                    return
+                delay = min(self.RETRY_MAX_S, self.RETRY_BASE_S * 2 ** (failures - 1))
+                print(f"[REDIS-HUB] error leyendo el PubSub: {e!r}; "
+                      f"reintento {failures}/{self.retries} en {delay:.2f}s")
+                await asyncio.sleep(delay)
+
+    def _route(self, msg: Dict[str, Any]) -> None:
+        if msg.get("type") != "message":
+            return
+        channel = msg.get("channel")
+        if isinstance(channel, (bytes, bytearray)):
+            channel = channel.decode("utf-8", "ignore")
+        self.stats["received"] += 1
+        targets = self._subs.get(channel)
+        if not targets:
+            self.stats["unrouted"] += 1
+            return
+        for deliver in targets:
+            deliver(channel, msg.get("data"))
+
+    def _fail(self, error: BaseException) -> None:
+        self.error = error
+        for callback in self._failure_cbs:
+            callback(error)
+
 class RedisDriver(Transport):
     """
     Pub/Sub por canal: cada nodo escucha su canal (names-redis-11.txt).
     send(dest) = PUBLISH al canal del destino con payload JSON.
+    Con 'hub' (RedisHub) comparte conexión y PubSub con los demás nodos del proceso;
+    lo recibido pasa por una cola de ingreso acotada (INGRESS_*) como en el driver socket.
+
+    Multicast a vecinos (REDIS_MULTICAST=1, todos los vecinos deben usarlo):
+      - broadcast() publica UNA vez en el canal de salida propio "<canal>.out" con
+        "rcpt": [destinos], en lugar de un PUBLISH por vecino.
+      - cada nodo escucha además el "<canal>.out" de sus vecinos (watch_neighbors) y
+        descarta lo que no lo lista en "rcpt".
     """
-    def __init__(self, node: str, names_path: str):
+    def __init__(self, node: str, names_path: str, hub: Optional[RedisHub] = None,
+                 multicast: Optional[bool] = None):
         load_dotenv()
 
         self._node = node
@@ -20,27 +154,29 @@ class RedisDriver(Transport):
         self._names = self._load_names(self.names_path)
         self._rev = {v: k for k, v in self._names.items()}
 
-        # Conexión (host/port/db)
-        url = os.getenv("REDIS_URL")
-        host = os.getenv("REDIS_HOST", "127.0.0.1")
-        port = int(os.getenv("REDIS_PORT", "6379"))
-        db   = int(os.getenv("REDIS_DB",   "0"))
-        password = os.getenv("REDIS_PASSWORD")
-        tls = os.getenv("REDIS_TLS", "0") == "1"
-
-        if url:
-            self._r = Redis.from_url(url, decode_responses=False, ssl=tls)
-        else:
-            self._r = Redis(
-                host=host, port=port, db=db, password=password,
-                ssl=tls, decode_responses=False
-            )
+        # Conexión (host/port/db): propia o la del hub
+        self._hub = hub
+        self._r = hub.redis if hub is not None else _connect()
 
         # Canal propio de escucha
         self._my_channel = self._names.get(self._node)
         if not self._my_channel:
             raise RuntimeError(f"No hay canal para nodo {self._node} en {names_path}")
 
+        self.multicast = (os.getenv("REDIS_MULTICAST", "0") == "1") if multicast is None else multicast
+        self._out_channel = f"{self._my_channel}.out"
+        self._watched: List[str] = []
+        self._pub_stats: Dict[str, int] = {"publish": 0, "multicast": 0, "saved": 0, "filtered": 0}
+
+        self._queue: Optional[IngressQueue] = None
+        if hub is not None:
+            # El aviso de hub caído va por el carril de control: nunca se descarta
+            self._queue = IngressQueue.from_env(
+                "INGRESS", name=f"{node}:redis",
+                classify=lambda item: item is _HUB_DOWN or is_control(item))
+            hub.register(self._my_channel, self._deliver)
+            hub.on_failure(lambda error: self._queue.put_nowait(_HUB_DOWN))
+
     def _load_names(self, path: str) -> dict[str, str]:
         with open(path, "r", encoding="utf-8") as f:
             data = json.load(f)
@@ -50,9 +186,41 @@ class RedisDriver(Transport):
     def me(self) -> str:
         return self._node
 
+    def watch_neighbors(self, neighbors: Iterable[str]) -> None:
+        """En modo multicast, suscribe (antes de run) los canales de salida de los vecinos."""
+        if not self.multicast:
+            return
+        for n in neighbors:
+            channel = self._names.get(n)
+            if not channel or f"{channel}.out" in self._watched:
+                continue
+            self._watched.append(f"{channel}.out")
+            if self._hub is not None:
+                self._hub.register(f"{channel}.out", self._deliver)
+
+    def publish_stats(self) -> Dict[str, int]:
+        """PUBLISH hechos, cuántos fueron multicast, cuántos se ahorraron y recibidos ajenos."""
+        return dict(self._pub_stats)
+
+    def _deliver(self, channel: str, data: Any) -> None:
+        raw = self._decode(channel, data)
+        if raw is not None:
+            self._queue.put_nowait(raw)
+
+    def ingress_stats(self) -> Dict[str, int]:
+        return self._queue.stats() if self._queue is not None else {}
+
     async def run(self) -> AsyncIterator[Dict[str, Any]]:
+        if self._hub is not None:
+            await self._hub.start()
+            while True:
+                raw = await self._queue.get()
+                if raw is _HUB_DOWN:
+                    raise ConnectionError(f"RedisHub caído: {self._hub.error!r}") from self._hub.error
+                yield raw
+
         pubsub = self._r.pubsub()
-        await pubsub.subscribe(self._my_channel)
+        await pubsub.subscribe(self._my_channel, *self._watched)
 
         async for msg in pubsub.listen():
             # Estructura: {'type':'message'|..., 'channel': b'...', 'data': b'...'|str}
@@ -63,60 +231,71 @@ class RedisDriver(Transport):
             if isinstance(channel, (bytes, bytearray)):
                 channel = channel.decode("utf-8", "ignore")
 
-            data = msg.get("data")
-            raw: Dict[str, Any] | None = None
-
-            # --- Intentar decodificar como JSON ---
-            if isinstance(data, (bytes, bytearray)):
-                s = data.decode("utf-8", "ignore")
-            elif isinstance(data, str):
-                s = data
-            else:
-                s = None
-
-            if s is not None:
-                try:
-                    raw = json.loads(s)  # JSON válido
-                except Exception:
-                    # --- Fallback: string crudo -> envolver en sobre canónico ---
-                    sender = self._rev.get(channel) or self._node or "unknown"
-                    raw = {
-                        "proto": "flooding",
-                        "type": "message",
-                        "id": str(uuid.uuid4()),
-                        "from": sender,
-                        "origin": sender,
-                        "to": "*",
-                        "ttl": 8,
-                        "headers": [],
-                        "payload": s,
-                        "via": sender,
-                    }
-
-            if not isinstance(raw, dict):
-                continue
+            raw = self._decode(channel, msg.get("data"))
+            if raw is not None:
+                yield raw
+
+    def _decode(self, channel: str, data: Any) -> Optional[Dict[str, Any]]:
+        raw: Dict[str, Any] | None = None
 
-            # --- Normalizaciones mínimas (robustez entre grupos) ---
-            raw.setdefault("from", raw.get("from") or self._node)
-            raw.setdefault("origin", raw.get("origin") or raw["from"])
-            raw.setdefault("to", raw.get("to") or "*")
-            raw.setdefault("ttl", raw.get("ttl") or 8)
-            # headers puede venir como {}, None, etc. -> normalizar a lista
-            hdrs = raw.get("headers")
-            if hdrs is None:
-                raw["headers"] = []
-            elif isinstance(hdrs, dict):
-                raw["headers"] = [hdrs]
-            elif not isinstance(hdrs, list):
-                raw["headers"] = []
+        # --- Intentar decodificar como JSON ---
+        if isinstance(data, (bytes, bytearray)):
+            s = data.decode("utf-8", "ignore")
+        elif isinstance(data, str):
+            s = data
+        else:
+            s = None
+
+        if s is not None:
+            try:
+                raw = json.loads(s)  # JSON válido
+            except Exception:
+                # --- Fallback: string crudo -> envolver en sobre canónico ---
+                sender = self._rev.get(channel) or self._node or "unknown"
+                raw = {
+                    "proto": "flooding",
+                    "type": "message",
+                    "id": str(uuid.uuid4()),
+                    "from": sender,
+                    "origin": sender,
+                    "to": "*",
+                    "ttl": 8,
+                    "headers": [],
+                    "payload": s,
+                    "via": sender,
+                }
+
+        if not isinstance(raw, dict):
+            return None
+
+        # Multicast de un vecino: solo si este nodo está entre los destinatarios
+        if "rcpt" in raw:
+            rcpt = raw.pop("rcpt")
+            if not isinstance(rcpt, list) or self._node not in rcpt:
+                self._pub_stats["filtered"] += 1
+                return None
+
+        # --- Normalizaciones mínimas (robustez entre grupos) ---
+        raw.setdefault("from", raw.get("from") or self._node)
+        raw.setdefault("origin", raw.get("origin") or raw["from"])
+        raw.setdefault("to", raw.get("to") or "*")
+        raw.setdefault("ttl", raw.get("ttl") or 8)
+        # headers puede venir como {}, None, etc. -> normalizar a lista
+        hdrs = raw.get("headers")
+        if hdrs is None:
+            raw["headers"] = []
+        elif isinstance(hdrs, dict):
+            raw["headers"] = [hdrs]
+        elif not isinstance(hdrs, list):
+            raw["headers"] = []
 
-            raw.setdefault("proto", raw.get("proto") or "flooding")
-            raw.setdefault("type",  raw.get("type")  or "message")
+        raw.setdefault("proto", raw.get("proto") or "flooding")
+        raw.setdefault("type",  raw.get("type")  or "message")
 
-            # Vía: si no viene, usar el dueño del canal o 'from'
-            raw.setdefault("via", self._rev.get(channel) or raw.get("from"))
+        # Vía: si no viene, usar el dueño del canal o 'from'
+        raw.setdefault("via", self._rev.get(channel) or raw.get("from"))
 
-            yield raw
+        return raw
 
     async def send(self, to: str, message: Dict[str, Any]) -> None:
         channel = self._names.get(to)
@@ -124,6 +303,22 @@ class RedisDriver(Transport):
             return
         try:
             wire = json.dumps(message, separators=(",", ":")).encode("utf-8")
+            self._pub_stats["publish"] += 1
             await self._r.publish(channel, wire)
         except Exception:
             return
+
+    async def broadcast(self, targets: Iterable[str], message: Dict[str, Any]) -> None:
+        rcpt = [t for t in targets if t in self._names]
+        if not self.multicast or len(rcpt) < 2:
+            for to in rcpt:
+                await self.send(to, message)
+            return
+        try:
+            wire = json.dumps({**message, "rcpt": rcpt}, separators=(",", ":")).encode("utf-8")
+            self._pub_stats["publish"] += 1
+            self._pub_stats["multicast"] += 1
+            self._pub_stats["saved"] += len(rcpt) - 1
+            await self._r.publish(self._out_channel, wire)
+        except Exception:
+            return
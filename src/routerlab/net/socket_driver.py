@@ -2,13 +2,15 @@
 import asyncio, json
 from typing import AsyncIterator, Dict, Any
 from routerlab.net.transport import Transport
+from routerlab.core.queues import IngressQueue
 
 class SocketDriver(Transport):
     def __init__(self, node: str, port: int, names_path: str):
         self._node = node
         self._port = port
         self._names = self._load_names(names_path)
-        self._queue: asyncio.Queue[Dict[str, Any]] = asyncio.Queue()
+        # Cola de ingreso acotada (HELLO primero, descarta datos en sobrecarga)
+        self._queue = IngressQueue.from_env("INGRESS", name=f"{node}:socket")
 
     def _load_names(self, path: str) -> dict[str, str]:
         with open(path, "r", encoding="utf-8") as f:
@@ -23,7 +25,7 @@ class SocketDriver(Transport):
         try:
             data = await reader.readuntil(separator=b"\n")
             msg = json.loads(data.decode("utf-8").strip())
-            await self._queue.put(msg)
+            self._queue.put_nowait(msg)
         except asyncio.IncompleteReadError:
             pass
         finally:
@@ -44,6 +46,9 @@ class SocketDriver(Transport):
             msg = await self._queue.get()
             yield msg
 
+    def ingress_stats(self) -> Dict[str, int]:
+        return self._queue.stats()
+
     async def send(self, to: str, message: Dict[str, Any]) -> None:
         host_port = self._names.get(to)
         if not host_port:
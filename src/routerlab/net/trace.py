@@ -0,0 +1,263 @@
+# src/routerlab/net/trace.py
+# Grabación de tramas del Transport en un log binario y reproducción sobre un RouterNode
+#
+# Uso:
+#   PYTHONPATH=src python -m routerlab.cli ... --record traza.trace
+#   PYTHONPATH=src python -m routerlab.net.trace info traza.trace
+#   PYTHONPATH=src python -m routerlab.net.trace replay traza.trace --topo configs/topo-11.txt --proto lsr --speed 0
+#
+# Formato (append-only, little endian):
+#   encabezado: MAGIC | u16 largo del nodo | nodo (utf-8) | f64 hora de pared al iniciar
+#   registro:   u8 flags | u64 ns desde el inicio (reloj monotónico) | u16 largo del peer |
+#               u32 largo del payload | peer (utf-8) | payload (JSON compacto)
+#   flags: IN / OUT (dirección) y RAW si la trama llegó como str y no como dict.
+# Un registro truncado al final (corte durante la escritura) se ignora al leer.
+from __future__ import annotations
+import argparse, asyncio, json, struct, time
+from collections import Counter
+from pathlib import Path
+from typing import Any, AsyncIterator, Callable, Dict, Iterator, List, NamedTuple, Optional, Tuple
+
+from routerlab.net.transport import Transport
+
+MAGIC = b"RLTRACE\x01"
+_NODE = struct.Struct("<H")
+_START = struct.Struct("<d")
+_REC = struct.Struct("<BQHI")
+
+IN = 0x01
+OUT = 0x02
+RAW = 0x10
+
+_SEP = (",", ":")
+
+class TraceRecord(NamedTuple):
+    direction: str      # "in" | "out"
+    t: float            # segundos desde el inicio de la grabación
+    peer: str           # destino de un 'out' ("" en las entrantes)
+    frame: Any          # dict (o str si llegó crudo)
+
+class TraceWriter:
+    """
+    Escritor append-only con buffer. Flushea cada 'flush_every' registros y al cerrar;
+    ante un corte se pierde como mucho la cola del buffer, nunca se corrompe lo anterior.
+    """
+
+    def __init__(self, path: str | Path, node_id: str, flush_every: int = 64) -> None:
+        self.path = Path(path)
+        self.node_id = node_id
+        self.flush_every = max(1, flush_every)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._f = open(self.path, "wb", buffering=64 * 1024)
+        node = node_id.encode("utf-8")
+        self._f.write(MAGIC + _NODE.pack(len(node)) + node + _START.pack(time.time()))
+        self._t0 = time.monotonic_ns()
+        self._pending = 0
+        self.stats: Dict[str, int] = {"in": 0, "out": 0, "bytes": 0}
+
+    def write(self, direction: int, frame: Any, peer: str = "") -> None:
+        if self._f.closed:
+            return
+        flags = direction
+        if isinstance(frame, (str, bytes)):
+            flags |= RAW
+            payload = frame.encode("utf-8") if isinstance(frame, str) else frame
+        else:
+            payload = json.dumps(frame, separators=_SEP).encode("utf-8")
+        p = peer.encode("utf-8")
+        rec = _REC.pack(flags, time.monotonic_ns() - self._t0, len(p), len(payload))
+        self._f.write(rec + p + payload)
+        self.stats["in" if direction == IN else "out"] += 1
+        self.stats["bytes"] += len(rec) + len(p) + len(payload)
+        self._pending += 1
+        if self._pending >= self.flush_every:
+            self.flush()
+
+    def flush(self) -> None:
+        if not self._f.closed:
+            self._f.flush()
+            self._pending = 0
+
+    def close(self) -> None:
+        if not self._f.closed:
+            self._f.close()
+
+def read_trace(path: str | Path) -> Tuple[str, float, Iterator[TraceRecord]]:
+    """(nodo, hora de pared del inicio, iterador de registros) de un archivo de traza."""
+    f = open(path, "rb")
+    try:
+        if f.read(len(MAGIC)) != MAGIC:
+            raise ValueError(f"{path}: no es una traza de routerlab")
+        (n,) = _NODE.unpack(f.read(_NODE.size))
+        node = f.read(n).decode("utf-8")
+        (started,) = _START.unpack(f.read(_START.size))
+    except (struct.error, UnicodeDecodeError) as e:
+        f.close()
+        raise ValueError(f"{path}: encabezado de traza inválido ({e})") from None
+    except Exception:
+        f.close()
+        raise
+
+    def records() -> Iterator[TraceRecord]:
+        with f:
+            while True:
+                head = f.read(_REC.size)
+                if len(head) < _REC.size:
+                    return
+                flags, t_ns, plen, size = _REC.unpack(head)
+                body = f.read(plen + size)
+                if len(body) < plen + size:
+                    return
+                peer = body[:plen].decode("utf-8")
+                payload = body[plen:].decode("utf-8")
+                frame = payload if flags & RAW else json.loads(payload)
+                yield TraceRecord("in" if flags & IN else "out", t_ns / 1e9, peer, frame)
+
+    return node, started, records()
+
+class RecordingTransport(Transport):
+    """
+    Envuelve otro Transport y graba en el log cada trama entrante (tal como la entrega
+    run()) y saliente (send()). El resto de atributos (ingress_stats, ...) se delegan al
+    transporte real, así los hasattr() del nodo siguen viendo lo mismo.
+    """
+
+    def __init__(self, inner: Transport, path: str | Path, flush_every: int = 64) -> None:
+        self.inner = inner
+        self.writer = TraceWriter(path, inner.me(), flush_every)
+
+    def __getattr__(self, name: str) -> Any:
+        if name == "inner":
+            raise AttributeError(name)
+        return getattr(self.inner, name)
+
+    def me(self) -> str:
+        return self.inner.me()
+
+    async def run(self) -> AsyncIterator[Dict[str, Any]]:
+        try:
+            async for raw in self.inner.run():
+                self.writer.write(IN, raw)
+                yield raw
+        finally:
+            self.writer.close()
+
+    async def send(self, to: str, message: Dict[str, Any]) -> None:
+        self.writer.write(OUT, message, to)
+        await self.inner.send(to, message)
+
+    async def broadcast(self, targets, message: Dict[str, Any]) -> None:
+        # Se graba una salida por destino (la traza no depende del modo del driver)
+        targets = list(targets)
+        for to in targets:
+            self.writer.write(OUT, message, to)
+        await self.inner.broadcast(targets, message)
+
+class ReplayTransport(Transport):
+    """
+    Transport que entrega las tramas entrantes de una traza.
+      - speed: 1.0 = tiempos originales, 2.0 = el doble de rápido, 0 = lo más rápido posible
+      - drain (opcional): predicado; al agotar la traza run() espera a que sea True antes
+        de terminar (p. ej. cola de routing vacía) para que el nodo procese lo pendiente
+    Lo que el nodo envía queda en 'sent' para compararlo con las salidas grabadas.
+    """
+
+    def __init__(self, path: str | Path, speed: float = 1.0, node_id: Optional[str] = None,
+                 drain: Optional[Callable[[], bool]] = None) -> None:
+        self.path = Path(path)
+        recorded, _, records = read_trace(self.path)
+        self._node = node_id or recorded
+        self._records = records
+        self.speed = max(0.0, float(speed))
+        self.drain = drain
+        self.sent: List[Tuple[str, Dict[str, Any]]] = []
+        self.stats: Dict[str, Any] = {"in": 0, "out": 0, "recorded_out": Counter(), "late_s": 0.0}
+
+    def me(self) -> str:
+        return self._node
+
+    async def run(self) -> AsyncIterator[Dict[str, Any]]:
+        loop = asyncio.get_running_loop()
+        start = loop.time()
+        for rec in self._records:
+            if rec.direction == "out":
+                self.stats["recorded_out"][_frame_type(rec.frame)] += 1
+                continue
+            if self.speed > 0:
+                delay = rec.t / self.speed - (loop.time() - start)
+                if delay > 0:
+                    await asyncio.sleep(delay)
+                else:
+                    self.stats["late_s"] = max(self.stats["late_s"], -delay)
+            else:
+                # Cede el loop para que las tareas del nodo avancen entre tramas
+                await asyncio.sleep(0)
+            self.stats["in"] += 1
+            yield rec.frame
+        while self.drain is not None and not self.drain():
+            await asyncio.sleep(0.001)
+        await asyncio.sleep(0)
+
+    async def send(self, to: str, message: Dict[str, Any]) -> None:
+        self.stats["out"] += 1
+        self.sent.append((to, message))
+
+def _frame_type(frame: Any) -> str:
+    if isinstance(frame, dict):
+        return str(frame.get("type", "?"))
+    return "raw"
+
+def summarize(path: str | Path) -> Dict[str, Any]:
+    node, started, records = read_trace(path)
+    counts: Dict[str, Counter] = {"in": Counter(), "out": Counter()}
+    last = 0.0
+    for rec in records:
+        counts[rec.direction][_frame_type(rec.frame)] += 1
+        last = rec.t
+    return {"node": node, "started": started, "duration_s": round(last, 3),
+            "in": dict(counts["in"]), "out": dict(counts["out"])}
+
+async def replay(path: str | Path, topo_path: str, proto: str, speed: float = 0.0,
+                 node_id: Optional[str] = None) -> Dict[str, Any]:
+    """Reproduce la traza sobre un RouterNode nuevo y devuelve tiempos y conteos."""
+    from routerlab.core.node import RouterNode
+    transport = ReplayTransport(path, speed=speed, node_id=node_id)
+    node = RouterNode(node_id=transport.me(), transport=transport, topo_path=topo_path, proto=proto)
+    transport.drain = node.route_queue.empty
+    t0 = time.perf_counter()
+    await node.run()
+    elapsed = time.perf_counter() - t0
+    replayed_out = Counter(_frame_type(m) for _, m in transport.sent)
+    return {
+        "node": transport.me(),
+        "frames_in": transport.stats["in"],
+        "elapsed_s": round(elapsed, 4),
+        "frames_per_s": round(transport.stats["in"] / elapsed, 1) if elapsed > 0 else 0.0,
+        "late_s": round(transport.stats["late_s"], 4),
+        "out": dict(replayed_out),
+        "recorded_out": dict(transport.stats["recorded_out"]),
+    }
+
+def main() -> None:
+    ap = argparse.ArgumentParser(prog="routerlab.net.trace",
+                                 description="Inspecciona o reproduce trazas grabadas con --record")
+    sub = ap.add_subparsers(dest="cmd", required=True)
+    p_info = sub.add_parser("info", help="resumen de una traza")
+    p_info.add_argument("trace")
+    p_rep = sub.add_parser("replay", help="reproduce una traza sobre un RouterNode")
+    p_rep.add_argument("trace")
+    p_rep.add_argument("--topo", required=True, help="ruta a topo-*.txt")
+    p_rep.add_argument("--proto", required=True, choices=["flooding", "dvr", "dijkstra", "lsr"])
+    p_rep.add_argument("--speed", type=float, default=0.0,
+                       help="1 = tiempos originales, 0 = lo más rápido posible (default)")
+    p_rep.add_argument("--node", default=None, help="ID del nodo (default: el de la traza)")
+    args = ap.parse_args()
+
+    if args.cmd == "info":
+        out = summarize(args.trace)
+    else:
+        out = asyncio.run(replay(args.trace, args.topo, args.proto, args.speed, args.node))
+    print(json.dumps(out, indent=2, ensure_ascii=False))
+
+if __name__ == "__main__":
+    main()
@@ -1,5 +1,5 @@
 from abc import ABC, abstractmethod
-from typing import AsyncIterator, Dict, Any
+from typing import AsyncIterator, Dict, Any, Iterable
 
 class Transport(ABC):
     @abstractmethod
@@ -12,6 +12,12 @@ class Transport(ABC):
         """Envía 'message' (dict) hacia el identificador 'to' (node-id/JID)."""
         ...
 
+    async def broadcast(self, targets: Iterable[str], message: Dict[str, Any]) -> None:
+        """Mismo 'message' a varios destinos. Por defecto un send() por destino; un driver
+        puede resolverlo con un solo envío (RedisDriver en modo multicast)."""
+        for to in targets:
+            await self.send(to, message)
+
     @abstractmethod
     def me(self) -> str:
         """Identificador local (node-id o JID/resource)."""
@@ -0,0 +1,85 @@
+import json
+
+import pytest
+
+from routerlab.algorithms import dijkstra as dijkstra_mod
+from routerlab.algorithms.all_pairs import all_pairs, load_row, topo_digest, write_table
+from routerlab.algorithms.dijkstra import Dijkstra, graph_arcs, load_graph_from_topo, spf_routes
+
+
+def _topo(tmp_path, cfg):
+    p = tmp_path / "topo.txt"
+    p.write_text(json.dumps({"type": "topo", "config": cfg}), encoding="utf-8")
+    return str(p)
+
+
+CFG = {
+    "A": {"B": 1, "C": 4},
+    "B": {"A": 1, "C": 1, "D": 5},
+    "C": {"A": 4, "B": 1, "D": 1},
+    "D": {"B": 5, "C": 1},
+    "E": {},                       # aislado
+}
+
+
+@pytest.mark.parametrize("workers", [1, 2])
+def test_all_pairs_rows_match_single_source_spf(tmp_path, workers):
+    topo = _topo(tmp_path, CFG)
+    arcs = graph_arcs(load_graph_from_topo(topo))
+    rows = all_pairs(arcs, sorted(CFG), workers=workers)
+    for s in CFG:
+        dist, _, nh, _ = spf_routes(arcs, s)
+        assert rows[s] == (dist, nh)
+
+
+def test_table_roundtrip_and_stale_digest(tmp_path):
+    topo = _topo(tmp_path, CFG)
+    arcs = graph_arcs(load_graph_from_topo(topo))
+    out = tmp_path / "nexthops.jsonl"
+    write_table(out, all_pairs(arcs, sorted(CFG), workers=1), topo_digest(topo))
+
+    dist, nh = load_row(out, "A", topo_digest(topo))
+    assert nh["D"] == "B" and dist["D"] == 3.0
+    assert nh["A"] is None and nh["E"] is None and dist["E"] == float("inf")
+    assert load_row(out, "Z") is None
+    assert load_row(out, "A", "otra-topo") is None
+    assert load_row(out, "A", undirected=False) is None
+
+
+def test_load_row_seeks_past_other_rows(tmp_path):
+    topo = _topo(tmp_path, CFG)
+    arcs = graph_arcs(load_graph_from_topo(topo))
+    rows = all_pairs(arcs, sorted(CFG), workers=1)
+    out = tmp_path / "nexthops.jsonl"
+    write_table(out, rows, topo_digest(topo))
+    for n in CFG:
+        dist, nh = load_row(out, n)
+        assert nh == {d: rows[n][1].get(d) for d in CFG}
+
+    # Las filas ajenas no se leen: se pueden pisar (mismo largo) sin afectar a D
+    header, *lines = out.read_bytes().split(b"\n")
+    lines[:3] = [b"x" * len(line) for line in lines[:3]]
+    out.write_bytes(b"\n".join([header, *lines]))
+    assert load_row(out, "D")[1]["A"] == "C"
+
+
+def test_dijkstra_loads_row_without_running_spf(tmp_path, monkeypatch):
+    topo = _topo(tmp_path, CFG)
+    out = tmp_path / "nexthops.jsonl"
+    write_table(out, all_pairs(graph_arcs(load_graph_from_topo(topo)), sorted(CFG), workers=1),
+                topo_digest(topo))
+
+    def no_spf(*_a, **_k):
+        raise AssertionError("no debería correr SPF")
+    monkeypatch.setattr(dijkstra_mod, "spf_routes", no_spf)
+    alg = Dijkstra(topo_path=topo, table_path=str(out))
+    alg.on_init("C", ["A", "B", "D"])
+    assert alg.table_loaded
+    assert alg.next_hop("A") == "B" and alg.distance("A") == 2.0
+
+    # Una tabla de otra topología se ignora y se calcula localmente
+    monkeypatch.undo()
+    other = _topo(tmp_path, {**CFG, "E": {"D": 1}})
+    alg = Dijkstra(topo_path=other, table_path=str(out))
+    alg.on_init("C", [])
+    assert not alg.table_loaded and alg.next_hop("E") == "D"
@@ -126,3 +126,196 @@ def test_class_next_hop_various_topologies(tmp_path, cfg, expected_first_hop):
     alg = Dijkstra(topo_path=str(topo_file))
     alg.on_init(me="A", neighbors=list(cfg.get("A", [])))
     assert alg.next_hop("C") == expected_first_hop
+
+
+# ---------- Loop-free alternates ----------
+
+def test_lfa_backups_respect_loop_free_condition():
+    """
+    Anillo de 4 con cuerda cara:  S - A - D,  S - B - D,  S - C (C solo conecta con S)
+    Primario hacia D por A; B cumple dist(B,D) < dist(B,S) + dist(S,D); C no.
+    """
+    from src.routerlab.algorithms.dijkstra import graph_arcs, spf_routes_lfa
+    g = Graph(undirected=True)
+    g.add_edge("S", "A", 1)
+    g.add_edge("A", "D", 1)
+    g.add_edge("S", "B", 2)
+    g.add_edge("B", "D", 1)
+    g.add_edge("S", "C", 1)
+
+    dist, _, nh, _, backups = spf_routes_lfa(graph_arcs(g), "S")
+    assert nh["D"] == "A"
+    assert backups["D"] == ("B", 3.0)
+    assert "C" not in backups  # a C solo se llega por el enlace directo
+    # Un vecino que vuelve por S nunca es LFA
+    assert all(b != "C" for b, _ in backups.values())
+
+
+# ---------- ECMP ----------
+
+def test_spf_keeps_all_equal_cost_first_hops():
+    """
+    Diamante: S -> A -> D y S -> B -> D con igual costo; E cuelga de D.
+    next_hop conserva el desempate clásico; 'paths' trae ambos primeros saltos.
+    """
+    from src.routerlab.algorithms.dijkstra import graph_arcs, spf_routes
+    g = Graph(undirected=True)
+    g.add_edge("S", "A", 1)
+    g.add_edge("S", "B", 2)
+    g.add_edge("A", "D", 2)
+    g.add_edge("B", "D", 1)
+    g.add_edge("D", "E", 1)
+
+    dist, _, nh, paths = spf_routes(graph_arcs(g), "S")
+    assert dist["E"] == 4
+    assert nh["D"] in ("A", "B")
+    assert paths["D"] == ("A", "B")
+    assert paths["E"] == ("A", "B")   # se hereda a través de D
+    assert "A" not in paths and "B" not in paths
+
+
+# ---------- Modo perezoso (A* + landmarks) ----------
+
+def _grid_topo(tmp_path, side=8, seed=3):
+    import random
+    rnd = random.Random(seed)
+    cfg = {f"N{i}": {} for i in range(side * side)}
+    for r in range(side):
+        for c in range(side):
+            u = r * side + c
+            for v in ((u + 1) if c + 1 < side else None, (u + side) if r + 1 < side else None):
+                if v is not None:
+                    cfg[f"N{u}"][f"N{v}"] = rnd.randint(1, 9)
+    topo_file = tmp_path / "topo-grid.json"
+    topo_file.write_text(json.dumps({"type": "topo", "config": cfg}), encoding="utf-8")
+    return str(topo_file), len(cfg)
+
+
+def test_lazy_matches_eager_and_memoizes_prefixes(tmp_path):
+    topo, n = _grid_topo(tmp_path)
+    eager = Dijkstra(topo_path=topo)
+    eager.on_init(me="N0", neighbors=[])
+    lazy = Dijkstra(topo_path=topo, mode="lazy")
+    lazy.on_init(me="N0", neighbors=[])
+    assert dict(lazy.fib.table) == {"N0": None}      # nada calculado todavía
+
+    far = f"N{n - 1}"
+    path = lazy.route(far)
+    assert path[0] == "N0" and path[-1] == far
+    assert lazy.distance(far) == eager.distance(far)
+    assert lazy.stats["settled"] < n                  # la búsqueda no recorre todo el grafo
+    # Los nodos intermedios de la ruta quedan memorizados: consultarlos no busca de nuevo
+    misses = lazy.stats["misses"]
+    assert lazy.next_hop(path[len(path) // 2]) == path[1]
+    assert lazy.stats["misses"] == misses
+
+    for i in range(n):
+        d = f"N{i}"
+        assert lazy.distance(d) == pytest.approx(eager.distance(d))
+
+
+def test_lazy_set_link_invalidates_only_affected_destinations():
+    g_cfg = [("A", "B", 1), ("B", "C", 1), ("A", "D", 1), ("D", "E", 1), ("C", "E", 5)]
+    alg = Dijkstra(mode="lazy", landmarks=2)
+    alg.on_init(me="A", neighbors=["B", "D"])
+    for u, v, w in g_cfg:
+        alg.set_link(u, v, w)
+
+    assert alg.route("C") == ["A", "B", "C"]
+    assert alg.route("E") == ["A", "D", "E"]
+
+    # Sube B-C: solo C (y B no, su ruta no usa el enlace) se invalida
+    alg.set_link("B", "C", 10)
+    assert "C" not in alg._memo and "E" in alg._memo and "B" in alg._memo
+    assert alg.route("C") == ["A", "D", "E", "C"]
+    assert alg.distance("C") == 7.0
+
+    # Aparece un atajo A-C: C mejora
+    alg.set_link("A", "C", 1)
+    assert alg.next_hop("C") == "C"
+
+    # Cae D-E: E sigue alcanzable por C
+    alg.set_link("D", "E", None)
+    assert alg.route("E") == ["A", "C", "E"]
+    alg.set_link("C", "E", None)
+    assert alg.next_hop("E") is None and alg.route("E") == []
+
+
+# ---------- Dial (pesos enteros) ----------
+
+def _random_graph(seed, n=60, m=200, wmax=6, integer=True):
+    import random
+    rnd = random.Random(seed)
+    g = Graph(undirected=True)
+    for i in range(n):
+        g.adj.setdefault(f"N{i}", [])
+    for _ in range(m):
+        u, v = rnd.sample(range(n), 2)
+        w = rnd.randint(0, wmax) if integer else rnd.uniform(0.5, wmax)
+        g.add_edge(f"N{u}", f"N{v}", w)
+    return g
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_dial_matches_heap_including_tie_break(seed):
+    from src.routerlab.algorithms.dijkstra import dijkstra
+    g = _random_graph(seed)   # pesos 0..6: muchos empates y aristas de costo 0
+    assert dijkstra(g, "N0", backend="dial") == dijkstra(g, "N0", backend="heap")
+
+
+def test_auto_backend_selects_dial_only_for_integer_weights():
+    from src.routerlab.algorithms.dijkstra import dijkstra, int_weight_bound
+    assert int_weight_bound(_random_graph(1)) == 6
+    floats = _random_graph(1, integer=False)
+    assert int_weight_bound(floats) is None
+    with pytest.raises(ValueError):
+        dijkstra(floats, "N0", backend="dial")
+    # auto cae en heap con pesos reales
+    assert dijkstra(floats, "N0") == dijkstra(floats, "N0", backend="heap")
+
+
+def test_auto_backend_keeps_heap_on_small_or_heavy_graphs(monkeypatch):
+    from src.routerlab.algorithms import dijkstra as mod
+    small = _random_graph(2)                  # 400 arcos, pesos 0..6
+    assert mod.spf_backend(small) == ("heap", None)
+    assert mod.spf_backend(small, "dial") == ("dial", 6)
+
+    calls = []
+    real = mod.int_weight_bound
+    monkeypatch.setattr(mod, "int_weight_bound", lambda g, *a: calls.append(1) or real(g, *a))
+    monkeypatch.setattr(mod, "DIAL_AUTO_MIN_ARCS", 100)
+    assert mod.spf_backend(small) == ("dial", 6)
+    assert len(calls) == 1                    # una sola pasada por los pesos
+    heavy = _random_graph(2, wmax=mod.DIAL_AUTO_MAX_WEIGHT + 10)
+    assert mod.spf_backend(heavy)[0] == "heap"
+
+
+def test_lazy_landmarks_survive_cost_decreases(tmp_path, monkeypatch):
+    from src.routerlab.algorithms import dijkstra as mod
+    topo, n = _grid_topo(tmp_path)
+    builds = []
+    real = mod.select_landmarks
+    monkeypatch.setattr(mod, "select_landmarks", lambda *a: builds.append(1) or real(*a))
+
+    assert Dijkstra(topo_path=topo, mode="lazy")._k == 0        # sin landmarks por defecto
+    lazy = Dijkstra(topo_path=topo, mode="lazy", landmarks=3)
+    lazy.on_init(me="N0", neighbors=[])
+    eager = Dijkstra(topo_path=topo)
+    eager.on_init(me="N0", neighbors=[])
+    lazy.distance(f"N{n - 1}")
+    assert len(builds) == 1
+
+    # Bajas de costo y recompute() sin cambios de grafo: se afloja la cota, no se rehace
+    for u, v in (("N0", "N1"), ("N9", "N10"), ("N27", "N35")):
+        lazy.set_link(u, v, 1)
+        eager.set_link(u, v, 1)
+    lazy.recompute()
+    assert len(builds) == 1 and lazy._lm_slack > 0
+    for i in range(n):
+        assert lazy.distance(f"N{i}") == pytest.approx(eager.distance(f"N{i}"))
+    assert len(builds) == 1
+
+    # Un enlace nuevo sí obliga a rehacer las tablas
+    lazy.set_link("N0", f"N{n - 1}", 1)
+    assert lazy.distance(f"N{n - 1}") == 1.0
+    assert len(builds) == 2
@@ -86,3 +86,264 @@ def test_build_info_exports_current_vector():
     assert vec["B"] == pytest.approx(1.0)
     # Si el algoritmo ya calculo C, tambien puede anunciarlo
     assert vec.get("C", 2.0) == pytest.approx(2.0)
+
+
+def test_init_accepts_cost_dict():
+    dv = DistanceVector()
+    dv.on_init(me="A", neighbors={"B": 4.0, "C": 2.0})
+    dv.on_info("B", {"vector": {"B": 0}})
+    dv.recompute()
+    assert dv.dv["B"]["cost"] == pytest.approx(4.0)
+
+
+def test_delta_merges_and_none_withdraws():
+    dv = DistanceVector()
+    dv.on_init(me="A", neighbors=["B"])
+    dv.on_info("B", {"vector": {"B": 0, "C": 1, "D": 2}, "full": True})
+    dv.on_info("B", {"vector": {"D": None, "E": 3}, "full": False})
+    dv.recompute()
+
+    assert dv.next_hop("C") == "B"   # el delta no borra lo que no menciona
+    assert dv.next_hop("D") is None  # None = retiro
+    assert dv.dv["E"]["cost"] == pytest.approx(4.0)
+
+
+def test_cost_increase_is_applied():
+    dv = DistanceVector()
+    dv.on_init(me="A", neighbors=["B", "D"])
+    dv.on_info("B", {"vector": {"C": 1}})
+    dv.on_info("D", {"vector": {"C": 5}})
+    dv.recompute()
+    assert dv.next_hop("C") == "B"
+
+    dv.on_info("B", {"vector": {"C": 9}, "full": False})
+    dv.recompute()
+    assert dv.dv["C"]["cost"] == pytest.approx(6.0)
+    assert dv.next_hop("C") == "D"
+
+
+def test_poison_reverse_and_triggered_changes():
+    dv = DistanceVector()
+    dv.on_init(me="A", neighbors=["B", "D"])
+    dv.take_changes()
+    dv.on_info("B", {"vector": {"B": 0, "C": 1}})
+    dv.recompute()
+
+    assert dv.take_changes() == {"B", "C"}
+    assert dv.take_changes() == set()
+    # A llega a C por B: a B se le anuncia envenenado, a D con su costo
+    assert dv.vector_for("B", ["C"]) == {"C": None}
+    assert dv.vector_for("D", ["C"]) == {"C": pytest.approx(2.0)}
+
+
+def test_purge_neighbor_and_infinity():
+    dv = DistanceVector(infinity=16)
+    dv.on_init(me="A", neighbors=["B"])
+    dv.on_info("B", {"vector": {"C": 1, "X": 20}})
+    dv.recompute()
+    assert "X" not in dv.recv["B"]          # >= infinity: inalcanzable
+    assert dv.purge_node_everywhere("B")
+    dv.recompute()
+    assert dv.next_hop("C") is None
+    assert "C" in dv.take_changes()
+
+
+def test_table_grows_and_matches_bruteforce():
+    import random
+    rnd = random.Random(3)
+    nbrs = {f"B{i}": float(rnd.randint(1, 5)) for i in range(6)}   # > columnas iniciales
+    dv = DistanceVector()
+    dv.on_init(me="A", neighbors=nbrs)
+    vectors = {n: {f"D{k}": float(rnd.randint(0, 20)) for k in range(50)} for n in nbrs}
+    for n, vec in vectors.items():
+        dv.on_info(n, {"vector": vec})
+    dv.recompute()
+    dv.take_changes()
+
+    # Delta que solo toca D7: el resto no debe marcarse como cambiado
+    vectors["B2"]["D7"] = 0.0
+    dv.on_info("B2", {"vector": {"D7": 0.0}, "full": False})
+    dv.recompute()
+    assert dv.take_changes() <= {"D7"}
+
+    for k in range(50):
+        d = f"D{k}"
+        best = min(nbrs[n] + vectors[n][d] for n in nbrs)
+        assert dv.dv[d]["cost"] == pytest.approx(best)
+
+
+def test_link_cost_change_touches_all_destinations():
+    dv = DistanceVector()
+    dv.on_init(me="A", neighbors={"B": 1.0, "C": 3.0})
+    dv.on_info("B", {"vector": {"X": 1, "Y": 1}})
+    dv.on_info("C", {"vector": {"X": 1, "Y": 1}})
+    dv.recompute()
+    assert dv.next_hop("X") == "B" and dv.next_hop("Y") == "B"
+
+    dv.cost["B"] = 10.0   # p.ej. métrica dinámica por RTT
+    dv.recompute()
+    assert dv.next_hop("X") == "C" and dv.next_hop("Y") == "C"
+    assert dv.dv["X"]["cost"] == pytest.approx(4.0)
+
+
+def _dual(costs):
+    dv = DistanceVector(mode="dual")
+    dv.on_init(me="A", neighbors=costs)
+    return dv
+
+
+def test_dual_feasible_successor_switches_locally():
+    dv = _dual({"B": 1.0, "C": 1.0})
+    dv.on_info("B", {"vector": {"B": 0, "D": 1}, "full": True})
+    dv.on_info("C", {"vector": {"C": 0, "D": 1.5}, "full": True})
+    dv.recompute()
+    assert dv.next_hop("D") == "B"          # FD(D) = 2
+
+    # B retira D: C anuncia 1.5 < FD -> sucesor factible, sin cómputo difuso
+    dv.on_info("B", {"vector": {"D": None}, "full": False})
+    dv.recompute()
+    assert dv.next_hop("D") == "C"
+    assert dv.dv["D"]["cost"] == pytest.approx(2.5)
+    assert dv.stats["local_switches"] == 1
+    assert dv.take_diffusing() == {"query": {}, "reply": {}}
+
+
+def test_dual_goes_active_without_feasible_successor_until_replies():
+    dv = _dual({"B": 1.0, "C": 1.0})
+    dv.on_info("B", {"vector": {"B": 0, "D": 1}, "full": True})
+    dv.on_info("C", {"vector": {"C": 0, "D": 5}, "full": True})
+    dv.recompute()
+    dv.take_diffusing()
+
+    # C anuncia 5 >= FD = 2: no es factible (podría pasar por A) -> ACTIVO
+    dv.on_info("B", {"vector": {"D": None}, "full": False})
+    dv.recompute()
+    out = dv.take_diffusing()
+    assert set(out["query"]) == {"B", "C"}
+    assert out["query"]["C"] == {"D": None}
+    assert dv.next_hop("D") is None
+    assert dv.stats["active_episodes"] == 1
+
+    # Mientras falten respuestas el destino queda congelado
+    dv.on_reply("C", {"D": 5})
+    dv.recompute()
+    assert dv.next_hop("D") is None
+
+    dv.on_reply("B", {"D": None})
+    dv.recompute()
+    assert dv.next_hop("D") == "C"
+    assert dv.dv["D"]["cost"] == pytest.approx(6.0)
+
+
+def test_dual_query_is_answered_and_dead_neighbor_counts_as_reply():
+    dv = _dual({"B": 1.0, "C": 1.0})
+    dv.on_info("B", {"vector": {"B": 0, "D": 1}, "full": True})
+    dv.on_info("C", {"vector": {"C": 0, "D": 5}, "full": True})
+    dv.recompute()
+    dv.take_diffusing()
+
+    # Query de C: se le responde con la distancia actual
+    dv.on_query("C", {"D": None})
+    dv.recompute()
+    assert dv.take_diffusing()["reply"] == {"C": {"D": 2.0}}
+
+    # B retira D y después cae sin responder: su caída cierra el cómputo difuso
+    dv.on_info("B", {"vector": {"D": None}, "full": False})
+    dv.on_info("C", {"vector": {"D": 5}, "full": False})
+    dv.recompute()
+    assert len(dv._active) == 1
+    dv.on_reply("C", {"D": 5})
+    assert dv.purge_node_everywhere("B") is True
+    dv.recompute()
+    assert dv.next_hop("D") == "C"
+
+def test_dual_lost_reply_expires_as_unreachable_after_sia_timeout():
+    dv = _dual({"B": 1.0, "C": 1.0})
+    dv.sia_timeout = 5.0
+    dv.on_info("B", {"vector": {"B": 0, "D": 1}, "full": True})
+    dv.on_info("C", {"vector": {"C": 0, "D": 5}, "full": True})
+    dv.recompute()
+    dv.take_diffusing()
+
+    dv.on_info("B", {"vector": {"D": None}, "full": False})
+    dv.recompute()
+    assert set(dv.take_diffusing()["query"]) == {"B", "C"}
+    started = dv._active_since[dv._dest_idx["D"]]
+
+    # La respuesta de C se pierde: antes del timeout sigue ACTIVO
+    dv.on_reply("B", {"D": None})
+    assert dv.expire_active(started + 4.0) is False
+    dv.recompute()
+    assert dv.next_hop("D") is None and len(dv._active) == 1
+
+    # Vencido el timer, C cuenta como "inalcanzable" y el cómputo se cierra
+    assert dv.expire_active(started + 5.0) is True
+    dv.recompute()
+    assert dv._active == {} and dv._active_since == {}
+    assert dv.stats["sia"] == 1
+    assert dv.next_hop("D") is None
+
+    # Lo próximo que anuncie C vuelve a contar con FD reiniciada
+    dv.on_info("C", {"vector": {"D": 5}, "full": False})
+    dv.recompute()
+    assert dv.next_hop("D") == "C"
+
+
+def test_node_uses_module_infinity_by_default(tmp_path, monkeypatch):
+    import json
+    from routerlab.algorithms.distance_vector import DV_INFINITY
+    from routerlab.core.node import RouterNode
+    monkeypatch.delenv("DV_INFINITY", raising=False)
+    topo = tmp_path / "topo.json"
+    topo.write_text(json.dumps({"type": "topo", "config": {"N1": {"N2": 1}, "N2": {"N1": 1}}}))
+    class Quiet:
+        async def send(self, to, msg):
+            pass
+
+    node = RouterNode("N1", Quiet(), str(topo), proto="dvr")
+    assert node.alg.infinity == DV_INFINITY
+
+def test_node_refreshes_full_vector_so_a_lost_delta_is_repaired(tmp_path, monkeypatch):
+    import asyncio, json
+    from routerlab.core.node import RouterNode
+    from routerlab.core.queues import IngressQueue
+
+    class Recorder:
+        def __init__(self):
+            self.sent = []
+
+        async def send(self, to, msg):
+            self.sent.append((to, msg))
+
+    topo = tmp_path / "topo.json"
+    topo.write_text(json.dumps({"type": "topo", "config": {
+        "N1": {"N2": 1, "N3": 1}, "N2": {"N1": 1}, "N3": {"N1": 1}}}))
+    node = RouterNode("N1", Recorder(), str(topo), proto="dvr")
+    for nbr in ("N2", "N3"):
+        node.alg.on_hello(nbr, 1.0)
+        node.alg.on_info(nbr, {"vector": {nbr: 0.0}, "full": True})
+        node._active_neighbors.add(nbr)
+    node.alg.recompute()
+    node.info_timer.max_s = 0.02
+
+    # N2 perdió el delta que le avisaba de N3; el refresco le manda el vector completo
+    receiver = DistanceVector()
+    receiver.on_init("N2", {"N1": 1.0})
+
+    async def scenario():
+        task = asyncio.create_task(node._send_info())
+        await asyncio.sleep(0.07)
+        task.cancel()
+        await asyncio.gather(task, return_exceptions=True)
+
+    asyncio.run(scenario())
+    full = [m for to, m in node.transport.sent if to == "N2" and m["type"] == "info" and m["full"]]
+    assert len(full) >= 2
+    receiver.on_info("N1", {"vector": full[-1]["vector"], "full": True})
+    receiver.recompute()
+    assert receiver.next_hop("N3") == "N1"
+
+    # Los INFO de DV viajan por el carril de control (no se descartan como datos)
+    q = IngressQueue(maxsize=4, high=2, low=1)
+    q.put_nowait({"type": "message"}); q.put_nowait({"type": "message"})
+    assert q.put_nowait(full[-1]) and q.get_nowait()["type"] == "info"
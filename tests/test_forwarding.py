@@ -0,0 +1,94 @@
+# Tests para el reenvío unicast por la FIB (Forwarder + RouterNode)
+import asyncio, json
+
+from routerlab.core.node import RouterNode
+
+class Bus:
+    def __init__(self):
+        self.inbox = {}
+        self.sent = []
+
+class MemTransport:
+    def __init__(self, bus, node):
+        self.bus, self.node = bus, node
+        bus.inbox[node] = asyncio.Queue()
+
+    def me(self):
+        return self.node
+
+    async def run(self):
+        while True:
+            yield await self.bus.inbox[self.node].get()
+
+    async def send(self, to, msg):
+        self.bus.sent.append((self.node, to, msg))
+        if to in self.bus.inbox:
+            self.bus.inbox[to].put_nowait(json.loads(json.dumps(msg)))
+
+def line_topo(tmp_path):
+    topo = tmp_path / "topo.json"
+    topo.write_text(json.dumps({"type": "topo", "config": {
+        "N1": {"N2": 1}, "N2": {"N1": 1, "N3": 1}, "N3": {"N2": 1}}}))
+    return str(topo)
+
+async def converge(nodes, dest, timeout=3.0):
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + timeout
+    while loop.time() < deadline:
+        if all(n.id == dest or n.alg.next_hop(dest) for n in nodes):
+            return True
+        await asyncio.sleep(0.02)
+    return False
+
+def test_unicast_data_follows_fib_through_nodes(tmp_path, monkeypatch):
+    monkeypatch.setenv("ROUTE_DUMP_INTERVAL", "0")
+    topo = line_topo(tmp_path)
+
+    async def scenario():
+        bus = Bus()
+        nodes = [RouterNode(n, MemTransport(bus, n), topo, proto="lsr") for n in ("N1", "N2", "N3")]
+        tasks = [asyncio.create_task(n.run()) for n in nodes]
+        try:
+            assert await converge(nodes, "N3")
+            bus.inbox["N1"].put_nowait({
+                "proto": "lsr", "type": "message", "id": "m-1", "from": "N1", "origin": "N1",
+                "to": "N3", "ttl": 8, "headers": [], "payload": "hola N3",
+            })
+            for _ in range(100):
+                if nodes[2].forwarder.stats["delivered"]:
+                    break
+                await asyncio.sleep(0.01)
+            data = [(src, to, m) for src, to, m in bus.sent if m.get("payload") == "hola N3"]
+            return nodes, data
+        finally:
+            for t in tasks:
+                t.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+
+    nodes, data = asyncio.run(scenario())
+    a, b, c = nodes
+    # Un solo camino N1 -> N2 -> N3, con el TTL decrementado en cada salto
+    assert [(src, to, m["ttl"]) for src, to, m in data] == [("N1", "N2", 7), ("N2", "N3", 6)]
+    assert a.forwarder.stats["forwarded"] == 1 and b.forwarder.stats["forwarded"] == 1
+    assert c.forwarder.stats["delivered"] == 1
+    assert a.forwarder.stats["cache_misses"] == 1
+    # Los datos no se confunden con anuncios de enlace (no aparece un enlace N1 - N3)
+    assert all("N3" not in n.alg.lsdb_snapshot().get("N1", {}) for n in nodes)
+
+def test_unicast_without_route_is_dropped(tmp_path, monkeypatch):
+    monkeypatch.setenv("ROUTE_DUMP_INTERVAL", "0")
+    topo = line_topo(tmp_path)
+
+    async def scenario():
+        bus = Bus()
+        node = RouterNode("N1", MemTransport(bus, "N1"), topo, proto="lsr")
+        await node._dispatch({"type": "message", "id": "m-2", "from": "N2", "origin": "N2",
+                              "to": "N3", "ttl": 8, "payload": "x"})
+        await node._dispatch({"type": "message", "id": "m-3", "from": "N2", "origin": "N2",
+                              "to": "N3", "ttl": 1, "payload": "x"})
+        return node, bus
+
+    node, bus = asyncio.run(scenario())
+    assert node.forwarder.stats["no_route"] == 1
+    assert node.forwarder.stats["ttl_expired"] == 1
+    assert bus.sent == [] and node.route_queue.empty()
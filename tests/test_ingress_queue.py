@@ -0,0 +1,91 @@
+# Tests para IngressQueue (backpressure en colas de ingreso)
+import asyncio
+import pytest
+
+from routerlab.core.queues import IngressQueue
+
+def hello(n):
+    return {"type": "hello", "from": f"N{n}"}
+
+def data(n):
+    return {"type": "message", "from": f"N{n}", "to": "N0", "hops": 1.0}
+
+def test_control_is_served_before_data():
+    q = IngressQueue(maxsize=10)
+    q.put_nowait(data(1))
+    q.put_nowait(data(2))
+    q.put_nowait(hello(3))
+    assert q.get_nowait()["type"] == "hello"
+    assert q.get_nowait()["from"] == "N1"
+
+def test_data_shed_between_watermarks_and_recovers():
+    q = IngressQueue(maxsize=10, high=4, low=2)
+    for i in range(4):
+        assert q.put_nowait(data(i))
+    # Al alcanzar high entra en sobrecarga: los datos se descartan
+    assert q.put_nowait(data(99)) is False
+    assert q.shedding
+    # El control sigue entrando
+    assert q.put_nowait(hello(1))
+
+    # Drenar hasta low -> sale de sobrecarga (histéresis)
+    q.get_nowait(); q.get_nowait(); q.get_nowait()
+    assert not q.shedding
+    assert q.put_nowait(data(5))
+
+    st = q.stats()
+    assert st["shed_data"] == 1
+    assert st["overload_episodes"] == 1
+
+def test_probes_pass_an_overloaded_queue():
+    q = IngressQueue(maxsize=20, high=8, low=4)
+    for i in range(12):
+        q.put_nowait(data(i))
+    assert q.shedding
+    # Los probes de liveness son control: entran aunque se estén descartando datos
+    for i in range(3):
+        assert q.put_nowait({"type": "probe", "from": f"N{i}", "interval": 0.2})
+    assert [q.get_nowait()["type"] for _ in range(3)] == ["probe"] * 3
+    assert q.stats()["shed_control"] == 0
+
+def test_dual_query_and_reply_pass_an_overloaded_queue():
+    q = IngressQueue(maxsize=20, high=8, low=4)
+    for i in range(12):
+        q.put_nowait(data(i))
+    # Un dv_reply descartado deja al emisor del query atascado en ACTIVO
+    for kind in ("dv_query", "dv_reply"):
+        assert q.put_nowait({"type": kind, "from": "N1", "vector": {"N5": None}})
+    assert [q.get_nowait()["type"] for _ in range(2)] == ["dv_query", "dv_reply"]
+
+def test_echo_is_not_delayed_behind_data():
+    q = IngressQueue(maxsize=10)
+    for i in range(5):
+        q.put_nowait(data(i))
+    q.put_nowait({"type": "echo", "from": "N1", "ts": 1.0})
+    q.put_nowait({"type": "echo_reply", "from": "N2", "ts": 1.0})
+    # El RTT medido no debe incluir la espera detrás de los datos encolados
+    assert [q.get_nowait()["type"] for _ in range(2)] == ["echo", "echo_reply"]
+
+def test_full_queue_evicts_oldest_data_for_control():
+    q = IngressQueue(maxsize=3, high=3, low=1)
+    q.put_nowait(data(1)); q.put_nowait(data(2)); q.put_nowait(data(3))
+    assert q.put_nowait(hello(1))
+    assert q.qsize() == 3
+    items = [q.get_nowait() for _ in range(3)]
+    assert items[0]["type"] == "hello"
+    assert [m["from"] for m in items[1:]] == ["N2", "N3"]
+    assert q.stats()["shed_data"] == 1
+
+def test_invalid_watermarks_rejected():
+    with pytest.raises(ValueError):
+        IngressQueue(maxsize=10, high=5, low=5)
+
+def test_async_get_waits_for_put():
+    async def scenario():
+        q = IngressQueue(maxsize=4)
+        getter = asyncio.create_task(q.get())
+        await asyncio.sleep(0)
+        await q.put(hello(7))
+        return await asyncio.wait_for(getter, 1.0)
+
+    assert asyncio.run(scenario())["from"] == "N7"
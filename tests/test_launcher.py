@@ -0,0 +1,157 @@
+import asyncio
+import json
+from pathlib import Path
+
+import pytest
+
+from routerlab.core.topology import load_topology
+from routerlab.launcher import build_nodes
+
+CONFIGS = Path(__file__).resolve().parents[1] / "configs"
+TOPO = str(CONFIGS / "topo-11.txt")
+
+
+def _socket_names(tmp_path):
+    names = {f"N{i}": f"127.0.0.1:{9200 + i}" for i in range(1, 12)}
+    path = tmp_path / "names-socket-11.txt"
+    path.write_text(json.dumps({"type": "names", "config": names}), encoding="utf-8")
+    return str(path)
+
+
+def test_launcher_builds_all_nodes_with_shared_topology(tmp_path):
+    nodes = build_nodes("lsr", "socket", TOPO, _socket_names(tmp_path))
+    assert sorted(n.id for n in nodes) == sorted(f"N{i}" for i in range(1, 12))
+    assert {n.transport.me() for n in nodes} == {n.id for n in nodes}
+    # El JSON se parsea una vez por proceso
+    assert load_topology(TOPO) is load_topology(TOPO)
+
+
+def test_launcher_subset_and_unknown_nodes(tmp_path):
+    names = _socket_names(tmp_path)
+    nodes = build_nodes("dvr", "socket", TOPO, names, ["N1", "N7"])
+    assert [n.id for n in nodes] == ["N1", "N7"]
+    with pytest.raises(ValueError):
+        build_nodes("dvr", "socket", TOPO, names, ["N1", "Z9"])
+
+
+def test_redis_hub_routes_by_channel_into_ingress_queues():
+    pytest.importorskip("redis")
+    from routerlab.net.redis_driver import RedisDriver, RedisHub
+
+    names = str(CONFIGS / "names-redis-11.txt")
+    hub = RedisHub()
+    n1 = RedisDriver("N1", names, hub=hub)
+    n7 = RedisDriver("N7", names, hub=hub)
+    assert n1._r is n7._r is hub.redis
+    assert hub.stats["channels"] == 2
+
+    hello = {"type": "hello", "from": "N7", "to": "N1", "hops": 4.0}
+    for deliver in hub._subs["sec30.grupo1.nodo1"]:
+        deliver("sec30.grupo1.nodo1", json.dumps(hello).encode("utf-8"))
+    assert n1.ingress_stats()["enqueued_control"] == 1
+    assert n7.ingress_stats()["depth"] == 0
+    assert n1._queue.get_nowait()["from"] == "N7"
+
+
+def test_redis_multicast_watches_neighbors_and_filters_by_rcpt():
+    pytest.importorskip("redis")
+    from routerlab.net.redis_driver import RedisDriver, RedisHub
+
+    names = str(CONFIGS / "names-redis-11.txt")
+    hub = RedisHub()
+    n1 = RedisDriver("N1", names, hub=hub, multicast=True)
+    n1.watch_neighbors(["N7", "N11"])
+    assert "sec30.grupo7.nodo7.out" in hub._subs
+
+    link = {"type": "message", "from": "N7", "to": "N5", "hops": 11.0}
+    n1._deliver("sec30.grupo7.nodo7.out", json.dumps({**link, "rcpt": ["N1", "N5"]}))
+    n1._deliver("sec30.grupo7.nodo7.out", json.dumps({**link, "rcpt": ["N5"]}))
+    got = n1._queue.get_nowait()
+    assert "rcpt" not in got and got["to"] == "N5"
+    assert n1.ingress_stats()["depth"] == 0
+    assert n1.publish_stats()["filtered"] == 1
+
+    # Sin multicast no se escuchan canales de salida
+    n2 = RedisDriver("N2", names, hub=hub, multicast=False)
+    n2.watch_neighbors(["N3"])
+    assert "sec30.grupo3.nodo3.out" not in hub._subs
+
+
+class _FakePubSub:
+    """PubSub de prueba: entrega 'messages' y después falla (o se queda esperando)."""
+
+    def __init__(self, messages=(), error=None):
+        self.messages, self.error = list(messages), error
+        self.channels = []
+
+    async def subscribe(self, *channels):
+        self.channels.extend(channels)
+
+    async def listen(self):
+        for m in self.messages:
+            yield m
+        if self.error is not None:
+            raise self.error
+        await asyncio.Event().wait()
+
+    async def aclose(self):
+        pass
+
+
+class _FakeRedis:
+    def __init__(self, pubsubs):
+        self.pubsubs = list(pubsubs)
+
+    def pubsub(self):
+        return self.pubsubs.pop(0)
+
+
+def test_redis_hub_reconnects_after_pubsub_error(capsys):
+    pytest.importorskip("redis")
+    from routerlab.net.redis_driver import RedisDriver, RedisHub
+
+    names = str(CONFIGS / "names-redis-11.txt")
+    hello = {"type": "message", "channel": b"sec30.grupo1.nodo1",
+             "data": json.dumps({"type": "hello", "from": "N7", "to": "N1", "hops": 4.0})}
+
+    async def scenario():
+        hub = RedisHub(retries=2)
+        hub.RETRY_BASE_S = 0.001
+        hub.redis = _FakeRedis([_FakePubSub(error=ConnectionError("reset by peer")),
+                                _FakePubSub([hello])])
+        n1 = RedisDriver("N1", names, hub=hub)
+        gen = n1.run()
+        try:
+            return hub, await asyncio.wait_for(gen.__anext__(), 1.0)
+        finally:
+            await gen.aclose()
+            hub._task.cancel()
+
+    hub, got = asyncio.run(scenario())
+    assert got["from"] == "N7"
+    assert hub.stats["errors"] == 1 and hub.stats["reconnects"] == 1
+    assert hub.error is None
+    assert "[REDIS-HUB] error leyendo el PubSub" in capsys.readouterr().out
+
+
+def test_redis_hub_failure_reaches_every_node(tmp_path, capsys):
+    pytest.importorskip("redis")
+    from routerlab.launcher import _run_node
+    from routerlab.net.redis_driver import RedisDriver, RedisHub
+    from routerlab.core.node import RouterNode
+
+    names = str(CONFIGS / "names-redis-11.txt")
+
+    async def scenario():
+        hub = RedisHub(retries=0)
+        hub.redis = _FakeRedis([_FakePubSub(error=ConnectionError("reset by peer"))])
+        nodes = [RouterNode(n, RedisDriver(n, names, hub=hub), TOPO, proto="lsr") for n in ("N1", "N7")]
+        await asyncio.wait_for(asyncio.gather(*(_run_node(n) for n in nodes)), 2.0)
+        return hub
+
+    hub = asyncio.run(scenario())
+    assert isinstance(hub.error, ConnectionError)
+    out = capsys.readouterr().out
+    assert "[REDIS-HUB] PubSub caído tras 1 intentos" in out
+    assert "[LAUNCHER] nodo N1 terminó con error" in out
+    assert "[LAUNCHER] nodo N7 terminó con error" in out
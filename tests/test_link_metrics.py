@@ -0,0 +1,42 @@
+import pytest
+
+from routerlab.core.link_metrics import LinkMetrics
+from routerlab.core.messages import make_echo
+
+
+def test_static_metric_until_first_sample():
+    m = LinkMetrics(base={"B": 7.0}, quantum_ms=5)
+    assert m.metric("B") == 7.0
+    assert m.metric("C", 3.0) == 3.0
+    assert m.on_rtt("B", 0.020) == 4.0      # 20 ms / 5 ms
+    assert m.metric("B") == 4.0
+
+
+def test_ewma_smooths_single_spike():
+    m = LinkMetrics(alpha=0.25, quantum_ms=5, hysteresis=0.2)
+    m.on_rtt("B", 0.010)
+    # Un pico aislado de 20 ms mueve el srtt a 12.5 ms: dentro de la banda, sin cambio
+    assert m.on_rtt("B", 0.020) is None
+    assert m.srtt["B"] == pytest.approx(0.0125)
+    assert m.metric("B") == 2.0
+
+
+def test_hysteresis_prevents_flapping_at_quantum_border():
+    m = LinkMetrics(alpha=1.0, quantum_ms=5, hysteresis=0.2)
+    assert m.on_rtt("B", 0.010) == 2.0
+    changes = [m.on_rtt("B", rtt) for rtt in (0.0126, 0.0124, 0.0127, 0.0123)]
+    assert changes == [None, None, None, None]   # ~2.5 cuantos: sin oscilar
+    assert m.stats()["suppressed"] >= 1
+    # Un cambio real (carga) sí se propaga
+    assert m.on_rtt("B", 0.040) == 8.0
+
+
+def test_forget_and_echo_wire():
+    m = LinkMetrics(base={"B": 3.0}, alpha=1.0)
+    m.on_rtt("B", 0.050)
+    m.forget("B")
+    assert m.metric("B") == 3.0
+
+    wire = make_echo("N1", "N2", 12.5)
+    assert wire["type"] == "echo" and wire["ts"] == 12.5
+    assert make_echo("N2", "N1", 12.5, reply=True)["type"] == "echo_reply"
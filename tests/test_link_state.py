@@ -63,3 +63,230 @@ def test_unreachable_node():
     ls.on_init("A", ["B"])
     # No sabe nada de C aún
     assert ls.next_hop("C") is None
+
+def test_spf_scheduler_offloads_and_coalesces():
+    import asyncio
+    from routerlab.core.routing import SpfScheduler
+
+    ls = LinkState()
+    ls.on_init("A", {"B": 1.0})
+    sched = SpfScheduler(ls, mode="thread")
+    ls.recompute_hook = sched.request
+
+    async def scenario():
+        ls.on_hello("B", 1.0)
+        ls.on_message("B", "C", 1.0)
+        ls.on_message("C", "D", 1.0)
+        # Hay a lo sumo un cálculo en vuelo; los pedidos siguientes se coalescen
+        await sched._inflight
+
+    try:
+        asyncio.run(scenario())
+    finally:
+        sched.close()
+    assert sched.stats["coalesced"] >= 1
+    assert sched.stats["computed"] < sched.stats["requested"]
+    assert ls.next_hop("D") == "B"
+
+def test_spf_scheduler_logs_failed_spf(capsys):
+    import asyncio
+    from routerlab.core.routing import SpfScheduler
+
+    ls = LinkState(lfa=False)
+    ls.on_init("A", {"B": 1.0})
+
+    def broken_spf(arcs, me):
+        raise RuntimeError("boom")
+
+    ls.spf_fn = broken_spf
+    sched = SpfScheduler(ls, mode="thread")
+
+    async def scenario():
+        sched.request()
+        task = sched._inflight
+        await asyncio.gather(task, return_exceptions=True)
+        await asyncio.sleep(0)   # deja correr el done-callback
+
+    try:
+        asyncio.run(scenario())
+    finally:
+        sched.close()
+    assert sched.stats["failed"] == 1
+    assert "SPF falló" in capsys.readouterr().out
+
+def test_lsdb_version_and_memoized_views():
+    from routerlab.algorithms.link_state import LinkStateDB
+
+    db = LinkStateDB("A")
+    db.set_link("A", "B", 1.0)
+    db.set_link("B", "A", 1.0)
+    db.set_link("B", "C", 2.0)
+    v = db.version
+    snap = db.snapshot()
+    g = db.graph()
+    # Sin cambios: mismas instancias memoizadas y misma versión
+    assert db.set_link("B", "C", 2.0) is False
+    assert db.version == v
+    assert db.snapshot() is snap and db.graph() is g
+
+    db.set_link("C", "B", 2.0)
+    assert db.version == v + 1
+    assert db.snapshot() is not snap
+
+def test_lsdb_graph_has_no_duplicate_edges():
+    from routerlab.algorithms.link_state import LinkStateDB
+
+    db = LinkStateDB("A")
+    db.set_link("A", "B", 1.0)
+    db.set_link("B", "A", 1.0)
+    db.observe("A", "B", 3.0)
+    db.set_link("B", "C", 4.0)
+    db.set_link("C", "B", 2.0)
+    g = db.graph()
+    assert g.neighbors("A") == [("B", 1.0)]
+    assert sorted(g.neighbors("B")) == [("A", 1.0), ("C", 2.0)]
+    assert db.edges() == {("A", "B"): 1.0, ("B", "C"): 2.0}
+
+def test_digest_sync_requests_only_missing_or_stale_rows():
+    a = LinkState(); a.on_init("A", {"B": 1.0})
+    b = LinkState(); b.on_init("B", {"A": 1.0, "C": 1.0})
+    b.on_hello("C", 1.0)
+    b.on_message("C", "B", 1.0)
+    b.on_message("C", "D", 1.0)
+    a.on_hello("B", 1.0)
+
+    # A conoce solo su fila; B conoce su fila y la de C
+    wants = a.ls_request_for(b.database_summary())
+    assert sorted(wants) == ["B", "C"]
+    assert a.on_ls_update(b.ls_update_for(wants))
+    assert a.next_hop("D") == "B"
+
+    # Ya sincronizados: nada que pedir
+    assert a.ls_request_for(b.database_summary()) == []
+
+    # B cambia su fila -> su secuencia sube y A la pide de nuevo
+    b.on_hello("E", 2.0)
+    assert a.ls_request_for(b.database_summary()) == ["B"]
+
+def test_digest_sync_equal_seq_conflict_converges():
+    a = LinkState(); a.on_init("A", {"B": 1.0})
+    b = LinkState(); b.on_init("B", {"A": 1.0})
+    # Dos copias distintas de la fila de C con la misma secuencia
+    a.lsdb.install_row("C", 5, {"B": 1.0, "E": 4.0})
+    b.lsdb.install_row("C", 5, {"B": 1.0, "D": 2.0, "E": 3.0})
+
+    # Con igual seq y checksum distinto piden los dos lados, y cada uno une las copias
+    wants_a = a.ls_request_for(b.database_summary())
+    wants_b = b.ls_request_for(a.database_summary())
+    assert wants_a == wants_b == ["C"]
+    a.on_ls_update(b.ls_update_for(wants_a))
+    b.on_ls_update(a.ls_update_for(wants_b))
+    assert dict(a.lsdb["C"]) == dict(b.lsdb["C"]) == {"B": 1.0, "D": 2.0, "E": 3.0}
+
+    # Convergidos: nadie vuelve a pedir la fila
+    assert a.ls_request_for(b.database_summary()) == []
+    assert b.ls_request_for(a.database_summary()) == []
+
+def test_equal_seq_copy_does_not_drop_a_flooded_link():
+    a = LinkState(); a.on_init("A", {"B": 1.0})
+    a.lsdb.install_row("C", 5, {"B": 1.0})
+    # El flooding agrega C -> F sin subir la seq de C
+    a.on_message("C", "F", 1.0)
+    assert a.lsdb.seq("C") == 5 and "F" in a.lsdb["C"]
+    # Una copia vieja con la misma seq (y cualquier checksum) no lo pisa
+    assert not a.lsdb.install_row("C", 5, {"B": 1.0})
+    assert dict(a.lsdb["C"]) == {"B": 1.0, "F": 1.0}
+
+def test_own_row_sequence_jumps_past_stale_copy():
+    a = LinkState(); a.on_init("A", {"B": 1.0})
+    a.on_hello("B", 1.0)
+    assert a.lsdb.seq("A") == 1
+    # Un vecino guarda una copia de mi fila con seq más alta (previa a un reinicio)
+    assert a.ls_request_for([["A", 7, 0]]) == ["A"]
+    a.on_ls_update({"A": {"seq": 7, "links": {"Z": 1.0}}})
+    assert a.lsdb.seq("A") == 8
+    assert dict(a.lsdb["A"]) == {"B": 1.0}
+
+
+# ---------- Cache de SPF ----------
+
+def test_spf_cache_reuses_identical_lsdb_state(tmp_path):
+    from routerlab.algorithms.link_state import LinkState
+    from routerlab.core.spf_cache import SpfCache
+
+    cache = SpfCache(maxsize=4, cache_dir=str(tmp_path))
+    rows = {"B": {"A": 1.0, "C": 1.0}, "C": {"B": 1.0}}
+
+    def build():
+        ls = LinkState(lfa=False, spf_cache=cache)
+        ls.on_init("A", {"B": 1.0})
+        ls.mark_neighbor_active("B", 1.0)
+        for origin, links in rows.items():
+            ls.lsdb.install_row(origin, 1, links)
+        ls.recompute()
+        return ls
+
+    first, second = build(), build()
+    assert second.next_hop("C") == first.next_hop("C") == "B"
+    stats = cache.stats()
+    assert stats["hits"] >= 1 and stats["hit_rate"] > 0
+
+    # Un cambio en la LSDB cambia la clave: se recalcula
+    misses = stats["misses"]
+    second.lsdb.install_row("C", 2, {"B": 1.0, "D": 1.0})
+    second.recompute()
+    assert second.next_hop("D") == "B"
+    assert cache.stats()["misses"] == misses + 1
+
+    # Persistencia: otro cache sobre el mismo directorio encuentra el resultado en disco
+    fresh = SpfCache(maxsize=4, cache_dir=str(tmp_path))
+    third = LinkState(lfa=False, spf_cache=fresh)
+    third.on_init("A", {"B": 1.0})
+    third.mark_neighbor_active("B", 1.0)
+    for origin, links in rows.items():
+        third.lsdb.install_row(origin, 1, links)
+    third.recompute()
+    assert fresh.stats()["disk_hits"] == 1 and third.next_hop("C") == "B"
+
+
+def test_spf_cache_lru_eviction():
+    from routerlab.core.spf_cache import SpfCache
+
+    calls = []
+
+    def fn(arcs, source):
+        calls.append(source)
+        return source
+
+    cache = SpfCache(maxsize=2)
+    arcs = (("A", "B", 1.0),)
+    for src in ("A", "B", "A", "C", "B"):
+        cache.compute(arcs, src, fn)
+    # A y B entran; A es hit; C desaloja a B (el menos usado); B se recalcula
+    assert calls == ["A", "B", "C", "B"]
+    assert cache.stats()["evictions"] == 2
+
+def test_node_enables_lfa_only_with_spf_off_loop(tmp_path, monkeypatch):
+    import json
+    from routerlab.algorithms.dijkstra import spf_routes, spf_routes_lfa
+    from routerlab.core.node import RouterNode
+
+    class Quiet:
+        async def send(self, to, msg):
+            pass
+
+    topo = tmp_path / "topo.json"
+    topo.write_text(json.dumps({"type": "topo", "config": {"N1": {"N2": 1}, "N2": {"N1": 1}}}))
+    monkeypatch.delenv("LFA", raising=False)
+    fns = {}
+    for mode in ("inline", "thread"):
+        monkeypatch.setenv("SPF_MODE", mode)
+        node = RouterNode("N1", Quiet(), str(topo), proto="lsr")
+        fns[mode] = node.alg.spf_fn
+        if node._spf is not None:
+            node._spf.close()
+    assert fns == {"inline": spf_routes, "thread": spf_routes_lfa}
+
+    monkeypatch.setenv("SPF_MODE", "inline")
+    monkeypatch.setenv("LFA", "1")
+    assert RouterNode("N1", Quiet(), str(topo), proto="lsr").alg.spf_fn is spf_routes_lfa
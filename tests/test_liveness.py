@@ -0,0 +1,63 @@
+import asyncio
+
+from routerlab.core.liveness import LivenessMonitor
+from routerlab.algorithms.link_state import LinkState
+
+
+def test_liveness_detects_silent_neighbor():
+    async def scenario():
+        sent, downs = [], []
+
+        async def send(nbr, interval):
+            sent.append(nbr)
+
+        mon = LivenessMonitor(send=send, on_down=downs.append, tx_interval=0.02, mult=3)
+        mon.start("B")
+        tx = asyncio.create_task(mon.run())
+        mon.on_probe("B", 0.02)
+        assert mon.stats()["B"]["up"] is True
+        await asyncio.sleep(0.15)   # sin más probes: vence 3 × 20 ms
+        tx.cancel()
+        return sent, downs, mon
+
+    sent, downs, mon = asyncio.run(scenario())
+    assert sent and set(sent) == {"B"}
+    assert downs == ["B"]  # una sola notificación por caída
+    assert mon.stats()["B"]["up"] is False
+
+
+def test_liveness_ignores_neighbor_that_never_probed():
+    async def scenario():
+        downs = []
+
+        async def send(nbr, interval):
+            pass
+
+        mon = LivenessMonitor(send=send, on_down=downs.append, tx_interval=0.01, mult=2)
+        mon.start("C")
+        mon.on_probe("X", 0.01)  # sin sesión: se ignora
+        await asyncio.sleep(0.05)
+        return downs, mon
+
+    downs, mon = asyncio.run(scenario())
+    assert downs == []
+    assert "X" not in mon.sessions
+    assert mon.detection_time("C") == 0.02
+
+
+def test_held_link_not_relearned_until_hello():
+    ls = LinkState()
+    ls.on_init("A", {"B": 1.0, "C": 1.0})
+    ls.on_hello("B", 1.0)
+    ls.on_hello("C", 1.0)
+
+    ls.purge_node_everywhere("B")
+    ls.hold_down_link("B", 30.0)
+    # Un LSP viejo que aún trae A-B no debe reinstalar el enlace
+    ls.on_message("C", "B", 1.0)
+    ls.on_message("B", "A", 1.0)
+    assert "B" not in ls.lsdb.get("A", {})
+    assert ls.lsdb["C"].get("B") == 1.0
+
+    ls.on_hello("B", 1.0)
+    assert ls.lsdb["A"].get("B") == 1.0
@@ -0,0 +1,67 @@
+import time
+
+from routerlab.algorithms.link_state import LinkState
+from routerlab.core.persistence import StateStore
+
+
+def _converged():
+    ls = LinkState(lfa=False)
+    ls.on_init("A", {"B": 1.0, "C": 5.0})
+    ls.mark_neighbor_active("B", 1.0)
+    ls.mark_neighbor_active("C", 5.0)
+    ls.lsdb.install_row("B", 3, {"A": 1.0, "C": 1.0})
+    ls.lsdb.install_row("C", 7, {"A": 5.0, "B": 1.0, "D": 1.0})
+    ls.recompute()
+    return ls
+
+
+def test_store_roundtrip_is_atomic_and_validated(tmp_path):
+    store = StateStore(str(tmp_path / "A.json"), "A")
+    assert store.load() is None
+    assert store.save({"rows": {}, "seq": 4, "fib": {}})
+    assert not (tmp_path / "A.json.tmp").exists()
+    assert store.load()["seq"] == 4
+
+    # Snapshot de otro nodo o corrupto: se ignora
+    assert StateStore(str(tmp_path / "A.json"), "B").load() is None
+    (tmp_path / "A.json").write_text('{"version": 1, "no', encoding="utf-8")
+    assert store.load() is None
+
+
+def test_warm_restore_routes_immediately_and_bumps_own_seq(tmp_path):
+    old = _converged()
+    store = StateStore(str(tmp_path / "A.json"), "A")
+    store.save(old.warm_state())
+
+    new = LinkState(lfa=False)
+    new.on_init("A", {"B": 1.0, "C": 5.0})
+    new.restore_warm(store.load(), grace=30)
+    # Sin HELLO ni LSP todavía ya hay rutas (la FIB guardada)
+    assert new.next_hop("D") == old.next_hop("D") == "B"
+    assert new.lsdb.seq("A") > old.lsdb.seq("A")
+    assert new.stale_state()["rows"] == ["B", "C"]
+    assert new.stale_state()["links"] == ["B", "C"]
+
+    # HELLO confirma el enlace propio; un LSP igual o más nuevo confirma la fila
+    new.on_hello("B", 1.0)
+    new.on_ls_update({"C": {"seq": 7, "links": {"A": 5.0, "B": 1.0, "D": 1.0}}})
+    stale = new.stale_state()
+    assert stale["rows"] == ["B"] and stale["links"] == ["C"]
+    assert 0 < stale["expires_in"] <= 30
+
+
+def test_unconfirmed_state_ages_out_after_grace():
+    old = _converged()
+    new = LinkState(lfa=False)
+    new.on_init("A", {"B": 1.0, "C": 5.0})
+    new.restore_warm(old.warm_state(), grace=0.0)
+    new.on_hello("B", 1.0)
+    new.on_ls_update({"B": {"seq": 3, "links": {"A": 1.0, "C": 1.0}}})
+    time.sleep(0.01)
+
+    assert new.expire_stale() is True
+    # Se fueron la fila de C y el enlace A-C; D ya no es alcanzable
+    assert "C" not in new.lsdb and "C" not in new.lsdb["A"]
+    assert new.next_hop("D") is None
+    assert new.next_hop("C") == "B"
+    assert new.expire_stale() is False
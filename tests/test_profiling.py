@@ -0,0 +1,147 @@
+import asyncio
+import time
+
+from routerlab.core.profiling import SamplingProfiler, StageTimers, TimedTransport
+
+
+def test_stage_timers_accumulate_and_quantiles():
+    timers = StageTimers()
+    for _ in range(9):
+        timers.observe("spf", 0.001)
+    timers.observe("spf", 0.05)
+    with timers.stage("decode"):
+        pass
+
+    st = timers.stats()
+    assert st["spf"]["count"] == 10
+    assert st["spf"]["max_ms"] == 50.0
+    # Cotas de bucket log2 en µs: 1 ms cae en (512, 1024] µs
+    assert st["spf"]["p50_ms"] == 1.024
+    assert st["spf"]["p99_ms"] == 50.0   # el bucket (32, 65] ms se acota al máximo
+    assert st["decode"]["count"] == 1
+
+
+def test_disabled_timers_record_nothing():
+    timers = StageTimers(enabled=False)
+    with timers.stage("spf"):
+        pass
+    timers.observe("send", 1.0)
+    assert timers.stats() == {}
+
+
+def test_timed_transport_measures_send_and_delegates():
+    class Inner:
+        def __init__(self):
+            self.sent = []
+
+        def me(self):
+            return "A"
+
+        async def send(self, to, message):
+            self.sent.append(to)
+
+    timers = StageTimers()
+    tr = TimedTransport(Inner(), timers)
+    asyncio.run(tr.send("B", {"type": "hello"}))
+    assert tr.me() == "A" and tr.sent == ["B"]
+    assert timers.stats()["send"]["count"] == 1
+
+
+def _busy_spin(seconds):
+    end = time.perf_counter() + seconds
+    while time.perf_counter() < end:
+        pass
+
+
+def test_sampling_profiler_writes_folded_stacks(tmp_path):
+    prof = SamplingProfiler(hz=500, out_dir=str(tmp_path), label="N1")
+    prof.toggle()
+    assert prof.running
+    _busy_spin(0.2)
+    path = prof.toggle()
+    assert not prof.running
+    lines = path.read_text(encoding="utf-8").splitlines()
+    assert path.name.startswith("N1-") and path.suffix == ".folded"
+    stack, count = lines[0].rsplit(" ", 1)
+    assert int(count) > 0
+    assert "_busy_spin (test_profiling.py:" in stack
+
+def test_shared_profiler_needs_profile_and_installs_signal_once(monkeypatch):
+    from routerlab.core import profiling
+
+    monkeypatch.setattr(profiling, "_shared", None)
+    monkeypatch.delenv("PROFILE", raising=False)
+    assert profiling.shared_profiler("N1") is None
+
+    monkeypatch.setenv("PROFILE", "1")
+    first = profiling.shared_profiler("N1")
+    assert profiling.shared_profiler("N2") is first
+    assert first.label.startswith("routerlab-")
+
+    async def scenario():
+        loop = asyncio.get_running_loop()
+        other = profiling.SamplingProfiler(label="otro")
+        try:
+            return (profiling.install_toggle(loop, first),
+                    profiling.install_toggle(loop, first),
+                    profiling.install_toggle(loop, other))
+        finally:
+            loop.remove_signal_handler(profiling.signal.SIGUSR1)
+
+    assert asyncio.run(scenario()) == (True, True, False)
+
+
+def test_node_times_decode_dispatch_and_algorithm_triggered_spf(tmp_path, monkeypatch):
+    import json
+    from routerlab.core.node import RouterNode
+
+    class OneFrame:
+        def me(self):
+            return "N1"
+
+        async def run(self):
+            yield json.dumps({"type": "hello", "from": "grupo.N2", "hops": 1.0})
+            yield "no es json"
+
+        async def send(self, to, msg):
+            pass
+
+    topo = tmp_path / "topo.json"
+    topo.write_text(json.dumps({"type": "topo", "config": {"N1": {"N2": 1}, "N2": {"N1": 1}}}))
+    monkeypatch.setenv("PROFILE", "1")
+    monkeypatch.setenv("PROFILE_SIGNAL", "")
+    monkeypatch.setenv("SPF_MODE", "inline")
+    node = RouterNode("N1", OneFrame(), str(topo), proto="lsr")
+
+    # El SPF que dispara LinkState por su cuenta (sin pasar por node._recompute) se mide
+    node.alg.on_message("N2", "N3", 1.0)
+    assert node.timers.stats()["spf"]["count"] == 1
+
+    asyncio.run(node.run())
+    st = node.timers.stats()
+    assert st["decode"]["count"] == 2
+    # La basura se descarta en el decode: solo el HELLO llega al despacho
+    assert st["dispatch"]["count"] == 1
+
+
+def test_spf_scheduler_times_inline_and_executor_runs():
+    from routerlab.algorithms.link_state import LinkState
+    from routerlab.core.routing import SpfScheduler
+
+    alg = LinkState()
+    alg.on_init("N1", {"N2": 1.0})
+    timers = StageTimers()
+    sched = SpfScheduler(alg, "thread", timers=timers)
+    alg.recompute_hook = sched.request
+    try:
+        sched.request()                  # sin loop: en línea
+        assert timers.stats()["spf"]["count"] == 1
+
+        async def scenario():
+            alg.on_message("N2", "N3", 1.0)
+            await sched._inflight
+
+        asyncio.run(scenario())
+        assert timers.stats()["spf"]["count"] == 2
+    finally:
+        sched.close()
@@ -0,0 +1,202 @@
+# Tests para la FIB (core/tables.py)
+from routerlab.core.tables import Fib
+from routerlab.algorithms.link_state import LinkState
+
+def test_publish_swaps_whole_table_and_bumps_generation():
+    fib = Fib()
+    gen0 = fib.generation
+    table = {"B": "B", "C": "B"}
+    fib.publish(table)
+    assert fib.generation == gen0 + 1
+    assert fib.lookup("C") == "B"
+
+    # Mutar el dict del llamador no afecta la tabla publicada
+    table["C"] = "X"
+    assert fib.lookup("C") == "B"
+
+def test_snapshot_is_stable_across_publish():
+    fib = Fib()
+    fib.publish({"B": "B"})
+    gen, view = fib.snapshot()
+    fib.publish({"B": "C"})
+    assert view["B"] == "B"
+    assert fib.generation == gen + 1
+    assert fib.lookup("B") == "C"
+
+def test_withdraw_publishes_new_generation():
+    fib = Fib()
+    fib.publish({"B": "B", "C": "B"})
+    gen = fib.generation
+    assert fib.withdraw("C") is True
+    assert fib.withdraw("C") is False
+    assert fib.generation == gen + 1
+    assert fib.lookup("C") is None
+
+def test_link_state_purge_goes_through_fib():
+    ls = LinkState()
+    ls.on_init("A", {"B": 1.0})
+    ls.on_hello("B", 1.0)
+    ls.on_message("B", "C", 1.0)
+    assert ls.next_hop("C") == "B"
+    gen = ls.fib.generation
+    ls.purge_node_everywhere("C")
+    assert ls.next_hop("C") is None
+    assert ls.fib.generation > gen
+
+def test_publish_returns_diff_of_real_changes():
+    fib = Fib()
+    d1 = fib.publish({"A": None, "B": "B", "C": "B"}, {"A": 0.0, "B": 1.0, "C": 2.0})
+    assert set(d1.added) == {"B", "C"}        # A (nh=None) no es una ruta
+    # Misma tabla -> diff vacío
+    assert not fib.publish({"A": None, "B": "B", "C": "B"}, {"A": 0.0, "B": 1.0, "C": 2.0})
+
+    d3 = fib.publish({"B": "B", "C": "D", "D": "D"}, {"B": 1.0, "C": 2.0, "D": 1.0})
+    assert d3.changed == {"C": ("D", 2.0)}
+    assert d3.added == {"D": ("D", 1.0)}
+    assert d3.removed == ()
+
+    d4 = fib.publish({"B": "B"}, {"B": 3.0})
+    assert d4.changed == {"B": ("B", 3.0)}
+    assert d4.removed == ("C", "D")
+
+def test_subscribers_receive_only_changes():
+    import asyncio
+
+    async def scenario():
+        fib = Fib()
+        sub = fib.changes.subscribe()
+        fib.publish({"B": "B"})
+        fib.publish({"B": "B"})          # sin cambios: no se emite
+        fib.withdraw("B")
+        first = await asyncio.wait_for(sub.__anext__(), 1.0)
+        second = await asyncio.wait_for(sub.__anext__(), 1.0)
+        return first, second, sub._q.empty()
+
+    first, second, drained = asyncio.run(scenario())
+    assert first.added == {"B": ("B", None)}
+    assert second.removed == ("B",)
+    assert drained
+
+def test_slow_subscriber_overflow_flag():
+    fib = Fib()
+    sub = fib.changes.subscribe(maxsize=1)
+    fib.publish({"B": "B"})
+    fib.publish({"B": "C"})
+    assert sub.overflowed
+    assert sub.get_nowait().changed == {"B": ("C", None)}
+
+
+def test_fail_over_switches_to_backup_and_withdraws_rest():
+    fib = Fib()
+    fib.publish({"A": "A", "D": "A", "E": "A", "B": "B"},
+                {"A": 1.0, "D": 2.0, "E": 3.0, "B": 2.0},
+                backups={"D": ("B", 3.0), "B": ("A", 3.0)})
+    gen = fib.generation
+
+    diff = fib.fail_over("A")
+    assert fib.generation == gen + 1
+    assert fib.lookup("D") == "B"            # respaldo activado sin SPF
+    assert fib.lookup("E") is None           # sin LFA: se retira
+    assert fib.lookup("A") is None
+    assert fib.lookup("B") == "B"
+    assert fib.backup("B") is None           # su respaldo pasaba por A
+    assert diff.changed == {"D": ("B", 3.0)}
+    assert set(diff.removed) == {"A", "E"}
+
+
+def test_link_state_fail_over_before_recompute():
+    ls = LinkState()
+    ls.on_init("S", {"A": 1.0, "B": 2.0})
+    ls.on_hello("A", 1.0)
+    ls.on_hello("B", 2.0)
+    ls.on_message("A", "D", 1.0)
+    ls.on_message("B", "D", 1.0)
+    ls.recompute()
+    assert ls.next_hop("D") == "A"
+    assert ls.fib.backup("D") == "B"
+
+    assert ls.fail_over("A")
+    assert ls.next_hop("D") == "B"
+
+
+def test_flow_hash_spreads_flows_but_pins_each_flow():
+    from routerlab.core.tables import flow_hash
+    fib = Fib()
+    fib.publish({"D": "A", "A": "A", "B": "B"}, paths={"D": ("A", "B")})
+
+    picks = {i: fib.lookup("D", flow_hash("S", "D", i)) for i in range(200)}
+    assert set(picks.values()) == {"A", "B"}
+    # Mismo flujo -> mismo camino (sin reordenamiento)
+    assert all(fib.lookup("D", flow_hash("S", "D", i)) == nh for i, nh in picks.items())
+    assert fib.lookup("D") == "A"    # sin flujo: primario
+
+    # Al caer B solo se mueven los flujos que iban por B
+    fib.fail_over("B")
+    assert fib.paths("D") == ("A",)
+    assert all(fib.lookup("D", flow_hash("S", "D", i)) == "A" for i in picks)
+
+
+def test_forwarder_next_hop_for_uses_flow_key():
+    from routerlab.core.forwarding import Forwarder
+    fib = Fib()
+    fib.publish({"D": "A"}, paths={"D": ("A", "B")})
+
+    async def send(nbr, msg):
+        pass
+
+    fwd = Forwarder(send, ["A", "B"], "S", route_next_hop=fib.lookup)
+    hops = {fwd.next_hop_for({"to": "D", "origin": "S", "flow": i}) for i in range(100)}
+    assert hops == {"A", "B"}
+    pkt = {"to": "D", "origin": "S", "flow": "video-1"}
+    assert len({fwd.next_hop_for(pkt) for _ in range(10)}) == 1
+
+
+def test_forwarder_follows_fib_changes():
+    from routerlab.core.forwarding import Forwarder
+    from routerlab.core.tables import flow_hash
+    fib = Fib()
+    fib.publish({"D": "A", "A": "A", "B": "B"}, paths={"D": ("A", "B")})
+
+    async def send(nbr, msg):
+        pass
+
+    fwd = Forwarder(send, ["A", "B"], "S", route_next_hop=fib.lookup)
+    fwd.follow_routes(fib.changes.subscribe())
+    pkts = [{"to": "D", "origin": "S", "flow": i} for i in range(50)]
+    first = [fwd.next_hop_for(p) for p in pkts]
+    assert [fwd.next_hop_for(p) for p in pkts] == first
+    assert fwd.stats["cache_hits"] == 50
+
+    # Solo cambia el conjunto ECMP (el primario sigue en A): igual debe invalidarse
+    fib.fail_over("B")
+    assert all(fwd.next_hop_for(p) == "A" for p in pkts)
+    assert fwd.stats["invalidated"] == 1
+
+    fib.withdraw("D")
+    assert fwd.next_hop_for(pkts[0]) is None
+
+
+def test_node_dump_routes_prints_tables(capsys):
+    from routerlab.core.node import RouterNode
+
+    class Quiet:
+        def me(self):
+            return "A"
+
+        async def send(self, to, msg):
+            pass
+
+    import json, tempfile, os
+    with tempfile.TemporaryDirectory() as d:
+        topo = os.path.join(d, "topo.json")
+        with open(topo, "w") as f:
+            json.dump({"type": "topo", "config": {"A": {"B": 1}, "B": {"A": 1}}}, f)
+        node = RouterNode("A", Quiet(), topo, proto="lsr")
+    node.alg.on_hello("B", 1.0)
+    node.alg.mark_neighbor_active("B", 1.0)
+    node.alg.recompute()
+    capsys.readouterr()
+    node.dump_routes()
+    out = capsys.readouterr().out
+    assert "LSDB:" in out and "A -> B : 1 (nh=B)" in out
+    assert node._dumped_generation == node.alg.fib.generation
@@ -0,0 +1,64 @@
+# Tests para AdaptiveTimer (intervalos HELLO/INFO adaptativos)
+import asyncio
+import pytest
+
+from routerlab.core.timers import AdaptiveTimer
+
+def test_backoff_is_bounded_by_max():
+    t = AdaptiveTimer("info", base=5, min_s=1, max_s=15, factor=2)
+    assert t.interval == 5
+    assert t.backoff() and t.interval == 10
+    assert t.backoff() and t.interval == 15
+    assert t.backoff() is False
+    assert t.stats()["backoffs"] == 2
+
+def test_tighten_resets_to_min():
+    t = AdaptiveTimer("hello", base=3, min_s=1, max_s=3)
+    assert t.tighten() and t.interval == 1
+    assert t.tighten() is False
+    assert t.stats()["tightens"] == 1
+
+def test_base_is_clamped_and_bounds_validated():
+    assert AdaptiveTimer("x", base=100, min_s=1, max_s=10).interval == 10
+    with pytest.raises(ValueError):
+        AdaptiveTimer("x", base=1, min_s=5, max_s=2)
+
+def test_tighten_wakes_sleeper_early():
+    async def scenario():
+        t = AdaptiveTimer("info", base=30, min_s=0.01, max_s=30)
+        loop = asyncio.get_running_loop()
+        start = loop.time()
+        sleeper = asyncio.create_task(t.sleep())
+        await asyncio.sleep(0.01)
+        t.tighten()
+        await asyncio.wait_for(sleeper, 1.0)
+        return loop.time() - start
+
+    assert asyncio.run(scenario()) < 1.0
+
+def _node(tmp_path):
+    import json
+    from routerlab.core.node import RouterNode
+
+    class Quiet:
+        async def send(self, to, msg):
+            pass
+
+    topo = tmp_path / "topo.json"
+    topo.write_text(json.dumps({"type": "topo", "config": {"N1": {"N2": 1}, "N2": {"N1": 1}}}))
+    return RouterNode("N1", Quiet(), str(topo), proto="lsr")
+
+def test_node_defaults_keep_node_dead(tmp_path, monkeypatch):
+    for var in ("NODE_DEAD", "INFO_MAX", "HELLO_MAX", "HOLD_MULT", "INFO_INTERVAL", "HELLO_INTERVAL"):
+        monkeypatch.delenv(var, raising=False)
+    node = _node(tmp_path)
+    assert node.NODE_DEAD == 15.0
+    assert node.info_timer.max_s == 10.0
+    assert node.hello_timer.max_s == node.HELLO_INTERVAL
+
+def test_explicit_info_max_raises_node_dead(tmp_path, monkeypatch, capsys):
+    monkeypatch.delenv("NODE_DEAD", raising=False)
+    monkeypatch.setenv("INFO_MAX", "20")
+    node = _node(tmp_path)
+    assert node.NODE_DEAD == 30.0
+    assert "NODE_DEAD 15.0s -> 30.0s" in capsys.readouterr().out
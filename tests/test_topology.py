@@ -0,0 +1,69 @@
+import json, os
+from pathlib import Path
+
+import pytest
+
+from routerlab.algorithms.dijkstra import Dijkstra, graph_arcs, load_graph_from_topo
+from routerlab.core.topology import (
+    CompiledTopology, compile_topology, is_compiled, load_topology, topology_digest,
+)
+
+TOPO = str(Path(__file__).resolve().parent.parent / "configs" / "topo-11.txt")
+
+
+@pytest.fixture
+def compiled(tmp_path):
+    out = tmp_path / "topo-11.rlt"
+    compile_topology(TOPO, out)
+    return str(out)
+
+
+def test_compiled_rows_match_json(compiled):
+    cfg = json.loads(open(TOPO, encoding="utf-8").read())["config"]
+    topo = CompiledTopology(compiled)
+    try:
+        assert is_compiled(compiled) and not is_compiled(TOPO)
+        assert sorted(topo) == sorted(cfg) and len(topo) == len(cfg)
+        for node, row in cfg.items():
+            expected = {v: 1.0 for v in row} if isinstance(row, list) else {v: float(w) for v, w in row.items()}
+            assert topo[node] == expected
+        assert topo.get("NO-EXISTE") is None
+        # La huella es la del JSON fuente: una tabla de all_pairs sirve para ambos
+        assert topology_digest(compiled) == topology_digest(TOPO)
+    finally:
+        topo.close()
+
+
+def test_graph_and_routes_identical_from_compiled(compiled):
+    assert sorted(graph_arcs(load_graph_from_topo(compiled))) == sorted(graph_arcs(load_graph_from_topo(TOPO)))
+    a, b = Dijkstra(topo_path=TOPO), Dijkstra(topo_path=compiled)
+    a.on_init("N1", [])
+    b.on_init("N1", [])
+    assert dict(a.fib.table) == dict(b.fib.table)
+
+
+def test_rejects_truncated_or_foreign_files(compiled, tmp_path):
+    data = open(compiled, "rb").read()
+    cut = tmp_path / "cut.rlt"
+    cut.write_bytes(data[: len(data) // 2])
+    with pytest.raises(ValueError):
+        CompiledTopology(cut)
+    other = tmp_path / "other.rlt"
+    other.write_bytes(b"\x00" * 64)
+    with pytest.raises(ValueError):
+        CompiledTopology(other)
+    # Sin los bytes mágicos se trata como JSON
+    assert isinstance(load_topology(TOPO), dict)
+
+
+def test_compiled_topology_is_mapped_once_per_file_version(compiled):
+    first = load_topology(compiled)
+    assert isinstance(first, CompiledTopology)
+    assert load_topology(compiled) is first
+    # Recompilado (otro mtime): se mapea de nuevo y la instancia vieja sigue legible
+    mtime = os.stat(compiled).st_mtime_ns
+    compile_topology(TOPO, compiled)
+    os.utime(compiled, ns=(mtime + 10**9, mtime + 10**9))
+    second = load_topology(compiled)
+    assert second is not first
+    assert dict(second["N1"]) == dict(first["N1"])
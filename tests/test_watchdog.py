@@ -0,0 +1,53 @@
+import asyncio
+import time
+
+from routerlab.core.watchdog import LoopWatchdog
+
+
+def _blocking_recompute(seconds):
+    end = time.perf_counter() + seconds
+    while time.perf_counter() < end:
+        pass
+
+
+def test_stall_is_attributed_to_task_and_code():
+    wd = LoopWatchdog(threshold=0.05, interval=0.01)
+
+    async def culprit():
+        _blocking_recompute(0.2)
+
+    async def scenario():
+        wd.attach()
+        await asyncio.sleep(0.05)
+        await asyncio.create_task(culprit(), name="N1:routing")
+        await asyncio.sleep(0.05)
+        wd.detach()
+
+    asyncio.run(scenario())
+    st = wd.stats()
+    assert st["stalls"] == 1
+    stall = st["recent"][0]
+    assert stall["lag_ms"] >= 150
+    assert stall["task"] == "N1:routing (test_stall_is_attributed_to_task_and_code.<locals>.culprit)"
+    assert stall["where"].startswith("_blocking_recompute (test_watchdog.py:")
+    assert "culprit" in wd.stalls[0]["stack"]
+    assert st["lag"]["max_ms"] >= 150
+
+
+def test_idle_loop_records_lag_without_stalls():
+    wd = LoopWatchdog(threshold=0.05, interval=0.01)
+
+    async def scenario():
+        wd.attach()
+        wd.attach()          # dos nodos comparten el watchdog
+        await asyncio.sleep(0.1)
+        wd.detach()
+        await asyncio.sleep(0.05)
+        assert wd._task is not None   # sigue vivo mientras quede un usuario
+        wd.detach()
+        assert wd._task is None
+
+    asyncio.run(scenario())
+    st = wd.stats()
+    assert st["stalls"] == 0
+    assert st["lag"]["count"] >= 5